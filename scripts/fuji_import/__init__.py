@@ -0,0 +1,9 @@
+"""
+Fuji Restaurant POS System - Import tooling
+Shared library behind the `fuji-import` command line tool
+
+Keep this module free of heavy imports: `fuji-import --help` and the light
+subcommands must not pay for pandas, PyPDF2 or supabase at startup.
+"""
+
+__version__ = '1.0.0'
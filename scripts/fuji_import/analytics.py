@@ -0,0 +1,319 @@
+"""
+Local analytics query engine over the exported sales datasets
+Loads the CSV exports into date-sorted numpy columns, answers range, group-by
+and top-N queries by binary search over the date index, caches results in a
+bounded LRU and serves them as JSON over a small local HTTP service.
+
+Amount columns are held as int64 cents and aggregated in integers; results
+carry them as "1234.56" strings (format_cents). Means of amounts are rounded
+half away from zero to whole cents, like to_cents; means of counts stay
+fractional.
+"""
+
+import csv
+import json
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from .core import DATA_DIR, EXPORT_COUNT_COLUMNS, FujiImportError, format_cents, is_money_column, require, to_cents
+
+# table name -> (export file, date column)
+TABLES = {
+    'monthly': ('monthly_summary_complete.csv', 'date'),
+    'daily': ('daily_summary_complete.csv', 'date'),
+    'transactions': ('transactions_complete.csv', 'date'),
+    'orders': ('historical_orders.csv', 'order_date'),
+    'order_items': ('historical_order_items.csv', None),
+}
+
+AGGREGATES = ['sum', 'count', 'mean', 'min', 'max']
+BUCKETS = {'day': 'datetime64[D]', 'month': 'datetime64[M]', 'year': 'datetime64[Y]'}
+
+
+class ColumnTable:
+    """One dataset held as numpy columns, sorted by its date column"""
+
+    def __init__(self, name: str, columns: Dict, date_column: Optional[str], blanks: Optional[Dict] = None,
+                 money: Sequence[str] = ()):
+        np = require('numpy')
+
+        self.name = name
+        self.date_column = date_column
+        # Integer columns have no NaN; blanks[col] marks their empty cells
+        blanks = blanks or {}
+        if date_column:
+            order = np.argsort(columns[date_column], kind='stable')
+            columns = {col: values[order] for col, values in columns.items()}
+            blanks = {col: mask[order] for col, mask in blanks.items()}
+        self.columns = columns
+        self.blanks = blanks
+        self.money = set(money)
+        self.size = len(next(iter(columns.values()))) if columns else 0
+
+    @classmethod
+    def from_csv(cls, name: str, path: Path, date_column: Optional[str]) -> 'ColumnTable':
+        """Read a CSV export, typing each column as cents, count, date or string"""
+        np = require('numpy')
+
+        with open(path, newline='', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            header = next(reader)
+            raw = list(zip(*reader)) or [()] * len(header)
+
+        columns, blanks, money = {}, {}, []
+        for col, values in zip(header, raw):
+            if col == date_column:
+                columns[col] = np.array(values, dtype='datetime64[D]')
+                continue
+            if not is_money_column(col) and col not in EXPORT_COUNT_COLUMNS:
+                columns[col] = np.array(values, dtype=object)
+                continue
+            try:
+                numbers = [float(v) if v != '' else 0.0 for v in values]
+            except ValueError:
+                columns[col] = np.array(values, dtype=object)
+                continue
+            if col in EXPORT_COUNT_COLUMNS:
+                columns[col] = np.array([int(number) for number in numbers], dtype=np.int64)
+            else:
+                columns[col] = np.array([to_cents(v) for v in values], dtype=np.int64)
+                money.append(col)
+            blanks[col] = np.array([v == '' for v in values], dtype=bool)
+        return cls(name, columns, date_column, blanks, money)
+
+    def describe(self) -> Dict:
+        info = {'rows': self.size, 'columns': list(self.columns), 'date_column': self.date_column}
+        if self.date_column and self.size:
+            dates = self.columns[self.date_column]
+            info['first_date'], info['last_date'] = str(dates[0]), str(dates[-1])
+        return info
+
+    def date_slice(self, start: Optional[str], end: Optional[str]) -> slice:
+        """Row slice for start <= date <= end, found by binary search"""
+        if not self.date_column:
+            if start or end:
+                raise FujiImportError(f"Table '{self.name}' has no date column")
+            return slice(0, self.size)
+
+        np = require('numpy')
+        dates = self.columns[self.date_column]
+        lo = np.searchsorted(dates, np.datetime64(start, 'D'), side='left') if start else 0
+        hi = np.searchsorted(dates, np.datetime64(end, 'D'), side='right') if end else self.size
+        return slice(int(lo), int(hi))
+
+    def column(self, name: str):
+        if name not in self.columns:
+            raise FujiImportError(f"Unknown column '{name}' in table '{self.name}'")
+        return self.columns[name]
+
+    def output_value(self, name: str, value, blank: bool = False):
+        """A column value as it goes out in a JSON result"""
+        if blank:
+            return None
+        if name in self.money:
+            return format_cents(int(value))
+        return _to_json_value(value)
+
+
+def _to_json_value(value):
+    """Convert numpy scalars/NaN to plain JSON values"""
+    if hasattr(value, 'item'):
+        value = value.item()
+    if isinstance(value, float) and value != value:
+        return None
+    if not isinstance(value, (int, float, str, bool, type(None))):
+        return str(value)
+    return value
+
+
+class AnalyticsEngine:
+    """Range, group-by and top-N queries with a bounded result cache"""
+
+    def __init__(self, data_dir: Path = DATA_DIR, cache_size: int = 256):
+        self.data_dir = data_dir
+        self.tables: Dict[str, ColumnTable] = {}
+        self._query = lru_cache(maxsize=cache_size)(self._execute)
+        self.reload()
+
+    def reload(self):
+        """(Re)load every available export and drop cached results"""
+        tables = {}
+        for name, (filename, date_column) in TABLES.items():
+            path = self.data_dir / filename
+            if path.exists():
+                tables[name] = ColumnTable.from_csv(name, path, date_column)
+        self.tables = tables
+        self._query.cache_clear()
+
+    def cache_info(self) -> Dict:
+        return self._query.cache_info()._asdict()
+
+    def table(self, name: str) -> ColumnTable:
+        if name not in self.tables:
+            raise FujiImportError(f"Unknown table '{name}' (available: {', '.join(self.tables)})")
+        return self.tables[name]
+
+    def query(self, op: str, table: str, start: Optional[str] = None, end: Optional[str] = None,
+              metric: Optional[str] = None, group_by: Optional[str] = None, agg: str = 'sum',
+              n: int = 10, columns: Optional[Tuple[str, ...]] = None, limit: int = 1000) -> Dict:
+        """Run (or fetch from cache) a query; arguments must be hashable"""
+        return self._query(op, table, start, end, metric, group_by, agg, n, columns, limit)
+
+    def _execute(self, op, table, start, end, metric, group_by, agg, n, columns, limit) -> Dict:
+        t = self.table(table)
+        rows = t.date_slice(start, end)
+
+        if op == 'range':
+            return self._range(t, rows, columns, limit)
+        if op == 'aggregate':
+            return self._aggregate(t, rows, metric, group_by, agg)
+        if op == 'top':
+            result = self._aggregate(t, rows, metric, group_by, agg, rank=n)
+            return result
+        raise FujiImportError(f"Unknown query '{op}'")
+
+    def _range(self, t: ColumnTable, rows: slice, columns, limit: int) -> Dict:
+        np = require('numpy')
+        names = list(columns) if columns else list(t.columns)
+        data = [t.column(name)[rows][:limit] for name in names]
+        blanks = [t.blanks[name][rows][:limit] if name in t.blanks else np.zeros(len(values), dtype=bool)
+                  for name, values in zip(names, data)]
+        return {
+            'table': t.name,
+            'total_rows': rows.stop - rows.start,
+            'rows': [
+                {name: t.output_value(name, value, blank) for name, value, blank in zip(names, values, row_blanks)}
+                for values, row_blanks in zip(zip(*data), zip(*blanks))
+            ]
+        }
+
+    def _aggregate(self, t: ColumnTable, rows: slice, metric: Optional[str], group_by: Optional[str], agg: str,
+                   rank: Optional[int] = None) -> Dict:
+        """Aggregate a metric per group; with `rank`, only the top `rank` groups"""
+        np = require('numpy')
+
+        if agg not in AGGREGATES:
+            raise FujiImportError(f"Unknown aggregate '{agg}' (use {', '.join(AGGREGATES)})")
+        if agg != 'count' and not metric:
+            raise FujiImportError(f"Aggregate '{agg}' needs a metric column")
+
+        values = t.column(metric)[rows] if metric else np.ones(rows.stop - rows.start, dtype=np.int64)
+        if values.dtype == object:
+            raise FujiImportError(f"Column '{metric}' is not numeric")
+        valid = ~t.blanks[metric][rows] if metric in t.blanks else np.ones(len(values), dtype=bool)
+
+        if group_by in BUCKETS:
+            keys = t.column(t.date_column)[rows].astype(BUCKETS[group_by])
+        elif group_by:
+            keys = t.column(group_by)[rows]
+        else:
+            keys = np.zeros(len(values), dtype=np.int8)
+
+        groups, inverse = np.unique(keys.astype(str) if keys.dtype == object else keys, return_inverse=True)
+        if group_by in BUCKETS:
+            groups = groups.astype(str)  # '2022', '2022-02', '2022-02-01'
+        counts = np.bincount(inverse[valid], minlength=len(groups))
+        # Integer sums: cents add up exactly
+        sums = np.zeros(len(groups), dtype=np.int64)
+        np.add.at(sums, inverse[valid], values[valid])
+
+        money = agg != 'count' and metric in t.money
+        if agg == 'sum':
+            result = sums
+        elif agg == 'count':
+            result = counts
+        elif agg == 'mean':
+            divisor = np.maximum(counts, 1)
+            if money:
+                # Half away from zero, to whole cents
+                result = np.sign(sums) * ((2 * np.abs(sums) + divisor) // (2 * divisor))
+            else:
+                result = sums / divisor
+        else:
+            bound = np.iinfo(np.int64)
+            result = np.full(len(groups), bound.max if agg == 'min' else bound.min, dtype=np.int64)
+            (np.minimum if agg == 'min' else np.maximum).at(result, inverse[valid], values[valid])
+        # A sum or count over no rows is 0; a mean, min or max has no value
+        empty = counts == 0 if agg in ('mean', 'min', 'max') else np.zeros(len(groups), dtype=bool)
+
+        order = range(len(groups))
+        if rank is not None:
+            # Empty groups last, then by value
+            order = sorted(order, key=lambda i: (not empty[i], result[i]), reverse=True)[:rank]
+
+        return {
+            'table': t.name,
+            'metric': metric,
+            'agg': agg,
+            'group_by': group_by,
+            'groups': [
+                {
+                    'key': _to_json_value(groups[i]) if group_by else None,
+                    'value': None if empty[i] else format_cents(int(result[i])) if money else _to_json_value(result[i]),
+                    'rows': int(counts[i]),
+                }
+                for i in order
+            ]
+        }
+
+
+def _make_handler(engine: AnalyticsEngine):
+    class AnalyticsHandler(BaseHTTPRequestHandler):
+        def _send(self, status: int, payload: Dict):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+            op = url.path.strip('/')
+
+            try:
+                if op == 'tables':
+                    return self._send(200, {name: t.describe() for name, t in engine.tables.items()})
+                if op == 'cache':
+                    return self._send(200, engine.cache_info())
+                if op not in ('range', 'aggregate', 'top'):
+                    return self._send(404, {'error': f"Unknown endpoint '/{op}'"})
+
+                columns = tuple(params['columns'].split(',')) if params.get('columns') else None
+                result = engine.query(
+                    op, params.get('table', ''), params.get('start'), params.get('end'),
+                    params.get('metric'), params.get('group_by'), params.get('agg', 'sum'),
+                    int(params.get('n', 10)), columns, int(params.get('limit', 1000))
+                )
+                self._send(200, result)
+            except (FujiImportError, ValueError) as e:
+                self._send(400, {'error': str(e)})
+
+        def do_POST(self):
+            if urlparse(self.path).path.strip('/') == 'reload':
+                engine.reload()
+                return self._send(200, {name: t.describe() for name, t in engine.tables.items()})
+            self._send(404, {'error': 'Unknown endpoint'})
+
+        def log_message(self, format, *args):
+            pass
+
+    return AnalyticsHandler
+
+
+def serve(engine: AnalyticsEngine, host: str = '127.0.0.1', port: int = 8765):
+    """Serve the engine until interrupted"""
+    server = ThreadingHTTPServer((host, port), _make_handler(engine))
+    print(f"📈 Analytics service on http://{host}:{port} ({', '.join(engine.tables)})")
+    print("   GET /tables, /range, /aggregate, /top, /cache · POST /reload")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Analytics service stopped")
+    finally:
+        server.server_close()
@@ -0,0 +1,188 @@
+"""
+Bulk historical order backfill
+Loads historical_orders.csv / historical_order_items.csv into orders,
+order_items and payments without firing the per-row order triggers
+(migration 012_historical_order_backfill.sql). The rows are staged in
+backfill_orders / backfill_order_items, then backfill_historical_orders()
+writes them and recomputes the order totals and daily_sales set-based, one
+call (one transaction) per month.
+
+Every backfilled day's daily_sales row is checked against the export (order
+counts, gross sales, tax, gratuity), and a sample of days against the trigger
+itself through verify_daily_sales_backfill(), which replays the day's orders
+through trigger_update_daily_sales and rolls the replay back.
+"""
+
+import calendar
+import csv
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .core import DATA_DIR, FujiImportError, read_export_rows, to_cents
+from .cube import ITEM_ID_FORMAT, MENU_FILE, ORDER_ITEMS_FILE, ORDERS_FILE
+from .logs import get_logger
+from .supabase_client import execute_with_retry, push_delta
+
+log = get_logger('backfill')
+
+STAGING_ORDERS = 'backfill_orders'
+STAGING_ITEMS = 'backfill_order_items'
+
+# daily_sales columns checked against the export after each month
+CHECKED_COLUMNS = ['total_orders', 'dine_in_orders', 'take_out_orders', 'gross_sales', 'total_tax', 'total_gratuity']
+CHECKED_COUNTS = {'total_orders', 'dine_in_orders', 'take_out_orders'}
+
+
+def _menu_names(data_dir: Path) -> Dict[str, str]:
+    """menu_item_NN -> name of the NN-th item in fuji_menu_items.csv"""
+    path = data_dir / MENU_FILE
+    if not path.exists():
+        return {}
+    with open(path, newline='', encoding='utf-8') as f:
+        return {ITEM_ID_FORMAT.format(position): row['name']
+                for position, row in enumerate(csv.DictReader(f), start=1)}
+
+
+def staged_rows(data_dir: Path = DATA_DIR, start: Optional[str] = None,
+                end: Optional[str] = None) -> Tuple[List[Dict], List[Dict]]:
+    """Staging rows for the exported orders dated start..end (inclusive) and their items"""
+    orders_csv = data_dir / ORDERS_FILE
+    items_csv = data_dir / ORDER_ITEMS_FILE
+    if not orders_csv.exists() or not items_csv.exists():
+        raise FujiImportError(f"{orders_csv.name}/{items_csv.name} not found - run `fuji-import sales orders` first")
+
+    orders = []
+    for order in read_export_rows(orders_csv):
+        if (start and order['order_date'] < start) or (end and order['order_date'] > end):
+            continue
+        subtotal, tax, gratuity, total = (order[col] or 0 for col in ('subtotal', 'tax', 'gratuity', 'total'))
+        orders.append({
+            'id': order['id'],
+            'order_date': order['order_date'],
+            'type': order['type'],
+            'table_number': order['table_number'],
+            'status': order['status'] or 'completed',
+            'payment_method': order['payment_method'] or None,
+            'subtotal': subtotal,
+            'tax': tax,
+            'gratuity': gratuity,
+            'service_charge': total - subtotal - tax - gratuity,
+            'total': total,
+        })
+
+    order_ids = {order['id'] for order in orders}
+    names = _menu_names(data_dir)
+    items = [
+        {
+            'id': item['id'],
+            'order_id': item['order_id'],
+            'item_id': item['item_id'],
+            'item_name': names.get(item['item_id'], item['item_id']),
+            'quantity': item['quantity'],
+            'unit_price': item['unit_price'],
+        }
+        for item in read_export_rows(items_csv) if item['order_id'] in order_ids
+    ]
+    return orders, items
+
+
+def expected_days(orders: List[Dict]) -> Dict[str, Dict[str, int]]:
+    """daily_sales figures the staged orders add up to (amounts in cents)"""
+    days: Dict[str, Dict[str, int]] = {}
+    for order in orders:
+        if order['status'] != 'completed':
+            continue
+        day = days.setdefault(order['order_date'], dict.fromkeys(CHECKED_COLUMNS, 0))
+        day['total_orders'] += 1
+        day['dine_in_orders'] += order['type'] == 'dine_in'
+        day['take_out_orders'] += order['type'] == 'take_out'
+        day['gross_sales'] += order['total']
+        day['total_tax'] += order['tax']
+        day['total_gratuity'] += order['gratuity']
+    return days
+
+
+def month_ranges(days) -> List[Tuple[str, str]]:
+    """(first, last) YYYY-MM-DD bounds of each month the days fall in"""
+    ranges = []
+    for month in sorted({day[:7] for day in days}):
+        year, number = int(month[:4]), int(month[5:7])
+        ranges.append((f'{month}-01', f'{month}-{calendar.monthrange(year, number)[1]:02d}'))
+    return ranges
+
+
+def sample_days(days: List[str], count: int) -> List[str]:
+    """`count` days spread evenly over the sorted days, first and last included"""
+    days = sorted(days)
+    if count <= 0 or not days:
+        return []
+    if count >= len(days):
+        return days
+    if count == 1:
+        return [days[0]]
+    return sorted({days[round(i * (len(days) - 1) / (count - 1))] for i in range(count)})
+
+
+def _day_differences(row: Dict, expected: Optional[Dict[str, int]]) -> List[str]:
+    if expected is None:
+        return ['not in the export']
+    differences = []
+    for column in CHECKED_COLUMNS:
+        value = int(row[column] or 0) if column in CHECKED_COUNTS else to_cents(row[column])
+        if value != expected[column]:
+            differences.append(f"{column} {row[column]} (export {expected[column]})")
+    return differences
+
+
+def backfill(client, data_dir: Path = DATA_DIR, start: Optional[str] = None, end: Optional[str] = None,
+             verify_days: int = 3, batch_size: int = 500, workers: int = 4, retries: int = 2) -> Dict:
+    """Stage the exported orders, backfill them month by month and verify the daily totals"""
+    orders, items = staged_rows(data_dir, start, end)
+    if not orders:
+        raise FujiImportError("No historical orders in the requested range")
+
+    started = time.perf_counter()
+    push_delta(client, STAGING_ORDERS, orders, [], batch_size, workers, retries)
+    push_delta(client, STAGING_ITEMS, items, [], batch_size, workers, retries)
+    log.info("📦 Staged %d orders and %d items in %.1fs", len(orders), len(items), time.perf_counter() - started)
+
+    expected = expected_days(orders)
+    backfilled: List[str] = []
+    mismatches: Dict[str, List[str]] = {}
+    for first, last in month_ranges(order['order_date'] for order in orders):
+        month_started = time.perf_counter()
+        # Not retried: a successful call consumes the staged rows
+        result = client.rpc('backfill_historical_orders', {'p_from': first, 'p_to': last}).execute()
+        rows = result.data or []
+        for row in rows:
+            day = str(row['sales_date'])[:10]
+            backfilled.append(day)
+            differences = _day_differences(row, expected.get(day))
+            if row.get('totals_changed'):
+                differences.append(f"{row['totals_changed']} order totals differ from the export")
+            if differences:
+                mismatches[day] = differences
+        log.info("   ⚡ %s: %d orders over %d days in %.1fs", first[:7], sum(row['orders'] for row in rows),
+                 len(rows), time.perf_counter() - month_started)
+
+    trigger_mismatches = {}
+    for day in sample_days(backfilled, verify_days):
+        result = execute_with_retry(client.rpc('verify_daily_sales_backfill', {'p_day': day}), retries)
+        if result.data:
+            trigger_mismatches[day] = [
+                f"{row['column_name']} {row['backfilled']} (trigger {row['trigger_replay']})" for row in result.data
+            ]
+
+    for day in sorted(set(mismatches) | set(trigger_mismatches)):
+        for difference in mismatches.get(day, []) + trigger_mismatches.get(day, []):
+            log.warning("   ❌ %s: %s", day, difference)
+    log.info("✅ Backfilled %d orders over %d days in %.1fs; %d days checked against the trigger",
+             len(orders), len(backfilled), time.perf_counter() - started, min(verify_days, len(backfilled)))
+    return {
+        'orders': len(orders),
+        'items': len(items),
+        'days': backfilled,
+        'mismatches': mismatches,
+        'trigger_mismatches': trigger_mismatches,
+    }
@@ -0,0 +1,231 @@
+"""
+Delta export files
+Every export snapshot written through write_export_csv gets a changeset next
+to it: the rows inserted, updated and deleted (by id) since the previous
+snapshot, so loaders and backups can take in just the latest changes instead
+of the whole history.
+
+Per-row fingerprints of the last snapshot are kept in a hidden state file
+(.<stem>.fingerprints.json), so the previous snapshot is never re-read. The
+first run without that file fingerprints whatever snapshot is already on disk.
+
+Snapshots are numbered. A changeset takes the snapshot from generation `base`
+to `generation`; a consumer that last applied `base` can apply it instead of
+the full snapshot. Changeset layout (<stem>.changes.jsonl), values as in the
+CSV:
+
+    {"snapshot": "...csv", "key": "id", "base": 4, "generation": 5, "columns": [...],
+     "inserted": 1, "updated": 1, "deleted": 1}
+    ["insert", ["txn_2022_02_01_001", "2022-02-01", ...]]
+    ["update", ["txn_2022_02_01_002", "2022-02-01", ...]]
+    ["delete", "txn_2022_02_01_003"]
+"""
+
+import csv
+import hashlib
+import io
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .core import FujiImportError, parse_export_row
+from .logs import get_logger
+
+log = get_logger('changeset')
+
+STATE_VERSION = 1
+OPS = {'insert': 'inserted', 'update': 'updated', 'delete': 'deleted'}
+
+
+def changeset_path(snapshot: Path) -> Path:
+    """transactions_complete.csv -> transactions_complete.changes.jsonl"""
+    return snapshot.with_name(f'{snapshot.stem}.changes.jsonl')
+
+
+def fingerprints_path(snapshot: Path) -> Path:
+    return snapshot.with_name(f'.{snapshot.stem}.fingerprints.json')
+
+
+def loaded_path(snapshot: Path, table: str) -> Path:
+    return snapshot.with_name(f'.{snapshot.stem}.{table}.loaded.json')
+
+
+def row_fingerprint(columns: List[str], values: List[str]) -> str:
+    """64-bit digest of one CSV row, column names included"""
+    digest = hashlib.blake2b(digest_size=8)
+    for column, value in zip(columns, values):
+        digest.update(f'{column}\x1f{value}\x1e'.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _csv_rows(text: str) -> Tuple[List[str], List[List[str]]]:
+    reader = csv.reader(io.StringIO(text))
+    return next(reader, []), list(reader)
+
+
+def _write_atomic(path: Path, text: str):
+    tmp = path.with_name(path.name + '.tmp')
+    with open(tmp, 'w', newline='', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def load_fingerprints(snapshot: Path, key: str = 'id') -> Dict:
+    """Fingerprint state of the last snapshot: {generation, columns, rows: {key: digest}}"""
+    state_file = fingerprints_path(snapshot)
+    if state_file.exists():
+        with open(state_file, encoding='utf-8') as f:
+            state = json.load(f)
+        if state.get('version') == STATE_VERSION and state.get('key') == key:
+            return state
+
+    state = {'version': STATE_VERSION, 'key': key, 'generation': 0, 'columns': [], 'rows': {}}
+    if snapshot.exists():
+        with open(snapshot, newline='', encoding='utf-8') as f:
+            columns, rows = _csv_rows(f.read())
+        if key in columns:
+            index = columns.index(key)
+            state['columns'] = columns
+            state['rows'] = {values[index]: row_fingerprint(columns, values) for values in rows}
+    return state
+
+
+def write_snapshot(text: str, snapshot: Path, key: str = 'id') -> Optional[Dict]:
+    """Write a snapshot CSV and its changeset; return the changeset header
+
+    Files without a `key` column, and snapshots identical to the previous
+    one, are written without a new changeset (returns None).
+    """
+    columns, rows = _csv_rows(text)
+    if key not in columns:
+        _write_atomic(snapshot, text)
+        return None
+
+    previous = load_fingerprints(snapshot, key)
+    index = columns.index(key)
+    fingerprints: Dict[str, str] = {}
+    changes: List[list] = []
+    for values in rows:
+        digest = row_fingerprint(columns, values)
+        fingerprints[values[index]] = digest
+        old = previous['rows'].get(values[index])
+        if old != digest:
+            changes.append(['insert' if old is None else 'update', values])
+    changes.extend(['delete', row_id] for row_id in previous['rows'] if row_id not in fingerprints)
+
+    if not changes and previous['columns'] == columns and fingerprints_path(snapshot).exists():
+        # Same generation: the existing changeset still leads up to it
+        _write_atomic(snapshot, text)
+        log.info("   🔁 %s: unchanged (generation %d)", snapshot.name, previous['generation'])
+        return None
+
+    header = {
+        'snapshot': snapshot.name,
+        'key': key,
+        'base': previous['generation'],
+        'generation': previous['generation'] + 1,
+        'columns': columns,
+    }
+    for op, label in OPS.items():
+        header[label] = sum(1 for change in changes if change[0] == op)
+
+    # Snapshot first and fingerprints last: a crash in between only makes the
+    # next changeset repeat these changes, which consumers apply idempotently
+    _write_atomic(snapshot, text)
+    lines = [json.dumps(header, separators=(',', ':'))]
+    lines.extend(json.dumps(change, separators=(',', ':')) for change in changes)
+    _write_atomic(changeset_path(snapshot), '\n'.join(lines) + '\n')
+    _write_atomic(fingerprints_path(snapshot), json.dumps({
+        'version': STATE_VERSION,
+        'key': key,
+        'generation': header['generation'],
+        'columns': columns,
+        'rows': fingerprints,
+    }, separators=(',', ':')))
+
+    log.info("   🔁 %s: %d inserted, %d updated, %d deleted", changeset_path(snapshot).name,
+             header['inserted'], header['updated'], header['deleted'])
+    return header
+
+
+def read_changeset(snapshot: Path, blank=None) -> Optional[Dict]:
+    """Read a snapshot's changeset: the header plus `upserts` (parsed like
+    read_export_rows) and `deleted` keys; None if there is none"""
+    path = changeset_path(snapshot)
+    if not path.exists():
+        return None
+
+    with open(path, encoding='utf-8') as f:
+        header = json.loads(f.readline())
+        upserts, deleted = [], []
+        for line in f:
+            op, payload = json.loads(line)
+            if op == 'delete':
+                deleted.append(payload)
+            else:
+                upserts.append(parse_export_row(dict(zip(header['columns'], payload)), blank))
+    return {**header, 'upserts': upserts, 'deleted': deleted}
+
+
+def loaded_generation(snapshot: Path, table: str) -> Optional[int]:
+    """Snapshot generation last loaded into `table`, if known"""
+    path = loaded_path(snapshot, table)
+    if not path.exists():
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f).get('generation')
+
+
+def mark_loaded(snapshot: Path, table: str, generation: int):
+    _write_atomic(loaded_path(snapshot, table), json.dumps({'table': table, 'generation': generation}))
+
+
+def table_keys(client, table: str, key: str = 'id', retries: int = 2) -> List[str]:
+    """Every key in a Supabase table, a page at a time"""
+    from .verify import fetch_partition
+    return [row[key] for row in fetch_partition(client, table, [key], None, 'value', None, key, retries)]
+
+
+def _applies_changeset(changes: Optional[Dict], applied: Optional[int], generation: int) -> bool:
+    return bool(changes) and applied is not None and changes['base'] == applied and changes['generation'] == generation
+
+
+def plan_deletes(snapshot: Path, table: str, client=None) -> List[str]:
+    """Keys to delete so `table` keeps no rows the current snapshot dropped
+
+    When the table took the changeset's base these are the changeset's
+    deletes. Otherwise (first load, or an older base) they are the table's
+    keys missing from the snapshot, which takes a client to read them.
+    """
+    state = load_fingerprints(snapshot)
+    applied = loaded_generation(snapshot, table)
+    if applied == state['generation']:
+        return []
+    changes = read_changeset(snapshot)
+    if _applies_changeset(changes, applied, state['generation']):
+        return changes['deleted']
+    if client is None:
+        raise FujiImportError(f"{table} does not hold a known generation of {snapshot.name}; "
+                              f"a client is needed to find the rows to delete")
+    return [row_id for row_id in table_keys(client, table, state['key']) if row_id not in state['rows']]
+
+
+def plan_load(snapshot: Path, table: str, client=None) -> Tuple[int, List[Dict], List[str], bool]:
+    """What to push to bring `table` up to the current snapshot
+
+    Returns (generation, upserts, deleted keys, is_delta). When the table last
+    took the changeset's base generation only the changeset is pushed;
+    otherwise the whole snapshot is upserted and the table's rows missing
+    from it are deleted (read through `client`, see plan_deletes).
+    """
+    generation = load_fingerprints(snapshot)['generation']
+    applied = loaded_generation(snapshot, table)
+    if applied == generation:
+        return generation, [], [], True
+
+    changes = read_changeset(snapshot)
+    if _applies_changeset(changes, applied, generation):
+        return generation, changes['upserts'], changes['deleted'], True
+    from .staging import export_rows
+    return generation, export_rows(snapshot), plan_deletes(snapshot, table, client), False
@@ -0,0 +1,541 @@
+"""
+Command line entry point for the Fuji import tooling
+
+    fuji-import sales monthly|daily|transactions|orders|layout [--workers 4] [--load]
+    fuji-import menu extract|load|verify|search|dedupe|prices [--at 2022-02-01]
+    fuji-import watch [--push]
+    fuji-import analytics serve|query|cooccurrence|cube
+    fuji-import reports [--month 2022-02 ...] [--force]
+    fuji-import pipeline [--load] [--stage NAME ...] [--fresh]
+    fuji-import loadtest [--scenario menu|historical|verify] [--latency 0.05] [--batch-size 50 ...]
+    fuji-import simulate fit|run [--rate 5 --rate 20 ...] [--dsn postgresql://...]
+    fuji-import verify [--table historical_transactions ...] [--unit month|year]
+    fuji-import refresh-views [--view monthly_sales_trend ...] [--all]
+    fuji-import backfill [--from 2022-02-01] [--to 2022-02-28] [--verify-days 3]
+    fuji-import staging info|query SQL|rebuild
+
+Subcommand handlers import their modules on demand, so `--help` and light
+subcommands never load pandas, PyPDF2 or supabase.
+"""
+
+import argparse
+import json
+import os
+import sys
+from datetime import date
+from pathlib import Path
+from typing import List, Optional
+
+from .core import DATA_DIR, MENU_PDF, REFERENCE_DIR, FujiImportError
+from .logs import LOG_LEVELS, configure_logging
+
+SALES_TARGETS = ['monthly', 'daily', 'transactions', 'orders', 'layout']
+
+
+def _run_sales(args) -> int:
+    from . import sales
+
+    os.makedirs(args.data_dir, exist_ok=True)
+    paths = dict(reference_dir=args.reference_dir, output_dir=args.data_dir)
+
+    if 'layout' in args.targets:
+        for layout in sales.workbook_layouts(args.reference_dir):
+            print(json.dumps(layout))
+        return 0
+
+    client = None
+    if args.load:
+        from .supabase_client import get_supabase_client
+        client = get_supabase_client()
+
+    ok = True
+    for target in dict.fromkeys(args.targets):
+        print(f"\nProcessing {target} sales data...")
+        if target == 'monthly':
+            ok &= sales.export_complete_monthly_summary(**paths) is not None
+            ok &= sales.process_monthly_summary(**paths) is not None
+        elif target == 'daily':
+            ok &= sales.export_complete_daily_summary(**paths) is not None
+        elif target == 'transactions':
+            ok &= sales.export_complete_transactions(**paths, workers=args.workers, client=client,
+                                                     queue_size=args.queue_size) is not None
+        elif target == 'orders':
+            ok &= sales.process_detailed_transactions(**paths)[0] is not None
+    return 0 if ok else 1
+
+
+def _run_menu_extract(args) -> int:
+    from .menu import create_import_instructions, parse_menu_text, save_to_csv
+    from .menu_prices import check_as_of, record_snapshot
+    from .pdf import extract_text_from_pdf
+
+    as_of = check_as_of(args.data_dir, args.as_of)
+    menu_items = parse_menu_text(extract_text_from_pdf(args.pdf))
+    if not menu_items:
+        print("❌ No menu items found in PDF")
+        return 1
+
+    csv_file = save_to_csv(menu_items, args.output)
+    record_snapshot(menu_items, args.data_dir, as_of)
+    if args.instructions:
+        create_import_instructions(csv_file, Path(__file__).parent.parent / 'MENU_IMPORT_INSTRUCTIONS.md', 'fuji-import menu extract')
+
+    print(f"\n🎉 Extracted {len(menu_items)} menu items to {csv_file}")
+    return 0
+
+
+def _run_menu_load(args) -> int:
+    from .menu import parse_menu_text
+    from .menu_loader import MenuLoader
+    from .menu_prices import check_as_of, record_snapshot
+    from .pdf import extract_text_from_pdf
+    from .supabase_client import get_supabase_client
+
+    as_of = check_as_of(args.data_dir, args.as_of)
+    loader = MenuLoader(get_supabase_client())
+    menu_items = parse_menu_text(extract_text_from_pdf(args.pdf))
+    if not menu_items:
+        print("❌ No menu items found in PDF")
+        return 1
+
+    category_id_map = loader.get_or_create_categories(menu_items)
+    loader.import_menu_items(menu_items, category_id_map, batch_size=args.batch_size)
+    total_items = loader.verify_import(menu_items, category_id_map)
+    # Record the imported prices as the current versions, closing the previous ones
+    record_snapshot(menu_items, args.data_dir, as_of)
+
+    print(f"\n🎉 Import completed successfully!")
+    print(f"📊 Total items imported: {total_items}")
+    return 0
+
+
+def _run_menu_verify(args) -> int:
+    from .menu import read_menu_csv
+    from .menu_loader import MenuLoader
+    from .supabase_client import get_supabase_client
+
+    # Compare against the extracted menu when there is one; counts only otherwise
+    menu_items = read_menu_csv(args.output) if args.output.exists() else None
+    total_items = MenuLoader(get_supabase_client()).verify_import(menu_items)
+    return 0 if total_items else 1
+
+
+def _run_menu_search(args) -> int:
+    from .menu_search import load_search_index, search, search_index_path
+
+    index_file = search_index_path(args.data_dir / 'fuji_menu_items.csv')
+    if not index_file.exists():
+        raise FujiImportError(f"{index_file} not found - run `fuji-import menu extract` first")
+
+    results = search(load_search_index(index_file), ' '.join(args.query), args.category, args.tier, args.limit)
+    for item in results:
+        price = f"${item['price']:.2f}" if item['price'] is not None else '-'
+        print(f"{item['name']:<40} {item['category']:<20} {price:>8} {item['tier'] or ''}")
+    if not results:
+        print("No matching menu items")
+    return 0
+
+
+def _run_menu_prices(args) -> int:
+    from .menu_prices import PRICE_FIELDS, PriceIndex
+
+    index = PriceIndex.load(args.data_dir)
+    if not index.items:
+        raise FujiImportError("No menu price history yet - run `fuji-import menu extract` first")
+
+    day = args.at or date.today().isoformat()
+    rows = index.prices_at(day)
+    if args.item:
+        rows = [row for row in rows if args.item.lower() in row['name'].lower()]
+    if args.json:
+        for row in rows:
+            print(json.dumps(row))
+        return 0
+    for row in rows:
+        prices = ' '.join(f"{row[field] or '-':>8}" for field in PRICE_FIELDS)
+        print(f"{row['name']:<40} {row['category']:<20} {prices}  since {row['valid_from']}")
+    if not rows:
+        print(f"No menu prices in effect on {day}")
+    return 0
+
+
+def _run_menu_dedupe(args) -> int:
+    from .menu_dedupe import find_duplicates, read_items, write_candidates
+
+    existing = args.existing or [args.data_dir / 'fuji_menu_items.csv']
+    for path in existing + ([args.new] if args.new else []):
+        if not path.exists():
+            raise FujiImportError(f"{path} not found - run `fuji-import menu extract` first")
+
+    new = read_items([args.new]) if args.new else None
+    candidates = find_duplicates(read_items(existing), new, args.min_score)
+    for candidate in candidates[:args.limit]:
+        print(f"{candidate['score']:>6.2f}  {candidate['name']:<36} {candidate['match_name']:<36} "
+              f"{candidate['match_category'] if not candidate['same_category'] else ''}")
+    if args.output:
+        print(f"💾 {len(candidates)} merge candidates written to {write_candidates(candidates, args.output)}")
+    elif not candidates:
+        print("No merge candidates")
+    return 0
+
+
+def _run_watch(args) -> int:
+    from .watch import ImportWatcher
+
+    watcher = ImportWatcher(args.reference_dir, args.data_dir, push=args.push, interval=args.interval)
+    watcher.run(max_passes=1 if args.once else None)
+    return 0
+
+
+def _run_analytics(args) -> int:
+    from .analytics import AnalyticsEngine, serve
+
+    if args.analytics_command == 'cooccurrence':
+        from .cooccurrence import build_cooccurrence
+        build_cooccurrence(args.data_dir, args.top_k, args.min_count, args.full)
+        return 0
+    if args.analytics_command == 'cube':
+        from .cube import build_cube
+        result = build_cube(args.data_dir, args.full)
+        for table, rows in result['tables'].items():
+            print(f"   {table:<28} {rows:>8} rows")
+        return 0
+
+    engine = AnalyticsEngine(args.data_dir, cache_size=args.cache_size)
+    if args.analytics_command == 'serve':
+        serve(engine, args.host, args.port)
+        return 0
+
+    columns = tuple(args.columns.split(',')) if args.columns else None
+    result = engine.query(args.op, args.table, args.start, args.end, args.metric,
+                          args.group_by, args.agg, args.n, columns, args.limit)
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+def _run_reports(args) -> int:
+    from .reports import ReportGenerator
+
+    generator = ReportGenerator(args.data_dir, args.output)
+    generator.generate(months=args.month, force=args.force, workers=args.workers)
+    return 0
+
+
+def _run_pipeline(args) -> int:
+    from .pipeline import DEFAULT_TARGETS, LOAD_TARGETS, STAGES, Pipeline
+
+    if args.list:
+        for stage in STAGES:
+            deps = f" (after {', '.join(stage.deps)})" if stage.deps else ''
+            print(f"{stage.name:<24} {stage.description}{deps}")
+        return 0
+
+    targets = args.stage or (LOAD_TARGETS if args.load else DEFAULT_TARGETS)
+    pipeline = Pipeline(reference_dir=args.reference_dir, data_dir=args.data_dir, workers=args.workers)
+    pipeline.run(targets, fresh=args.fresh)
+    return 0
+
+
+def _run_loadtest(args) -> int:
+    from .loadtest import SCENARIOS, print_report, run_matrix
+
+    results = run_matrix(
+        args.scenario or SCENARIOS, args.batch_size or [50, 500],
+        data_dir=args.data_dir, workers=args.workers, retries=args.retries, backoff=args.backoff,
+        latency=args.latency, jitter=args.jitter, bandwidth=args.bandwidth,
+        max_concurrency=args.max_concurrency, error_rate=args.error_rate, seed=args.seed
+    )
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print_report(results)
+    return 1 if any(r['error'] for r in results) else 0
+
+
+def _run_simulate(args) -> int:
+    from .simulate import OrderModel, run_simulation
+
+    model = OrderModel.fit(args.data_dir)
+    if args.simulate_command == 'fit':
+        print(json.dumps(model.describe(), indent=2))
+        return 0
+
+    reports = run_simulation(model, args.rate or [1, 5, 10, 25], args.duration, args.concurrency,
+                             args.dsn, args.seed, args.keep)
+    if args.json:
+        print(json.dumps(reports, indent=2))
+    return 0
+
+
+def _run_verify(args) -> int:
+    from .supabase_client import get_supabase_client
+    from .verify import print_verification, verify_exports
+
+    print("🔍 Verifying historical tables against the exports...")
+    results = verify_exports(get_supabase_client(), args.data_dir, args.table, args.unit)
+    for result in results:
+        print_verification(result)
+    return 0 if all(result['ok'] for result in results) else 1
+
+
+def _run_refresh_views(args) -> int:
+    from .dashboard import refresh_after_load
+    from .supabase_client import get_supabase_client
+
+    print("🔄 Refreshing dashboard views...")
+    views = args.view if args.view else None
+    if args.all:
+        from .dashboard import DASHBOARD_VIEWS
+        views = list(DASHBOARD_VIEWS)
+    refresh_after_load(get_supabase_client(), args.data_dir, views)
+    return 0
+
+
+def _run_backfill(args) -> int:
+    from .backfill import backfill
+    from .supabase_client import get_supabase_client
+
+    print("⚡ Backfilling historical orders with the order triggers suspended...")
+    result = backfill(get_supabase_client(), args.data_dir, args.start, args.end, args.verify_days,
+                      args.batch_size, args.workers, args.retries)
+    return 0 if not result['mismatches'] and not result['trigger_mismatches'] else 1
+
+
+def _run_staging(args) -> int:
+    from .staging import STAGING_DB, StagingStore, rebuild
+
+    if args.staging_command == 'rebuild':
+        staged = rebuild(args.data_dir)
+        print(f"🗄️  Staged {len(staged)} exports into {args.data_dir / STAGING_DB}")
+        return 0
+
+    if not (args.data_dir / STAGING_DB).exists():
+        raise FujiImportError(f"{args.data_dir / STAGING_DB} not found - run an export or `staging rebuild` first")
+    with StagingStore.for_dir(args.data_dir) as store:
+        if args.staging_command == 'info':
+            for table in store.info():
+                print(f"{table['table']:<28} {table['rows']:>8} rows  from {table['source'] or '-'} "
+                      f"at {table['staged_at'] or '-'}")
+            return 0
+        for row in store.query(args.sql, args.param or ()):
+            print(json.dumps(row))
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='fuji-import', description='Fuji POS data import tooling')
+    parser.add_argument('--reference-dir', type=Path, default=REFERENCE_DIR,
+                        help='directory holding the source workbooks and menu PDF (default: docs/reference)')
+    parser.add_argument('--data-dir', type=Path, default=DATA_DIR,
+                        help='directory for generated CSV/JSON files (default: data)')
+    parser.add_argument('--log-level', default='INFO', type=str.upper, choices=LOG_LEVELS,
+                        help='DEBUG also lists every parsed menu item and quarantined row (default: INFO)')
+    commands = parser.add_subparsers(dest='command', metavar='command')
+    commands.required = True
+
+    sales_parser = commands.add_parser('sales', help='export sales workbooks to CSV')
+    sales_parser.add_argument('targets', nargs='+', choices=SALES_TARGETS,
+                              help='datasets to export (layout: print the detected sheet layouts instead)')
+    sales_parser.add_argument('--workers', type=int,
+                              help='processes parsing the daily sheets (default: CPU count)')
+    sales_parser.add_argument('--load', action='store_true',
+                              help='transactions: upsert into historical_transactions while the sheets are parsed')
+    sales_parser.add_argument('--queue-size', type=int, default=4,
+                              help='transactions: sheets that may wait between two streaming stages')
+    sales_parser.set_defaults(handler=_run_sales)
+
+    menu_parser = commands.add_parser('menu', help='extract, load or verify the menu')
+    menu_commands = menu_parser.add_subparsers(dest='menu_command', metavar='action')
+    menu_commands.required = True
+
+    extract_parser = menu_commands.add_parser('extract', help='parse the menu PDF into a CSV')
+    extract_parser.add_argument('--pdf', type=Path, help=f'menu PDF (default: <reference-dir>/{MENU_PDF})')
+    extract_parser.add_argument('--output', type=Path, help='CSV path (default: <data-dir>/fuji_menu_items.csv)')
+    extract_parser.add_argument('--instructions', action='store_true',
+                                help='also regenerate scripts/MENU_IMPORT_INSTRUCTIONS.md')
+    extract_parser.add_argument('--as-of', help='day the prices took effect, for the price history (default: today)')
+    extract_parser.set_defaults(handler=_run_menu_extract)
+
+    load_parser = menu_commands.add_parser('load', help='parse the menu PDF and import it into Supabase')
+    load_parser.add_argument('--pdf', type=Path, help=f'menu PDF (default: <reference-dir>/{MENU_PDF})')
+    load_parser.add_argument('--batch-size', type=int, default=50, help='items per insert request')
+    load_parser.add_argument('--as-of', help='day the prices took effect, for the price history (default: today)')
+    load_parser.set_defaults(handler=_run_menu_load)
+
+    verify_parser = menu_commands.add_parser('verify', help='report menu counts in Supabase')
+    verify_parser.set_defaults(handler=_run_menu_verify)
+
+    search_parser = menu_commands.add_parser('search', help='search the exported menu search index')
+    search_parser.add_argument('query', nargs='*', help='words to match (prefix or substring)')
+    search_parser.add_argument('--category', help='only this category, e.g. "Sushi Rolls"')
+    search_parser.add_argument('--tier', choices=['$', '$$', '$$$', '$$$$'], help='only this price tier')
+    search_parser.add_argument('--limit', type=int, default=20)
+    search_parser.set_defaults(handler=_run_menu_search)
+
+    prices_parser = menu_commands.add_parser('prices', help='list the menu prices in effect on a day')
+    prices_parser.add_argument('--at', help='YYYY-MM-DD (default: today)')
+    prices_parser.add_argument('--item', help='only items whose name contains this')
+    prices_parser.add_argument('--json', action='store_true', help='one JSON object per item')
+    prices_parser.set_defaults(handler=_run_menu_prices)
+
+    dedupe_parser = menu_commands.add_parser(
+        'dedupe', help='list near-duplicate menu items (within the menu, or of a new menu against it)')
+    dedupe_parser.add_argument('--existing', type=Path, action='append',
+                               help='menu CSV of existing items; repeatable (default: <data-dir>/fuji_menu_items.csv)')
+    dedupe_parser.add_argument('--new', type=Path, help='menu CSV to match against the existing items')
+    dedupe_parser.add_argument('--min-score', type=float, default=0.5, help='lowest 3-gram Jaccard score to report')
+    dedupe_parser.add_argument('--limit', type=int, default=50, help='candidates to print')
+    dedupe_parser.add_argument('--output', type=Path, help='write every candidate to this CSV')
+    dedupe_parser.set_defaults(handler=_run_menu_dedupe)
+
+    watch_parser = commands.add_parser('watch', help='poll the reference files and reprocess only what changed')
+    watch_parser.add_argument('--interval', type=float, default=2.0, help='seconds between polls')
+    watch_parser.add_argument('--push', action='store_true', help='push changed rows to Supabase')
+    watch_parser.add_argument('--once', action='store_true', help='run a single pass and exit')
+    watch_parser.set_defaults(handler=_run_watch)
+
+    analytics_parser = commands.add_parser('analytics', help='query the exported datasets locally')
+    analytics_parser.add_argument('--cache-size', type=int, default=256, help='cached query results to keep')
+    analytics_commands = analytics_parser.add_subparsers(dest='analytics_command', metavar='action')
+    analytics_commands.required = True
+
+    serve_parser = analytics_commands.add_parser('serve', help='serve queries as JSON over HTTP')
+    serve_parser.add_argument('--host', default='127.0.0.1')
+    serve_parser.add_argument('--port', type=int, default=8765)
+    serve_parser.set_defaults(handler=_run_analytics)
+
+    query_parser = analytics_commands.add_parser('query', help='run one query and print JSON')
+    query_parser.add_argument('op', choices=['range', 'aggregate', 'top'])
+    query_parser.add_argument('table')
+    query_parser.add_argument('--start', help='first date (YYYY-MM-DD), inclusive')
+    query_parser.add_argument('--end', help='last date (YYYY-MM-DD), inclusive')
+    query_parser.add_argument('--metric', help='numeric column to aggregate')
+    query_parser.add_argument('--group-by', help='column, or day/month/year of the date column')
+    query_parser.add_argument('--agg', default='sum')
+    query_parser.add_argument('--n', type=int, default=10, help='groups to return for top')
+    query_parser.add_argument('--columns', help='comma separated columns for range')
+    query_parser.add_argument('--limit', type=int, default=1000, help='rows to return for range')
+    query_parser.set_defaults(handler=_run_analytics)
+
+    cooccurrence_parser = analytics_commands.add_parser(
+        'cooccurrence', help='update the item co-occurrence matrix and write item_cooccurrence.json')
+    cooccurrence_parser.add_argument('--top-k', type=int, default=10, help='neighbours to keep per item')
+    cooccurrence_parser.add_argument('--min-count', type=int, default=1,
+                                     help='orders a pair must share to be listed')
+    cooccurrence_parser.add_argument('--full', action='store_true', help='rebuild instead of updating the stored matrix')
+    cooccurrence_parser.set_defaults(handler=_run_analytics)
+
+    cube_parser = analytics_commands.add_parser(
+        'cube', help='refresh the item/category sales cube (day/week/month) in staging.db')
+    cube_parser.add_argument('--full', action='store_true', help='rebuild every period instead of changed days')
+    cube_parser.set_defaults(handler=_run_analytics)
+
+    reports_parser = commands.add_parser('reports', help='render monthly/yearly reports from the exports')
+    reports_parser.add_argument('--month', action='append', help='only this month (YYYY-MM); repeatable')
+    reports_parser.add_argument('--force', action='store_true', help='re-render even if the data is unchanged')
+    reports_parser.add_argument('--workers', type=int, help='worker processes (default: CPU count)')
+    reports_parser.add_argument('--output', type=Path, help='report directory (default: <data-dir>/reports)')
+    reports_parser.set_defaults(handler=_run_reports)
+
+    pipeline_parser = commands.add_parser('pipeline', help='run the whole import as a resumable stage graph')
+    pipeline_parser.add_argument('--stage', action='append',
+                                 help='run this stage and its dependencies; repeatable (see --list)')
+    pipeline_parser.add_argument('--load', action='store_true', help='also load into Supabase and verify')
+    pipeline_parser.add_argument('--fresh', action='store_true', help='ignore the checkpoint of a previous run')
+    pipeline_parser.add_argument('--workers', type=int, help='worker processes (default: CPU count)')
+    pipeline_parser.add_argument('--list', action='store_true', help='list the stages and exit')
+    pipeline_parser.set_defaults(handler=_run_pipeline)
+
+    loadtest_parser = commands.add_parser('loadtest', help='time the Supabase loaders against a local fake')
+    loadtest_parser.add_argument('--scenario', action='append', choices=['menu', 'historical', 'verify'],
+                                 help='loader to exercise; repeatable (default: all)')
+    loadtest_parser.add_argument('--batch-size', type=int, action='append',
+                                 help='rows per request; repeatable to compare (default: 50 and 500)')
+    loadtest_parser.add_argument('--workers', type=int, default=1, help='concurrent requests for historical loads')
+    loadtest_parser.add_argument('--retries', type=int, default=0, help='retries per failed historical request')
+    loadtest_parser.add_argument('--backoff', type=float, default=0.1, help='first retry delay in seconds')
+    loadtest_parser.add_argument('--latency', type=float, default=0.05, help='seconds per request')
+    loadtest_parser.add_argument('--jitter', type=float, default=0.0, help='extra random seconds per request')
+    loadtest_parser.add_argument('--bandwidth', type=float, help='bytes per second each way (default: unlimited)')
+    loadtest_parser.add_argument('--max-concurrency', type=int, help='requests the fake serves at once')
+    loadtest_parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of requests that fail')
+    loadtest_parser.add_argument('--seed', type=int, default=0, help='seed for jitter and error injection')
+    loadtest_parser.add_argument('--json', action='store_true', help='print the measurements as JSON')
+    loadtest_parser.set_defaults(handler=_run_loadtest)
+
+    simulate_parser = commands.add_parser('simulate', help='replay synthetic order streams against local Postgres')
+    simulate_commands = simulate_parser.add_subparsers(dest='simulate_command', metavar='action')
+    simulate_commands.required = True
+
+    fit_parser = simulate_commands.add_parser('fit', help='print the distributions fitted from the order history')
+    fit_parser.set_defaults(handler=_run_simulate)
+
+    run_parser = simulate_commands.add_parser('run', help='replay orders at each rate and report latency')
+    run_parser.add_argument('--rate', type=float, action='append',
+                            help='orders per second; repeatable, run in order (default: 1 5 10 25)')
+    run_parser.add_argument('--duration', type=float, default=30.0, help='seconds per rate')
+    run_parser.add_argument('--concurrency', type=int, default=20, help='connections / orders in flight')
+    run_parser.add_argument('--dsn', help='Postgres DSN (default: $DATABASE_URL or the `supabase start` database)')
+    run_parser.add_argument('--seed', type=int, default=0)
+    run_parser.add_argument('--keep', action='store_true', help='keep the synthetic orders afterwards')
+    run_parser.add_argument('--json', action='store_true', help='also print the reports as JSON')
+    run_parser.set_defaults(handler=_run_simulate)
+
+    verify_parser = commands.add_parser('verify', help='compare the historical tables with the exports by checksum')
+    verify_parser.add_argument('--table', action='append',
+                               choices=['historical_monthly_summary', 'historical_daily_summary', 'historical_transactions'],
+                               help='table to verify; repeatable (default: all)')
+    verify_parser.add_argument('--unit', default='month', choices=['month', 'year'],
+                               help='partition size for the checksums (default: month)')
+    verify_parser.set_defaults(handler=_run_verify)
+
+    refresh_parser = commands.add_parser(
+        'refresh-views', help='refresh the dashboard materialized views affected by loads since the last refresh')
+    refresh_parser.add_argument('--view', action='append',
+                                choices=['monthly_sales_trend', 'daily_transaction_summary', 'complete_sales_overview'],
+                                help='refresh this view; repeatable (default: the affected ones)')
+    refresh_parser.add_argument('--all', action='store_true', help='refresh every dashboard view')
+    refresh_parser.set_defaults(handler=_run_refresh_views)
+
+    backfill_parser = commands.add_parser(
+        'backfill', help='bulk-load historical orders without per-row triggers and recompute daily_sales')
+    backfill_parser.add_argument('--from', dest='start', help='first order date (YYYY-MM-DD), inclusive')
+    backfill_parser.add_argument('--to', dest='end', help='last order date (YYYY-MM-DD), inclusive')
+    backfill_parser.add_argument('--verify-days', type=int, default=3,
+                                 help='days to check against a replay of the daily_sales trigger')
+    backfill_parser.add_argument('--batch-size', type=int, default=500, help='rows per staging request')
+    backfill_parser.add_argument('--workers', type=int, default=4, help='concurrent staging requests')
+    backfill_parser.add_argument('--retries', type=int, default=2, help='retries per staging request')
+    backfill_parser.set_defaults(handler=_run_backfill)
+
+    staging_parser = commands.add_parser('staging', help='inspect or query the SQLite staging store')
+    staging_commands = staging_parser.add_subparsers(dest='staging_command', metavar='action')
+    staging_commands.required = True
+    staging_commands.add_parser('info', help='list staged tables').set_defaults(handler=_run_staging)
+    staging_query_parser = staging_commands.add_parser('query', help='run a SQL query and print rows as JSON lines')
+    staging_query_parser.add_argument('sql')
+    staging_query_parser.add_argument('--param', action='append', help='value for a ? placeholder; repeatable')
+    staging_query_parser.set_defaults(handler=_run_staging)
+    staging_commands.add_parser('rebuild', help='stage the CSV exports already in the data directory'
+                                ).set_defaults(handler=_run_staging)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Main entry point"""
+    args = build_parser().parse_args(argv)
+    configure_logging(args.log_level)
+
+    if args.command == 'menu':
+        if getattr(args, 'pdf', False) is None:
+            args.pdf = args.reference_dir / MENU_PDF
+        # dedupe's --output is its own candidates CSV, not the menu CSV
+        if args.menu_command in ('extract', 'verify') and getattr(args, 'output', None) is None:
+            args.output = args.data_dir / 'fuji_menu_items.csv'
+
+    try:
+        return args.handler(args)
+    except FujiImportError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
@@ -0,0 +1,267 @@
+"""
+Item co-occurrence analytics
+Builds a sparse item x item co-occurrence matrix from the order -> item lines
+in historical_order_items.csv, with per-item support, pair lift/confidence
+and the top-k neighbours of every item, for "goes well with" suggestions and
+bundles in the menu views.
+
+Everything is vectorized with numpy: (order, item) lines are deduplicated by
+integer key, the pairs of each basket are expanded with np.repeat and counted
+with np.unique. An item is counted once per order, whatever its quantity.
+
+The matrix is kept between runs in .item_cooccurrence_state.npz. A rerun only
+expands the baskets of orders whose lines were added, changed or removed:
+their old pairs are subtracted and their new pairs added.
+
+The export (item_cooccurrence.json) is keyed by item id, so the app can look
+up an item's neighbours in constant time:
+
+    {"orders": 411, "items": {"menu_item_01": {"orders": 120, "support": 0.29,
+        "neighbors": [{"item": "menu_item_02", "orders": 80, "support": 0.19,
+                       "confidence": 0.67, "lift": 2.3}, ...]}}}
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from .core import DATA_DIR, FujiImportError, require
+from .logs import get_logger
+
+log = get_logger('cooccurrence')
+
+ORDER_ITEMS_FILE = 'historical_order_items.csv'
+STATE_FILE = '.item_cooccurrence_state.npz'
+EXPORT_FILE = 'item_cooccurrence.json'
+
+# Pair keys pack two item codes into one int64: (a << 32) | b with a < b
+CODE_BITS = 32
+CODE_MASK = (1 << CODE_BITS) - 1
+
+# Baskets larger than this (catering, whole-table tabs) would dominate the
+# pair count quadratically; they still count toward item support
+MAX_BASKET = 100
+
+
+def _empty_state(np) -> Dict:
+    return {
+        'items': np.array([], dtype=str),
+        'orders': np.array([], dtype=str),
+        'lines': np.array([], dtype=np.int64),
+        'pair_keys': np.array([], dtype=np.int64),
+        'pair_counts': np.array([], dtype=np.int64),
+        'item_counts': np.array([], dtype=np.int64),
+        'n_orders': 0,
+    }
+
+
+def _basket_pairs(np, lines, max_basket: int):
+    """Every (a, b) item pair, a < b, co-occurring in an order, as int64 keys
+
+    `lines` are sorted, unique (order << 32 | item) keys, so each basket is a
+    contiguous run with its items in ascending order.
+    """
+    if not len(lines):
+        return np.array([], dtype=np.int64)
+
+    orders = lines >> CODE_BITS
+    items = lines & CODE_MASK
+    starts = np.flatnonzero(np.r_[True, orders[1:] != orders[:-1]])
+    sizes = np.diff(np.r_[starts, len(lines)])
+
+    # Each line pairs with the lines after it in its basket
+    position = np.arange(len(lines)) - np.repeat(starts, sizes)
+    followers = np.repeat(sizes, sizes) - position - 1
+    followers[np.repeat(sizes > max_basket, sizes)] = 0
+
+    left = np.repeat(np.arange(len(lines)), followers)
+    offset = np.arange(len(left)) - np.repeat(np.cumsum(followers) - followers, followers) + 1
+    return (items[left] << CODE_BITS) | items[left + offset]
+
+
+def _count(np, keys, weights):
+    """Sum weights per unique key, dropping keys whose total is zero"""
+    unique, inverse = np.unique(keys, return_inverse=True)
+    totals = np.bincount(inverse, weights=weights, minlength=len(unique)).astype(np.int64)
+    keep = totals != 0
+    return unique[keep], totals[keep]
+
+
+def _remap(np, codes, old_vocab, new_vocab):
+    """Old vocabulary codes -> codes in a merged (sorted) vocabulary"""
+    if not len(codes):
+        return codes
+    return np.searchsorted(new_vocab, old_vocab).astype(np.int64)[codes]
+
+
+class CooccurrenceMatrix:
+    """Sparse upper-triangular pair counts plus per-item order counts"""
+
+    def __init__(self, state: Dict):
+        self.state = state
+
+    @classmethod
+    def empty(cls) -> 'CooccurrenceMatrix':
+        return cls(_empty_state(require('numpy')))
+
+    @classmethod
+    def load(cls, path: Path) -> 'CooccurrenceMatrix':
+        np = require('numpy')
+        if not path.exists():
+            return cls.empty()
+        with np.load(path, allow_pickle=False) as saved:
+            state = {key: saved[key] for key in saved.files}
+        state['n_orders'] = int(state['n_orders'])
+        return cls(state)
+
+    def save(self, path: Path):
+        np = require('numpy')
+        tmp = path.with_name(path.stem + '.tmp.npz')
+        np.savez_compressed(tmp, **self.state)
+        tmp.replace(path)
+
+    @property
+    def items(self):
+        return self.state['items']
+
+    @property
+    def n_orders(self) -> int:
+        return self.state['n_orders']
+
+    def update(self, order_ids, item_ids, max_basket: int = MAX_BASKET) -> int:
+        """Bring the matrix up to date with the full order -> item table
+
+        Only baskets that differ from the previous run are re-expanded.
+        Returns the number of orders that changed.
+        """
+        np = require('numpy')
+        state = self.state
+        order_ids = np.asarray(order_ids, dtype=str)
+        item_ids = np.asarray(item_ids, dtype=str)
+
+        items = np.union1d(state['items'], item_ids)
+        orders = np.union1d(state['orders'], order_ids)
+        if len(items) > CODE_MASK or len(orders) > CODE_MASK:
+            raise FujiImportError("Too many distinct orders/items for 32-bit codes")
+
+        # Previous lines and pairs re-encoded against the merged vocabularies
+        old_lines = state['lines']
+        old_lines = (_remap(np, old_lines >> CODE_BITS, state['orders'], orders) << CODE_BITS) | \
+            _remap(np, old_lines & CODE_MASK, state['items'], items)
+        item_map = np.searchsorted(items, state['items']).astype(np.int64)
+        old_pairs = state['pair_keys']
+        old_pairs = (item_map[old_pairs >> CODE_BITS] << CODE_BITS) | item_map[old_pairs & CODE_MASK] \
+            if len(old_pairs) else old_pairs
+        item_counts = np.zeros(len(items), dtype=np.int64)
+        item_counts[item_map] = state['item_counts']
+
+        new_lines = np.unique(
+            (np.searchsorted(orders, order_ids).astype(np.int64) << CODE_BITS)
+            | np.searchsorted(items, item_ids).astype(np.int64)
+        )
+
+        # Orders with any added or removed line get their basket recounted
+        changed = np.unique(np.setxor1d(old_lines, new_lines) >> CODE_BITS)
+        before = old_lines[np.isin(old_lines >> CODE_BITS, changed)]
+        after = new_lines[np.isin(new_lines >> CODE_BITS, changed)]
+
+        removed = _basket_pairs(np, before, max_basket)
+        added = _basket_pairs(np, after, max_basket)
+        pair_keys, pair_counts = _count(
+            np,
+            np.concatenate([old_pairs, removed, added]),
+            np.concatenate([state['pair_counts'], -np.ones(len(removed)), np.ones(len(added))]),
+        )
+        item_counts -= np.bincount(before & CODE_MASK, minlength=len(items))
+        item_counts += np.bincount(after & CODE_MASK, minlength=len(items))
+
+        self.state = {
+            'items': items,
+            'orders': orders,
+            'lines': new_lines,
+            'pair_keys': pair_keys,
+            'pair_counts': pair_counts,
+            'item_counts': item_counts,
+            'n_orders': len(np.unique(new_lines >> CODE_BITS)),
+        }
+        return len(changed)
+
+    def neighbors(self, top_k: int = 10, min_count: int = 1) -> Tuple:
+        """Top-k neighbours of every item by lift (then co-occurrence count)
+
+        Returns parallel arrays (item, neighbour, count, lift), grouped by item.
+        """
+        np = require('numpy')
+        keys, counts = self.state['pair_keys'], self.state['pair_counts']
+        keep = counts >= min_count
+        keys, counts = keys[keep], counts[keep]
+
+        # Both directions of each pair, then rank within each item
+        rows = np.concatenate([keys >> CODE_BITS, keys & CODE_MASK])
+        cols = np.concatenate([keys & CODE_MASK, keys >> CODE_BITS])
+        counts = np.concatenate([counts, counts])
+        item_counts = self.state['item_counts']
+        lift = counts * self.n_orders / (item_counts[rows] * item_counts[cols])
+
+        order = np.lexsort((cols, -counts, -lift, rows))
+        rows, cols, counts, lift = rows[order], cols[order], counts[order], lift[order]
+        rank = np.arange(len(rows)) - np.searchsorted(rows, rows, side='left')
+        keep = rank < top_k
+        return rows[keep], cols[keep], counts[keep], lift[keep]
+
+    def to_lookup(self, top_k: int = 10, min_count: int = 1) -> Dict:
+        """Per-item lookup table for the app"""
+        n_orders = self.n_orders
+        items, item_counts = self.state['items'], self.state['item_counts']
+
+        lookup = {}
+        for code, item_id in enumerate(items.tolist()):
+            count = int(item_counts[code])
+            if count:
+                lookup[item_id] = {'orders': count, 'support': round(count / n_orders, 6), 'neighbors': []}
+
+        for row, col, count, lift in zip(*(values.tolist() for values in self.neighbors(top_k, min_count))):
+            lookup[items[row]]['neighbors'].append({
+                'item': str(items[col]),
+                'orders': count,
+                'support': round(count / n_orders, 6),
+                'confidence': round(count / int(item_counts[row]), 6),
+                'lift': round(lift, 4),
+            })
+
+        return {
+            'orders': n_orders,
+            'pairs': int(len(self.state['pair_keys'])),
+            'top_k': top_k,
+            'min_count': min_count,
+            'items': lookup,
+        }
+
+
+def read_order_items(path: Path):
+    """order_id and item_id columns of the order items export"""
+    pd = require('pandas')
+    if not path.exists():
+        raise FujiImportError(f"{path} not found - run `fuji-import sales orders` first")
+    df = pd.read_csv(path, usecols=['order_id', 'item_id'], dtype=str, keep_default_na=False)
+    return df['order_id'].to_numpy(dtype=str), df['item_id'].to_numpy(dtype=str)
+
+
+def build_cooccurrence(data_dir: Path = DATA_DIR, top_k: int = 10, min_count: int = 1,
+                       full: bool = False, output: Optional[Path] = None) -> Dict:
+    """Update the stored matrix from the order items export and write the lookup"""
+    state_path = data_dir / STATE_FILE
+    output = output or data_dir / EXPORT_FILE
+
+    matrix = CooccurrenceMatrix.empty() if full else CooccurrenceMatrix.load(state_path)
+    order_ids, item_ids = read_order_items(data_dir / ORDER_ITEMS_FILE)
+    changed = matrix.update(order_ids, item_ids)
+    matrix.save(state_path)
+
+    lookup = matrix.to_lookup(top_k, min_count)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(lookup, f, separators=(',', ':'))
+
+    log.info("🧺 %s: %d items, %d pairs from %d orders (%d orders recounted)",
+             output.name, len(lookup['items']), lookup['pairs'], lookup['orders'], changed)
+    return lookup
@@ -0,0 +1,194 @@
+"""
+Shared helpers for the Fuji import tooling
+Paths, currency/column cleaning and lazy loading of optional packages
+
+Money is carried as integer cents from parsing to output; format_cents turns
+it back into "1234.56" only where it leaves the pipeline (CSV files, Supabase
+rows).
+"""
+
+import csv
+import importlib
+import re
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+DATA_DIR = REPO_ROOT / 'data'
+REFERENCE_DIR = REPO_ROOT / 'docs' / 'reference'
+
+GRAND_TOTALS_WORKBOOK = 'Grand_Totals_Sales_Summary.xlsx'
+SALES_WORKBOOK = 'Month_Year_SALES.xlsx'
+MENU_PDF = 'FUJI_menu.pdf'
+
+MONTH_MAP = {
+    'JAN': 1, 'FEB': 2, 'MAR': 3, 'APR': 4, 'MAY': 5, 'JUN': 6,
+    'JUL': 7, 'AUG': 8, 'SEP': 9, 'OCT': 10, 'NOV': 11, 'DEC': 12
+}
+
+# Export columns that stay text
+EXPORT_TEXT_COLUMNS = {
+    'id', 'date', 'day', 'day_1', 'month_name', 'original_month_string', 'sheet_name', 'transaction',
+    'order_date', 'type', 'server_id', 'status', 'payment_method', 'order_id', 'item_id', 'item_name',
+    'modifiers', 'special_instructions'
+}
+
+# Export columns holding plain integers; every other export column is money
+EXPORT_COUNT_COLUMNS = {
+    'year', 'month', 'row_index', 'no_of_days_closed', 'no_of_days_month', 'table_number', 'quantity'
+}
+
+
+class FujiImportError(Exception):
+    """Raised for problems the CLI should report and exit on"""
+
+
+def require(module_name: str):
+    """Import an optional heavy dependency on first use"""
+    try:
+        return importlib.import_module(module_name)
+    except ImportError as e:
+        raise FujiImportError(
+            f"Missing required package: {e}\n"
+            "📦 Please install requirements: pip install -r scripts/requirements.txt"
+        ) from e
+
+
+def is_missing(value) -> bool:
+    """Scalar null check equivalent to pd.isna, without importing pandas"""
+    if value is None:
+        return True
+    try:
+        return bool(value != value)
+    except (TypeError, ValueError):
+        return False
+
+
+def to_cents(value) -> int:
+    """Parse a workbook/CSV amount ("$1,234.56", "(12.50)", 31331.760000000002) into integer cents"""
+    if is_missing(value) or value == '' or value == 0:
+        return 0
+    if isinstance(value, int):
+        return value * 100
+    if isinstance(value, float):
+        # repr is the shortest round-tripping form, so 0.1 parses as 0.1, not 0.1000000000000000055
+        amount = Decimal(repr(float(value)))
+    else:
+        # Remove $ and commas, handle parentheses for negative values
+        cleaned = str(value).replace('$', '').replace(',', '').strip()
+        if cleaned.startswith('(') and cleaned.endswith(')'):
+            cleaned = '-' + cleaned[1:-1]
+        try:
+            amount = Decimal(cleaned)
+        except InvalidOperation:
+            return 0
+    if not amount.is_finite():
+        return 0
+    return int((amount * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def format_cents(cents) -> str:
+    """123456 -> '1234.56'; missing values become ''"""
+    if is_missing(cents):
+        return ''
+    cents = int(round(cents))
+    sign = '-' if cents < 0 else ''
+    return f"{sign}{abs(cents) // 100}.{abs(cents) % 100:02d}"
+
+
+def clean_currency(value) -> float:
+    """Remove $ signs and convert to float (rounded to whole cents)"""
+    return to_cents(value) / 100
+
+
+def is_money_column(column: str) -> bool:
+    """Whether an export column holds an amount (stored as cents)"""
+    return column not in EXPORT_TEXT_COLUMNS and column not in EXPORT_COUNT_COLUMNS
+
+
+def clean_column_name(col_name) -> str:
+    """Clean column names for database compatibility"""
+    if is_missing(col_name) or str(col_name).startswith('Unnamed:'):
+        return f"unnamed_column_{str(col_name).split(':')[-1] if ':' in str(col_name) else 'unknown'}"
+
+    # Convert to lowercase, replace spaces and special characters
+    cleaned = str(col_name).lower()
+    cleaned = re.sub(r'[^a-z0-9_]', '_', cleaned)
+    cleaned = re.sub(r'_+', '_', cleaned)  # Replace multiple underscores with single
+    cleaned = cleaned.strip('_')
+
+    return cleaned
+
+
+def parse_month_label(month_str: str) -> Optional[Tuple[int, int, str]]:
+    """Parse labels like "JAN 2021" into (year, month, month_name)
+
+    Returns None for labels whose month name is not recognised; raises
+    ValueError when the year part is not a number.
+    """
+    month_parts = month_str.split()
+    if len(month_parts) < 2:
+        return None
+
+    month_name = month_parts[0]
+    year = int(month_parts[1])
+    if month_name not in MONTH_MAP:
+        return None
+    return year, MONTH_MAP[month_name], month_name
+
+
+def parse_export_row(row: Dict, blank=None) -> Dict:
+    """Convert one export row of CSV strings in place: amounts to cents, counts to int"""
+    for key, value in row.items():
+        if key in EXPORT_TEXT_COLUMNS:
+            continue
+        if value == '':
+            row[key] = blank
+        elif key in EXPORT_COUNT_COLUMNS:
+            row[key] = int(float(value))
+        else:
+            row[key] = to_cents(value)
+    return row
+
+
+def read_export_rows(path: Path, blank=None) -> List[Dict]:
+    """Read one of the CSV exports in data/: amounts as integer cents, counts as int
+
+    Blank cells become `blank` (None maps to NULL when loading into Supabase).
+    """
+    with open(path, newline='', encoding='utf-8') as f:
+        return [parse_export_row(row, blank) for row in csv.DictReader(f)]
+
+
+def export_frame(df):
+    """Copy of an export DataFrame with the cents columns formatted as amounts"""
+    out = df.copy()
+    for column in out.columns:
+        if is_money_column(column):
+            out[column] = out[column].map(format_cents)
+    return out
+
+
+def write_export_text(text: str, path: Path) -> Optional[int]:
+    """Write the CSV text of an export; return its snapshot generation
+
+    A changeset against the previous snapshot is written next to it (see
+    changeset.py) and the rows are staged in staging.db (see staging.py).
+    Exports without an id column have no generation (None).
+    """
+    from .changeset import fingerprints_path, load_fingerprints, write_snapshot
+    from .staging import stage_export
+
+    header = write_snapshot(text, path)
+    stage_export(text, path)
+    if header is not None:
+        return header['generation']
+    # Unchanged snapshot: still the generation written last time
+    return load_fingerprints(path)['generation'] if fingerprints_path(path).exists() else None
+
+
+def write_export_csv(df, path: Path) -> Optional[int]:
+    """Write an export DataFrame, formatting the cents columns as amounts;
+    return its snapshot generation"""
+    return write_export_text(export_frame(df).to_csv(index=False), path)
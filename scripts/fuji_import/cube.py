@@ -0,0 +1,203 @@
+"""
+Item/category sales cube
+Pre-aggregates the historical order lines into item x period and category x
+period tables (quantity, revenue in cents, distinct orders) at day, week
+(Monday) and month grain, so the analytics views read a few hundred summary
+rows instead of scanning and joining every order line.
+
+The joins are vectorized pandas hash joins: order items -> orders (for the
+order date) -> menu items (for the name, category and category type). The
+order exports give items as `menu_item_NN`, NN being the item's position in
+fuji_menu_items.csv (its display order); ids that do not resolve are kept
+under an 'Unknown' category.
+
+The cube lives in staging.db (sales_cube_<level>_<grain> tables, indexed on
+period) next to the staged exports. Each day's joined lines are fingerprinted
+(an xor of row hashes, kept in _sales_cube_days), and a rerun only recomputes
+the days, weeks and months containing a day whose lines changed, appeared or
+disappeared; a menu rename or recategorisation changes the fingerprints of
+the days that sold the item.
+"""
+
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, List
+
+from .core import DATA_DIR, FujiImportError, require, to_cents
+from .logs import get_logger
+from .staging import StagingStore
+
+log = get_logger('cube')
+
+ORDERS_FILE = 'historical_orders.csv'
+ORDER_ITEMS_FILE = 'historical_order_items.csv'
+MENU_FILE = 'fuji_menu_items.csv'
+STATE_TABLE = '_sales_cube_days'
+
+# Item ids written by sales.process_detailed_transactions
+ITEM_ID_FORMAT = 'menu_item_{:02d}'
+UNKNOWN = 'Unknown'
+
+GRAINS = ['day', 'week', 'month']
+LEVELS = {
+    'item': ['period', 'item_id', 'item_name', 'category', 'category_type', 'quantity', 'revenue', 'orders'],
+    'category': ['period', 'category', 'category_type', 'quantity', 'revenue', 'orders', 'items'],
+}
+TEXT_COLUMNS = {'id', 'period', 'item_id', 'item_name', 'category', 'category_type'}
+
+# Columns that identify a line's contribution to the cube
+FINGERPRINT_COLUMNS = ['id', 'order_id', 'item_id', 'quantity', 'unit_price', 'item_name', 'category', 'category_type']
+
+
+def cube_table(level: str, grain: str) -> str:
+    return f'sales_cube_{level}_{grain}'
+
+
+def period_start(day: str, grain: str) -> str:
+    """Start of the week (Monday) or month containing a YYYY-MM-DD day"""
+    value = date.fromisoformat(day)
+    if grain == 'week':
+        return (value - timedelta(days=value.weekday())).isoformat()
+    if grain == 'month':
+        return value.replace(day=1).isoformat()
+    return day
+
+
+def _read_export(data_dir: Path, filename: str, columns: List[str]):
+    """Columns of an export, from the staging store when it is current
+    (amounts already in cents), else parsed from the CSV"""
+    pd = require('pandas')
+    path = data_dir / filename
+    if not path.exists():
+        raise FujiImportError(f"{path} not found - run `fuji-import sales orders` first")
+
+    with StagingStore.for_dir(data_dir) as store:
+        if store.is_current(path.stem, path):
+            names = ', '.join(f'"{col}"' for col in columns)
+            return pd.read_sql_query(f'SELECT {names} FROM "{path.stem}"', store.conn)
+
+    df = pd.read_csv(path, usecols=columns, dtype=str, keep_default_na=False)
+    if 'quantity' in df:
+        df['quantity'] = pd.to_numeric(df['quantity'], errors='coerce').fillna(0).astype('int64')
+    if 'unit_price' in df:
+        # The same half-up parse the staging store applied
+        df['unit_price'] = df['unit_price'].map(to_cents).astype('int64')
+    return df
+
+
+def _read_menu(data_dir: Path):
+    pd = require('pandas')
+    path = data_dir / MENU_FILE
+    if not path.exists():
+        raise FujiImportError(f"{path} not found - run `fuji-import menu extract` first")
+    menu = pd.read_csv(path, usecols=['name', 'category', 'category_type'], dtype=str, keep_default_na=False)
+    menu['item_id'] = [ITEM_ID_FORMAT.format(position) for position in range(1, len(menu) + 1)]
+    return menu.rename(columns={'name': 'item_name'})
+
+
+def order_lines(data_dir: Path = DATA_DIR):
+    """Order lines joined with their order date and menu item, plus their
+    revenue in cents and the week/month they fall in"""
+    pd = require('pandas')
+    items = _read_export(data_dir, ORDER_ITEMS_FILE, ['id', 'order_id', 'item_id', 'quantity', 'unit_price'])
+    orders = _read_export(data_dir, ORDERS_FILE, ['id', 'order_date'])
+
+    lines = items.merge(orders.rename(columns={'id': 'order_id'}), on='order_id', how='inner')
+    lines = lines.merge(_read_menu(data_dir), on='item_id', how='left')
+    lines['item_name'] = lines['item_name'].fillna(lines['item_id'])
+    lines[['category', 'category_type']] = lines[['category', 'category_type']].fillna(UNKNOWN)
+    lines['revenue'] = lines['quantity'] * lines['unit_price']
+
+    dates = pd.to_datetime(lines['order_date'])
+    lines['day'] = dates.dt.strftime('%Y-%m-%d')
+    lines['week'] = (dates - pd.to_timedelta(dates.dt.weekday, unit='D')).dt.strftime('%Y-%m-%d')
+    lines['month'] = dates.dt.strftime('%Y-%m-01')
+    return lines
+
+
+def day_fingerprints(lines) -> Dict[str, int]:
+    """{day: xor of its lines' 64-bit row hashes} (as signed ints for SQLite)"""
+    pd = require('pandas')
+    np = require('numpy')
+    if lines.empty:
+        return {}
+    lines = lines.sort_values('day', kind='stable')
+    hashes = pd.util.hash_pandas_object(lines[FINGERPRINT_COLUMNS], index=False).to_numpy()
+    days = lines['day'].to_numpy()
+    starts = np.flatnonzero(np.r_[True, days[1:] != days[:-1]])
+    digests = np.bitwise_xor.reduceat(hashes, starts).view(np.int64)
+    return dict(zip(days[starts].tolist(), digests.tolist()))
+
+
+def _aggregate(lines, grain: str, level: str):
+    """Cube rows of one level and grain for the given lines"""
+    if level == 'item':
+        keys = [grain, 'item_id']
+        extra = {'item_name': ('item_name', 'first'), 'category': ('category', 'first'),
+                 'category_type': ('category_type', 'first')}
+        distinct = {}
+    else:
+        keys = [grain, 'category', 'category_type']
+        extra = {}
+        distinct = {'items': ('item_id', 'nunique')}
+
+    cube = lines.groupby(keys, sort=True).agg(
+        **extra,
+        quantity=('quantity', 'sum'),
+        revenue=('revenue', 'sum'),
+        orders=('order_id', 'nunique'),
+        **distinct,
+    ).reset_index().rename(columns={grain: 'period'})
+    cube.insert(0, 'id', cube['period'] + '|' + cube[keys[1]])
+    return cube[['id'] + LEVELS[level]]
+
+
+def build_cube(data_dir: Path = DATA_DIR, full: bool = False) -> Dict:
+    """Bring the sales cube in staging.db up to date with the order exports"""
+    lines = order_lines(data_dir)
+    current = day_fingerprints(lines)
+
+    with StagingStore.for_dir(data_dir) as store:
+        store.conn.execute(f"CREATE TABLE IF NOT EXISTS {STATE_TABLE} (day TEXT PRIMARY KEY, fingerprint INTEGER)")
+        previous = {} if full else {
+            row['day']: row['fingerprint'] for row in store.query(f"SELECT day, fingerprint FROM {STATE_TABLE}")
+        }
+        changed = sorted(day for day in set(current) | set(previous) if current.get(day) != previous.get(day))
+
+        written = 0
+        if full:
+            with store.transaction():
+                for table in [cube_table(level, grain) for grain in GRAINS for level in LEVELS]:
+                    store.conn.execute(f'DROP TABLE IF EXISTS "{table}"')
+                store.conn.execute(f"DELETE FROM {STATE_TABLE}")
+        if changed:
+            # Deleted days count too: their week and month lost lines
+            affected = {grain: sorted({period_start(day, grain) for day in changed}) for grain in GRAINS}
+            for grain in GRAINS:
+                subset = lines[lines[grain].isin(affected[grain])]
+                for level in LEVELS:
+                    cube = _aggregate(subset, grain, level)
+                    columns = list(cube.columns)
+                    written += store.replace_partitions(
+                        cube_table(level, grain), columns, cube.to_dict('records'), 'period', affected[grain],
+                        types={col: 'TEXT' if col in TEXT_COLUMNS else 'INTEGER' for col in columns},
+                    )
+
+            # Fingerprints last: an interrupted refresh is redone on the next run
+            with store.transaction():
+                store.conn.executemany(f"DELETE FROM {STATE_TABLE} WHERE day = ?",
+                                       [(day,) for day in changed if day not in current])
+                store.conn.executemany(f"INSERT OR REPLACE INTO {STATE_TABLE} VALUES (?, ?)",
+                                       [(day, current[day]) for day in changed if day in current])
+
+        tables = {
+            cube_table(level, grain): store.conn.execute(
+                f'SELECT count(*) FROM "{cube_table(level, grain)}"').fetchone()[0]
+            for grain in GRAINS for level in LEVELS if cube_table(level, grain) in store.tables()
+        }
+
+    log.info("🧊 Sales cube: %d order lines over %d days, %d days recomputed, %d rows written",
+             len(lines), len(current), len(changed), written)
+    return {'lines': len(lines), 'days': len(current), 'changed_days': len(changed), 'written': written,
+            'tables': tables}
+
@@ -0,0 +1,125 @@
+"""
+Dashboard materialized view refresh
+monthly_sales_trend, daily_transaction_summary and complete_sales_overview are
+materialized views over the historical_* tables (migration
+011_materialized_dashboard_views.sql). After a load, only the views reading a
+table that took new data are refreshed, each through refresh_dashboard_view()
+(REFRESH ... CONCURRENTLY, so dashboards keep reading while it runs), in
+parallel. The database logs every refresh in dashboard_view_refreshes.
+
+Which loads a refresh has seen is kept in .dashboard_views.json: the snapshot
+generation of each historical table at the last successful refresh (see
+changeset.loaded_generation), plus the last timings.
+"""
+
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from .changeset import loaded_generation
+from .core import DATA_DIR, FujiImportError
+from .logs import get_logger
+from .supabase_client import execute_with_retry
+from .verify import HISTORICAL_EXPORTS
+
+log = get_logger('dashboard')
+
+STATE_FILE = '.dashboard_views.json'
+
+# Materialized view -> historical tables it reads
+DASHBOARD_VIEWS = {
+    'monthly_sales_trend': ['historical_monthly_summary'],
+    'daily_transaction_summary': ['historical_transactions'],
+    'complete_sales_overview': ['historical_monthly_summary', 'historical_daily_summary', 'historical_transactions'],
+}
+
+
+def affected_views(tables: Iterable[str]) -> List[str]:
+    """Views reading any of the given tables"""
+    tables = set(tables)
+    return [view for view, sources in DASHBOARD_VIEWS.items() if tables & set(sources)]
+
+
+def _load_state(data_dir: Path) -> Dict:
+    path = data_dir / STATE_FILE
+    if not path.exists():
+        return {'generations': {}, 'refreshes': []}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _loaded_generations(data_dir: Path) -> Dict[str, Optional[int]]:
+    return {table: loaded_generation(data_dir / filename, table) for table, filename in HISTORICAL_EXPORTS.items()}
+
+
+def changed_tables(data_dir: Path = DATA_DIR) -> List[str]:
+    """Historical tables loaded since the views were last refreshed"""
+    seen = _load_state(data_dir)['generations']
+    return [table for table, generation in _loaded_generations(data_dir).items()
+            if generation is not None and seen.get(table) != generation]
+
+
+def refresh_view(client, view: str, retries: int = 2) -> Dict:
+    """Refresh one view; returns its database-side duration and row count plus the round trip"""
+    started = time.perf_counter()
+    result = execute_with_retry(client.rpc('refresh_dashboard_view', {'p_view': view}), retries)
+    row = (result.data or [{}])[0]
+    return {
+        'view': view,
+        'duration_ms': float(row.get('duration_ms') or 0),
+        'rows': int(row.get('row_count') or 0),
+        'elapsed_ms': round((time.perf_counter() - started) * 1000, 1),
+    }
+
+
+def refresh_views(client, views: Iterable[str], workers: Optional[int] = None, retries: int = 2) -> List[Dict]:
+    """Refresh views in parallel, one request each"""
+    views = list(dict.fromkeys(views))
+    unknown = [view for view in views if view not in DASHBOARD_VIEWS]
+    if unknown:
+        raise FujiImportError(f"Unknown dashboard view(s) {', '.join(unknown)} (available: {', '.join(DASHBOARD_VIEWS)})")
+    if not views:
+        return []
+    with ThreadPoolExecutor(max_workers=workers or len(views)) as pool:
+        return list(pool.map(lambda view: refresh_view(client, view, retries), views))
+
+
+def refresh_after_load(client, data_dir: Path = DATA_DIR, views: Optional[Iterable[str]] = None) -> List[Dict]:
+    """Refresh the views affected by loads since the last refresh (or the
+    given views) and record the loaded generations they now reflect"""
+    generations = _loaded_generations(data_dir)
+    targets = list(views) if views is not None else affected_views(changed_tables(data_dir))
+    results = refresh_views(client, targets)
+
+    # A table counts as seen once every view reading it has been refreshed
+    state = _load_state(data_dir)
+    refreshed = set(targets)
+    state['generations'].update({
+        table: generation for table, generation in generations.items()
+        if generation is not None and set(affected_views([table])) <= refreshed
+    })
+    if results:
+        state['refreshes'] = [{**result, 'at': time.strftime('%Y-%m-%dT%H:%M:%S')} for result in results]
+    path = data_dir / STATE_FILE
+    tmp = path.with_name(path.name + '.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+    tmp.replace(path)
+
+    for result in results:
+        log.info("   🔄 %s: %d rows refreshed in %.1f ms (%.1f ms round trip)", result['view'], result['rows'],
+                 result['duration_ms'], result['elapsed_ms'])
+    if not results:
+        log.info("   🔄 Dashboard views are up to date")
+    return results
+
+
+def emulate_refresh_dashboard_view(tables: Dict[str, List[Dict]], params: Dict) -> List[Dict]:
+    """refresh_dashboard_view() for FakeSupabase: reports the source row count"""
+    view = params['p_view']
+    if view not in DASHBOARD_VIEWS:
+        raise FujiImportError(f"Unknown dashboard view: {view}")
+    rows = sum(len(tables.get(table, [])) for table in DASHBOARD_VIEWS[view])
+    return [{'view_name': view, 'duration_ms': 0.0, 'row_count': rows}]
@@ -0,0 +1,278 @@
+"""
+In-process stand-in for the Supabase table API
+Implements the slice of the supabase-py query builder the importers use
+(select/eq/neq/gte/lt/in_/order/limit/range, insert/upsert/update/delete,
+rpc, execute) over in-memory tables, with configurable latency, bandwidth and concurrency limits,
+random error injection and request/byte accounting.
+"""
+
+import json
+import random
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List, Optional
+
+
+class FakeAPIError(Exception):
+    """Raised by execute() for injected and constraint errors, like postgrest's APIError"""
+
+    def __init__(self, message: str, code: str = '503'):
+        super().__init__(message)
+        self.code = code
+
+
+class FakeResponse:
+    """What execute() returns: the affected/selected rows and an optional count"""
+
+    def __init__(self, data: List[Dict], count: Optional[int] = None):
+        self.data = data
+        self.count = count
+
+
+class RequestStats:
+    """Counters for everything sent to and received from the fake"""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.rows_written = 0
+        self.by_operation: Dict[str, int] = {}
+
+    def as_dict(self) -> Dict:
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'bytes_sent': self.bytes_sent,
+            'bytes_received': self.bytes_received,
+            'rows_written': self.rows_written,
+            'by_operation': dict(sorted(self.by_operation.items())),
+        }
+
+
+def _size(payload) -> int:
+    return len(json.dumps(payload, default=str).encode('utf-8')) if payload is not None else 0
+
+
+class FakeQuery:
+    """One request being built, mirroring supabase-py's chained builder"""
+
+    def __init__(self, server: 'FakeSupabase', table: str):
+        self.server = server
+        self.table = table
+        self.operation = 'select'
+        self.columns: Optional[List[str]] = None
+        self.count_mode: Optional[str] = None
+        self.payload = None
+        self.on_conflict = 'id'
+        self.filters: List = []
+        self.order_by = None
+        self.limit_rows: Optional[int] = None
+        self.offset = 0
+
+    def select(self, columns: str = '*', count: Optional[str] = None) -> 'FakeQuery':
+        self.operation = 'select'
+        self.columns = None if columns.strip() == '*' else [col.strip() for col in columns.split(',')]
+        self.count_mode = count
+        return self
+
+    def insert(self, rows) -> 'FakeQuery':
+        self.operation = 'insert'
+        self.payload = rows if isinstance(rows, list) else [rows]
+        return self
+
+    def upsert(self, rows, on_conflict: str = 'id') -> 'FakeQuery':
+        self.operation = 'upsert'
+        self.payload = rows if isinstance(rows, list) else [rows]
+        self.on_conflict = on_conflict
+        return self
+
+    def update(self, values: Dict) -> 'FakeQuery':
+        self.operation = 'update'
+        self.payload = values
+        return self
+
+    def delete(self) -> 'FakeQuery':
+        self.operation = 'delete'
+        return self
+
+    def eq(self, column: str, value) -> 'FakeQuery':
+        self.filters.append(lambda row: row.get(column) == value)
+        return self
+
+    def neq(self, column: str, value) -> 'FakeQuery':
+        self.filters.append(lambda row: row.get(column) != value)
+        return self
+
+    def gte(self, column: str, value) -> 'FakeQuery':
+        self.filters.append(lambda row: row.get(column) is not None and row.get(column) >= value)
+        return self
+
+    def lt(self, column: str, value) -> 'FakeQuery':
+        self.filters.append(lambda row: row.get(column) is not None and row.get(column) < value)
+        return self
+
+    def in_(self, column: str, values) -> 'FakeQuery':
+        values = set(values)
+        self.filters.append(lambda row: row.get(column) in values)
+        return self
+
+    def order(self, column: str, desc: bool = False) -> 'FakeQuery':
+        self.order_by = (column, desc)
+        return self
+
+    def limit(self, rows: int) -> 'FakeQuery':
+        self.limit_rows = rows
+        return self
+
+    def range(self, start: int, end: int) -> 'FakeQuery':
+        """Rows start..end inclusive, like PostgREST's Range header"""
+        self.offset = start
+        self.limit_rows = end - start + 1
+        return self
+
+    def matches(self, row: Dict) -> bool:
+        return all(check(row) for check in self.filters)
+
+    def execute(self) -> FakeResponse:
+        return self.server.execute(self)
+
+
+class FakeSupabase:
+    """Drop-in for a supabase Client as far as the importers are concerned
+
+    latency is seconds per request (plus up to `jitter` more), bandwidth is
+    bytes per second in each direction, max_concurrency caps requests served
+    at once and error_rate is the chance a request fails with a 503 before it
+    touches any data. Database functions called through rpc() are registered
+    in `functions` as callables taking (tables, params) and returning rows.
+    """
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, bandwidth: Optional[float] = None,
+                 max_concurrency: Optional[int] = None, error_rate: float = 0.0, seed: Optional[int] = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.bandwidth = bandwidth
+        self.error_rate = error_rate
+        self.tables: Dict[str, List[Dict]] = {}
+        self.functions: Dict[str, Callable[[Dict[str, List[Dict]], Dict], List[Dict]]] = {}
+        self.stats = RequestStats()
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_concurrency) if max_concurrency else None
+
+    def table(self, name: str) -> FakeQuery:
+        return FakeQuery(self, name)
+
+    def rpc(self, name: str, params: Optional[Dict] = None) -> FakeQuery:
+        query = FakeQuery(self, name)
+        query.operation = 'rpc'
+        query.payload = params or {}
+        return query
+
+    def _transfer_time(self, size: int) -> float:
+        return size / self.bandwidth if self.bandwidth else 0.0
+
+    def execute(self, query: FakeQuery) -> FakeResponse:
+        sent = _size(query.payload) + len(query.table) + 64  # rough URL/header overhead
+        if self._slots:
+            self._slots.acquire()
+        try:
+            with self._lock:
+                delay = self.latency + self._random.uniform(0, self.jitter) + self._transfer_time(sent)
+                fail = self._random.random() < self.error_rate
+                self.stats.requests += 1
+                self.stats.bytes_sent += sent
+                key = f"{query.operation} {query.table}"
+                self.stats.by_operation[key] = self.stats.by_operation.get(key, 0) + 1
+            time.sleep(delay)
+
+            with self._lock:
+                if fail:
+                    self.stats.errors += 1
+                    raise FakeAPIError(f"Injected failure on {query.operation} {query.table}")
+                try:
+                    response = self._apply(query)
+                except FakeAPIError:
+                    self.stats.errors += 1
+                    raise
+                received = _size(response.data)
+                self.stats.bytes_received += received
+            time.sleep(self._transfer_time(received))
+            return response
+        finally:
+            if self._slots:
+                self._slots.release()
+
+    def _apply(self, query: FakeQuery) -> FakeResponse:
+        if query.operation == 'rpc':
+            if query.table not in self.functions:
+                raise FakeAPIError(f"Could not find the function public.{query.table}", 'PGRST202')
+            return FakeResponse(self.functions[query.table](self.tables, query.payload))
+
+        rows = self.tables.setdefault(query.table, [])
+
+        if query.operation == 'select':
+            selected = [row for row in rows if query.matches(row)]
+            if query.order_by:
+                column, desc = query.order_by
+                selected.sort(key=lambda row: (row.get(column) is None, row.get(column)), reverse=desc)
+            count = len(selected) if query.count_mode else None
+            selected = selected[query.offset:]
+            if query.limit_rows is not None:
+                selected = selected[:query.limit_rows]
+            if query.columns:
+                selected = [{col: row.get(col) for col in query.columns} for row in selected]
+            else:
+                selected = [dict(row) for row in selected]
+            return FakeResponse(selected, count)
+
+        if query.operation == 'insert':
+            existing = {row.get('id') for row in rows}
+            new_rows = []
+            for record in query.payload:
+                row = dict(record)
+                row.setdefault('id', str(uuid.uuid4()))
+                if row['id'] in existing:
+                    raise FakeAPIError(f"duplicate key value violates unique constraint \"{query.table}_pkey\"", '23505')
+                existing.add(row['id'])
+                new_rows.append(row)
+            rows.extend(new_rows)
+            self.stats.rows_written += len(new_rows)
+            return FakeResponse([dict(row) for row in new_rows])
+
+        if query.operation == 'upsert':
+            keys = [col.strip() for col in query.on_conflict.split(',')]
+            index = {tuple(row.get(col) for col in keys): row for row in rows}
+            written = []
+            for record in query.payload:
+                key = tuple(record.get(col) for col in keys)
+                if key in index:
+                    index[key].update(record)
+                    written.append(index[key])
+                else:
+                    row = dict(record)
+                    row.setdefault('id', str(uuid.uuid4()))
+                    rows.append(row)
+                    index[key] = row
+                    written.append(row)
+            self.stats.rows_written += len(written)
+            return FakeResponse([dict(row) for row in written])
+
+        if query.operation == 'update':
+            updated = [row for row in rows if query.matches(row)]
+            for row in updated:
+                row.update(query.payload)
+            self.stats.rows_written += len(updated)
+            return FakeResponse([dict(row) for row in updated])
+
+        if query.operation == 'delete':
+            deleted = [row for row in rows if query.matches(row)]
+            self.tables[query.table] = [row for row in rows if not query.matches(row)]
+            self.stats.rows_written += len(deleted)
+            return FakeResponse(deleted)
+
+        raise FakeAPIError(f"Unsupported operation '{query.operation}'", '400')
@@ -0,0 +1,153 @@
+"""
+Sheet layout detection
+The sales workbooks mix several regions on each sheet: the data block, header
+rows repeated or continued inside the sheet ("MONTH", "DAY"/"DATE",
+"CASH/CR"/"NET AMOUNT"), totals and footer rows, and side tables that repeat
+the key columns further right (DAY.1/DATE.1 on the monthly summary sheet,
+MONTH.1 on the Grand Totals sheet).
+
+detect_layout classifies every row of a sheet once, with column-wise masks on
+its key column, instead of each exporter testing every row against its own
+sentinels:
+
+    data    the key column holds a valid key (month label, date, number)
+    header  the key is other text, or the row repeats the column labels
+    totals  no key, but amounts in other columns (totals, footer figures)
+    blank   everything else
+
+Exporters then slice the data block with SheetLayout.data(), and quarantine
+its stray rows: amounts outside the data block, in totals rows or under a key
+that does not parse.
+"""
+
+import re
+from typing import Dict, List, Optional
+
+from .core import MONTH_MAP, FujiImportError, require
+
+KEY_KINDS = ['month', 'date', 'number']
+
+MONTH_LABEL = re.compile(r'^(?:{})\s+\S'.format('|'.join(re.escape(name) for name in MONTH_MAP)))
+
+# A column repeating an earlier one: "DAY.1" (pandas) or "day_1" (cleaned)
+MIRROR_COLUMN = re.compile(r'^(.+?)[._](\d+)$')
+
+
+class SheetLayout:
+    """Row regions and side tables of one sheet"""
+
+    def __init__(self, name: str, key: str, kind: str, header_rows: List[int], data_rows: List[int],
+                 total_rows: List[int], stray_rows: List[int], side_tables: List[Dict[str, str]],
+                 sheet_date=None):
+        self.name = name
+        self.key = key
+        self.kind = kind
+        self.header_rows = header_rows
+        self.data_rows = data_rows
+        self.total_rows = total_rows
+        # Rows outside the data block that hold amounts (column label rows aside)
+        self.stray_rows = stray_rows
+        # One {side column: main column it repeats (or None)} mapping per side table
+        self.side_tables = side_tables
+        self.sheet_date = sheet_date
+
+    def data(self, df):
+        """The data block (original index labels kept)"""
+        return df.iloc[self.data_rows]
+
+    def strays(self, df):
+        """The stray rows (original index labels kept)"""
+        return df.iloc[self.stray_rows]
+
+    def mirrors(self, column: str) -> List[str]:
+        """Side table columns that repeat `column`"""
+        return [side for table in self.side_tables for side, main in table.items() if main == column]
+
+    def summary(self) -> Dict:
+        return {
+            'sheet': self.name,
+            'key': self.key,
+            'header_rows': self.header_rows,
+            'data_rows': len(self.data_rows),
+            'first_data_row': self.data_rows[0] if self.data_rows else None,
+            'last_data_row': self.data_rows[-1] if self.data_rows else None,
+            'total_rows': self.total_rows,
+            'stray_rows': self.stray_rows,
+            'side_tables': [list(table) for table in self.side_tables],
+            'sheet_date': self.sheet_date.strftime('%Y-%m-%d') if self.sheet_date is not None else None,
+        }
+
+
+def _dates(pd, column):
+    """Cells holding dates, as timestamps (NaT elsewhere; numbers are not dates)"""
+    return pd.to_datetime(column.where(pd.to_numeric(column, errors='coerce').isna()), errors='coerce')
+
+
+def key_mask(column, kind: str):
+    """Rows whose key cell is a valid key of the given kind"""
+    pd = require('pandas')
+    if kind == 'month':
+        return column.notna() & column.astype(str).str.strip().str.match(MONTH_LABEL)
+    if kind == 'date':
+        return _dates(pd, column).notna()
+    if kind == 'number':
+        return pd.to_numeric(column, errors='coerce').notna()
+    raise FujiImportError(f"Unknown key kind '{kind}' (use {', '.join(KEY_KINDS)})")
+
+
+def find_side_tables(columns) -> List[Dict[str, str]]:
+    """Blocks of columns starting at a column that repeats an earlier one,
+    running to the next such block or the end of the sheet"""
+    names = [str(col) for col in columns]
+    tables: List[Dict[str, str]] = []
+    previous = None
+    for position, name in enumerate(names):
+        match = MIRROR_COLUMN.match(name)
+        main = match.group(1) if match and match.group(1) in names[:position] else None
+        if main is not None and previous is None:
+            tables.append({})
+        if tables:
+            tables[-1][name] = main
+        previous = main
+    return tables
+
+
+def detect_layout(df, key: str, kind: str, name: str = '', date_column: Optional[str] = None) -> SheetLayout:
+    """Classify the rows of a sheet by its key column
+
+    `date_column`, when given, is searched outside the data block for the
+    sheet's own date (the daily sheets carry it in their second header row).
+    """
+    pd = require('pandas')
+    np = require('numpy')
+    if key not in df.columns:
+        raise FujiImportError(f"Sheet {name or '?'} has no '{key}' column")
+
+    keys = df[key]
+    data = key_mask(keys, kind).to_numpy(dtype=bool)
+
+    # Text in the key column, or a row repeating at least two column labels
+    labels = np.array([str(col).strip().upper() for col in df.columns], dtype=object)
+    cells = df.astype(str).apply(lambda column: column.str.strip().str.upper()).to_numpy(dtype=object)
+    repeats = (cells == labels).sum(axis=1) >= 2
+    key_text = (keys.notna() & pd.to_numeric(keys, errors='coerce').isna()).to_numpy(dtype=bool)
+    header = ~data & (key_text | repeats)
+
+    values = df.drop(columns=[key]).apply(lambda column: pd.to_numeric(column, errors='coerce'))
+    amounts = values.notna().any(axis=1).to_numpy(dtype=bool)
+    totals = ~data & ~header & amounts
+
+    sheet_date = None
+    if date_column is not None and date_column in df.columns:
+        dates = _dates(pd, df[date_column])[~data].dropna()
+        sheet_date = dates.iloc[0] if len(dates) else None
+
+    return SheetLayout(
+        name, key, kind,
+        header_rows=np.flatnonzero(header).tolist(),
+        data_rows=np.flatnonzero(data).tolist(),
+        total_rows=np.flatnonzero(totals).tolist(),
+        stray_rows=np.flatnonzero(~data & ~repeats & amounts).tolist(),
+        side_tables=find_side_tables(df.columns),
+        sheet_date=sheet_date,
+    )
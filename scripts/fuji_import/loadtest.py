@@ -0,0 +1,142 @@
+"""
+Offline load-test harness for the Supabase loaders
+Runs the menu and historical loaders against FakeSupabase with a given
+latency/error profile and reports requests, bytes and wall time per batch
+size, so batching, concurrency and retry settings can be compared without a
+live project. The verify scenario measures checksum verification of already
+loaded historical tables.
+
+Only the historical loads take the workers/retries settings (the menu loader
+sends its requests one at a time, without retries, and verification ignores
+the batch size too); settings a scenario does not use are reported as "-".
+"""
+
+import contextlib
+import io
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+from .core import DATA_DIR, FujiImportError
+from .fake_supabase import FakeSupabase
+from .staging import export_rows
+from .verify import HISTORICAL_EXPORTS
+
+SCENARIOS = ['menu', 'historical', 'verify']
+
+# Settings each scenario's loader honours
+SCENARIO_SETTINGS = {
+    'menu': ['batch_size'],
+    'historical': ['batch_size', 'workers', 'retries'],
+    'verify': [],
+}
+
+
+def _run_menu(client, data_dir: Path, batch_size: int, workers: int, retries: int, backoff: float) -> int:
+    from .menu import read_menu_csv
+    from .menu_loader import MenuLoader
+
+    menu_csv = data_dir / 'fuji_menu_items.csv'
+    if not menu_csv.exists():
+        raise FujiImportError(f"{menu_csv} not found - run `fuji-import menu extract` first")
+
+    menu_items = read_menu_csv(menu_csv)
+    loader = MenuLoader(client)
+    return loader.import_menu_items(menu_items, loader.get_or_create_categories(menu_items), batch_size)
+
+
+def _run_historical(client, data_dir: Path, batch_size: int, workers: int, retries: int, backoff: float) -> int:
+    from .supabase_client import push_delta
+
+    rows = 0
+    for table, filename in HISTORICAL_EXPORTS.items():
+        path = data_dir / filename
+        if not path.exists():
+            raise FujiImportError(f"{path} not found - run `fuji-import sales monthly daily transactions` first")
+        records = export_rows(path)
+        push_delta(client, table, records, [], batch_size, workers, retries, backoff)
+        rows += len(records)
+    return rows
+
+
+def _run_verify(client, data_dir: Path, batch_size: int, workers: int, retries: int, backoff: float) -> int:
+    from .supabase_client import to_table_row
+    from .verify import emulate_table_checksums, verify_exports
+
+    # Seed the tables directly so only the verification requests are counted
+    rows = 0
+    for table, filename in HISTORICAL_EXPORTS.items():
+        path = data_dir / filename
+        if not path.exists():
+            raise FujiImportError(f"{path} not found - run `fuji-import sales monthly daily transactions` first")
+        client.tables[table] = [to_table_row(record) for record in export_rows(path)]
+        rows += len(client.tables[table])
+    client.functions['table_checksums'] = emulate_table_checksums
+
+    results = verify_exports(client, data_dir)
+    failed = [result['table'] for result in results if not result['ok']]
+    if failed:
+        raise RuntimeError(f"verification failed for {', '.join(failed)}")
+    return rows
+
+
+RUNNERS = {'menu': _run_menu, 'historical': _run_historical, 'verify': _run_verify}
+
+
+def run_load_test(scenario: str, data_dir: Path = DATA_DIR, batch_size: int = 500, workers: int = 1,
+                  retries: int = 0, backoff: float = 0.1, **fake_options) -> Dict:
+    """Run one scenario against a fresh fake and return its measurements"""
+    if scenario not in RUNNERS:
+        raise FujiImportError(f"Unknown scenario '{scenario}' (use {', '.join(SCENARIOS)})")
+
+    client = FakeSupabase(**fake_options)
+    error = None
+    rows = 0
+    started = time.perf_counter()
+    try:
+        # The loaders narrate every batch; keep the report readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            rows = RUNNERS[scenario](client, data_dir, batch_size, workers, retries, backoff)
+    except FujiImportError:
+        raise
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    wall_time = time.perf_counter() - started
+
+    settings = {'batch_size': batch_size, 'workers': workers, 'retries': retries}
+    return {
+        'scenario': scenario,
+        **{name: value if name in SCENARIO_SETTINGS[scenario] else None for name, value in settings.items()},
+        'rows': rows,
+        'wall_seconds': round(wall_time, 3),
+        'error': error,
+        **client.stats.as_dict(),
+    }
+
+
+def run_matrix(scenarios: Iterable[str], batch_sizes: Iterable[int], **options) -> List[Dict]:
+    """Run every scenario at every batch size (once, if it takes no batch size)"""
+    batch_sizes = list(batch_sizes)
+    results = []
+    for scenario in scenarios:
+        if scenario in SCENARIO_SETTINGS and 'batch_size' not in SCENARIO_SETTINGS[scenario]:
+            results.append(run_load_test(scenario, batch_size=batch_sizes[0], **options))
+            continue
+        results.extend(run_load_test(scenario, batch_size=batch_size, **options) for batch_size in batch_sizes)
+    return results
+
+
+def _setting(value) -> str:
+    return '-' if value is None else str(value)
+
+
+def print_report(results: List[Dict]):
+    print(f"{'scenario':<11} {'batch':>6} {'workers':>7} {'retries':>7} {'rows':>6} {'requests':>8} {'errors':>6} "
+          f"{'sent KB':>9} {'recv KB':>9} {'wall s':>8}")
+    for r in results:
+        print(f"{r['scenario']:<11} {_setting(r['batch_size']):>6} {_setting(r['workers']):>7} "
+              f"{_setting(r['retries']):>7} {r['rows']:>6} {r['requests']:>8} "
+              f"{r['errors']:>6} {r['bytes_sent'] / 1024:>9.1f} {r['bytes_received'] / 1024:>9.1f} "
+              f"{r['wall_seconds']:>8.3f}")
+        if r['error']:
+            print(f"   ❌ {r['error']}")
@@ -0,0 +1,146 @@
+"""
+Logging and quarantine for the import loops
+Progress goes through a leveled logger whose per-message rate limit keeps hot
+loops from flooding the terminal. Rows an exporter rejects are buffered and
+appended in batches to a quarantine CSV recording where they came from and why.
+"""
+
+import csv
+import json
+import logging
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+LOGGER_NAME = 'fuji_import'
+LOG_LEVELS = ['DEBUG', 'INFO', 'WARNING', 'ERROR']
+QUARANTINE_FIELDS = ['dataset', 'source', 'row_index', 'reason', 'row', 'quarantined_at']
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Logger under the package namespace, e.g. get_logger('sales')"""
+    return logging.getLogger(f'{LOGGER_NAME}.{name}')
+
+
+class RateLimitFilter(logging.Filter):
+    """Let through at most `burst` records per message template every `interval` seconds
+
+    Errors always pass. The number of records dropped in a window is appended
+    to the first record let through in the next one.
+    """
+
+    def __init__(self, burst: int = 20, interval: float = 1.0):
+        super().__init__()
+        self.burst = burst
+        self.interval = interval
+        self._windows: Dict = {}  # (logger, template) -> [window start, emitted, suppressed]
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.ERROR:
+            return True
+
+        key = (record.name, record.msg)
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= self.interval:
+                suppressed = window[2] if window else 0
+                self._windows[key] = [now, 1, 0]
+                if suppressed:
+                    record.msg = f"{record.msg} (+{suppressed} similar suppressed)"
+                return True
+            if window[1] < self.burst:
+                window[1] += 1
+                return True
+            window[2] += 1
+            return False
+
+
+def configure_logging(level: str = 'INFO', burst: int = 20, interval: float = 1.0):
+    """Send package logs to stdout as plain messages, rate limited per template"""
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    handler.addFilter(RateLimitFilter(burst, interval))
+
+    logger = logging.getLogger(LOGGER_NAME)
+    logger.handlers = [handler]
+    logger.setLevel(level.upper())
+    logger.propagate = False
+
+
+log = get_logger('quarantine')
+
+
+def _row_json(row: Dict) -> str:
+    """Serialize a rejected row as best we can; it may be what broke the parser"""
+    try:
+        return json.dumps(row, default=str)
+    except Exception:
+        return repr(row)
+
+
+class Quarantine:
+    """Buffered CSV sink for rejected rows
+
+    Each export run replaces the previous quarantine file for its dataset; a
+    run that rejects nothing removes it.
+    """
+
+    def __init__(self, path: Path, dataset: str, batch_size: int = 500):
+        self.path = path
+        self.dataset = dataset
+        self.batch_size = batch_size
+        self.count = 0
+        self._buffer: List[Dict] = []
+        self._started = False
+
+    def add(self, source: str, row_index, reason: Union[str, Exception], row: Optional[Dict] = None):
+        """Record one rejected row; written out once the batch fills"""
+        if isinstance(reason, Exception):
+            reason = f"{type(reason).__name__}: {reason}"
+        self._buffer.append({
+            'dataset': self.dataset,
+            'source': source,
+            'row_index': '' if row_index is None else row_index,
+            'reason': reason,
+            'row': _row_json(row) if row is not None else '',
+            'quarantined_at': datetime.now().isoformat(timespec='seconds'),
+        })
+        self.count += 1
+        log.debug("Quarantined %s row %s: %s", source, row_index, reason)
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self._buffer:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, 'a' if self._started else 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=QUARANTINE_FIELDS)
+            if not self._started:
+                writer.writeheader()
+            writer.writerows(self._buffer)
+        self._started = True
+        self._buffer = []
+
+    def close(self):
+        self.flush()
+        if self.count:
+            log.warning("⚠️  %d %s row(s) quarantined -> %s", self.count, self.dataset, self.path)
+        elif self.path.exists():
+            self.path.unlink()
+
+    def __enter__(self) -> 'Quarantine':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def quarantine_for(output_dir: Path, dataset: str) -> Quarantine:
+    """Quarantine sink for one dataset under <output_dir>/quarantine/"""
+    return Quarantine(output_dir / 'quarantine' / f'{dataset}.csv', dataset)
@@ -0,0 +1,285 @@
+"""
+Menu parsing shared by the menu subcommands
+Turns extracted FUJI_menu.pdf text into menu item records and CSV output
+"""
+
+import csv
+import re
+from pathlib import Path
+from typing import Dict, List
+
+from .logs import get_logger
+from .menu_search import build_search_index, save_search_index, search_index_path
+
+log = get_logger('menu')
+
+# Define category mappings based on the menu structure
+CATEGORY_MAPPINGS = {
+    'RED WINE': ('Red Wine', 'red_wine'),
+    'WHITE WINE': ('White Wine', 'white_wine'),
+    'BLUSH WINE': ('Blush Wine', 'blush_wine'),
+    'PLUM WINE': ('Plum Wine', 'plum_wine'),
+    'DOMESTIC BEER': ('Domestic Beer', 'domestic_beer'),
+    'IMPORTED BEER': ('Imported Beer', 'imported_beer'),
+    'SAKE': ('Sake', 'sake'),
+    'SOFT DRINKS': ('Beverages', 'beverages'),
+    'SUSHI ROLLS': ('Sushi Rolls', 'sushi_rolls'),
+    'TEMPURA APPETIZER': ('Tempura Appetizer', 'tempura_appetizer'),
+    'LUNCH SPECIALS': ('Lunch Specials', 'lunch_specials'),
+    'EARLY BIRD SPECIALS': ('Early Bird Specials', 'early_bird'),
+    'DINNER ENTREES': ('Dinner Entrées', 'dinner'),
+    'SIDE ORDERS': ('Side Orders', 'side_orders'),
+    'CHILDREN\'S MENU': ('Children\'s Menu', 'children_menu')
+}
+
+CATEGORY_COLORS = {
+    'red_wine': '#722f37',
+    'white_wine': '#f3e5ab',
+    'blush_wine': '#ffc0cb',
+    'plum_wine': '#8b4789',
+    'domestic_beer': '#f28e1c',
+    'imported_beer': '#ffd700',
+    'sake': '#e6e6fa',
+    'beverages': '#4169e1',
+    'sushi_rolls': '#ff6347',
+    'tempura_appetizer': '#ffa500',
+    'lunch_specials': '#32cd32',
+    'early_bird': '#ff69b4',
+    'dinner': '#8b4513',
+    'side_orders': '#9370db',
+    'children_menu': '#00ced1'
+}
+
+DRINK_CATEGORY_TYPES = ['red_wine', 'white_wine', 'blush_wine', 'plum_wine', 'domestic_beer', 'imported_beer', 'sake']
+
+MENU_CSV_FIELDS = [
+    'category', 'category_type', 'name', 'description', 'base_price',
+    'glass_price', 'bottle_price', 'lunch_price', 'dinner_price',
+    'preparation_time', 'is_available', 'is_featured'
+]
+
+PRICE_PATTERNS = [
+    re.compile(r'\$(\d+\.?\d*)'),  # $12.00
+    re.compile(r'(\d+\.?\d*)\s*$'),  # 12.00 at end of line
+]
+
+# A second price left at the end of the name: "Shiraz 10.00" (glass) before the bottle price
+TRAILING_PRICE = re.compile(r'\s+\$?(\d+\.\d{2})$')
+
+
+def split_trailing_price(item_name: str):
+    """"Shiraz 10.00" -> ("Shiraz", 10.0); names without one come back unchanged with None"""
+    match = TRAILING_PRICE.search(item_name)
+    if not match or len(item_name[:match.start()].strip()) <= 2:
+        return item_name, None
+    return item_name[:match.start()].strip(), float(match.group(1))
+
+
+def estimate_prep_time(item_name: str, category_type: str) -> int:
+    """Estimate preparation time based on item type"""
+    item_lower = item_name.lower()
+
+    if category_type in DRINK_CATEGORY_TYPES + ['beverages']:
+        return 0  # Instant
+    elif 'sushi' in item_lower or 'roll' in item_lower:
+        return 15  # Sushi preparation
+    elif 'tempura' in item_lower:
+        return 12  # Tempura cooking
+    elif 'soup' in item_lower:
+        return 8  # Soup heating
+    elif 'salad' in item_lower:
+        return 5  # Salad preparation
+    elif 'rice' in item_lower or 'noodle' in item_lower:
+        return 10  # Rice/noodle dishes
+    else:
+        return 15  # Default for other items
+
+
+def is_featured_item(item_name: str) -> bool:
+    """Determine if item should be featured based on name"""
+    featured_keywords = ['special', 'chef', 'signature', 'house', 'favorite', 'popular']
+    return any(keyword in item_name.lower() for keyword in featured_keywords)
+
+
+def get_category_color(category_type: str) -> str:
+    """Get appropriate color for category type"""
+    return CATEGORY_COLORS.get(category_type, '#666666')
+
+
+def parse_menu_text(text: str) -> List[Dict]:
+    """Parse extracted text to identify menu items and categories"""
+    log.info("🔍 Parsing menu text for items and categories...")
+
+    menu_items = []
+    current_category = ''
+    current_category_type = ''
+
+    for line in text.split('\n'):
+        line = line.strip()
+        if not line:
+            continue
+
+        # Check if this line is a category header
+        category_found = False
+        for pdf_category, (db_name, db_type) in CATEGORY_MAPPINGS.items():
+            if pdf_category in line.upper():
+                current_category = db_name
+                current_category_type = db_type
+                category_found = True
+                log.debug("   📂 Found category: %s", current_category)
+                break
+
+        if category_found:
+            continue
+
+        # Parse menu items with prices
+        for pattern in PRICE_PATTERNS:
+            matches = pattern.findall(line)
+            if matches:
+                price = float(matches[0])
+
+                # Extract item name by removing price
+                item_name = pattern.sub('', line).strip()
+                item_name = re.sub(r'\s+', ' ', item_name)  # Clean up whitespace
+                item_name, second_price = split_trailing_price(item_name)
+
+                if len(item_name) > 2 and current_category:  # Valid item name
+                    # Determine if this is a glass/bottle price for beverages
+                    glass_price = None
+                    bottle_price = None
+                    lunch_price = None
+                    dinner_price = None
+
+                    if current_category_type in DRINK_CATEGORY_TYPES:
+                        # For beverages, assume glass price first; with two
+                        # prices on the line they are glass then bottle
+                        glass_price = price
+                        if second_price is not None:
+                            glass_price, bottle_price = second_price, price
+                    elif 'lunch' in item_name.lower() or current_category_type == 'lunch_specials':
+                        lunch_price = price
+                    elif current_category_type == 'dinner':
+                        dinner_price = price
+
+                    menu_items.append({
+                        'category': current_category,
+                        'category_type': current_category_type,
+                        'name': item_name,
+                        'description': '',
+                        'base_price': price,
+                        'glass_price': glass_price,
+                        'bottle_price': bottle_price,
+                        'lunch_price': lunch_price,
+                        'dinner_price': dinner_price,
+                        'preparation_time': estimate_prep_time(item_name, current_category_type),
+                        'is_available': True,
+                        'is_featured': is_featured_item(item_name)
+                    })
+
+                    log.debug("   🍽️  Found item: %s - $%s", item_name, price)
+                break
+
+    log.info("📊 Parsed %d menu items", len(menu_items))
+    return menu_items
+
+
+def save_to_csv(menu_items: List[Dict], output_file: Path) -> Path:
+    """Save menu items to CSV file, with the search index next to it"""
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+
+    print(f"💾 Saving {len(menu_items)} items to {output_file}")
+
+    with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=MENU_CSV_FIELDS)
+        writer.writeheader()
+        writer.writerows(menu_items)
+
+    print(f"✅ CSV file created: {output_file}")
+
+    index_file = save_search_index(build_search_index(menu_items), search_index_path(output_file))
+    print(f"🔎 Search index created: {index_file}")
+    return output_file
+
+
+def read_menu_csv(csv_file: Path) -> List[Dict]:
+    """Read menu items back from a CSV written by save_to_csv"""
+    with open(csv_file, newline='', encoding='utf-8') as csvfile:
+        menu_items = list(csv.DictReader(csvfile))
+
+    for item in menu_items:
+        for field in ['base_price', 'glass_price', 'bottle_price', 'lunch_price', 'dinner_price']:
+            item[field] = float(item[field]) if item[field] else None
+        item['preparation_time'] = int(item['preparation_time'])
+        item['is_available'] = item['is_available'] == 'True'
+        item['is_featured'] = item['is_featured'] == 'True'
+    return menu_items
+
+
+def create_import_instructions(csv_file: Path, instructions_file: Path, generated_by: str):
+    """Create instructions for importing the CSV"""
+    instructions = f"""# FUJI Menu Import Instructions
+
+## Generated Files
+
+- **CSV File**: `{csv_file}`
+- **Generated**: {generated_by}
+
+## Import Options
+
+### Option 1: Use Supabase Dashboard (Recommended)
+
+1. Go to your Supabase project dashboard
+2. Navigate to Table Editor → menu_categories
+3. First, create the categories manually or use the existing ones
+4. Navigate to Table Editor → menu_items
+5. Click "Insert" → "Import data from CSV"
+6. Upload the generated CSV file
+7. Map the columns correctly:
+   - category → (create category_id manually)
+   - name → name
+   - base_price → base_price
+   - etc.
+
+### Option 2: Use Node.js Import Script
+
+```bash
+# Copy the CSV to the data directory
+cp {csv_file} data/
+
+# Run the existing import script
+node scripts/import-data-only.js
+```
+
+### Option 3: Manual SQL Import
+
+```sql
+-- First create categories (run once)
+INSERT INTO menu_categories (name, category_type, display_order, is_active) VALUES
+('Red Wine', 'red_wine', 1, true),
+('White Wine', 'white_wine', 2, true),
+('Sushi Rolls', 'sushi_rolls', 3, true);
+-- ... add all categories
+
+-- Then import menu items using COPY command
+\\COPY menu_items FROM '{csv_file}' WITH CSV HEADER;
+```
+
+## Next Steps
+
+1. Review the generated CSV file for accuracy
+2. Choose your preferred import method
+3. Test the imported data in your POS system
+4. Verify menu items appear correctly in the application
+
+## Troubleshooting
+
+- If categories don't exist, create them first
+- Check for any special characters in item names
+- Verify price formatting (should be decimal numbers)
+- Ensure all required fields are populated
+"""
+
+    with open(instructions_file, 'w', encoding='utf-8') as f:
+        f.write(instructions)
+
+    print(f"📋 Import instructions created: {instructions_file}")
@@ -0,0 +1,146 @@
+"""
+Near-duplicate detection for menu items
+Re-imports and additional locations produce the same dishes under slightly
+different names ("Shiraz 10.00" vs "Shiraz", "*Spicy Tuna Roll" vs "Spicy
+Tuna Roll", "Salmon Teryaki" vs "Salmon Teriyaki"). Names are normalized with
+menu_search.normalize (case, accents, punctuation and price fragments) and cut
+into character 3-grams; each name gets a MinHash signature and the signatures
+are split into LSH bands.
+
+Matching a new menu looks each item up in the band buckets, so it is only
+compared with the few existing items that share a bucket rather than with
+every item, and scores those candidates by the exact Jaccard similarity of
+their 3-gram sets. Signatures are computed for all names at once with numpy.
+
+With 20 bands of 3 rows a pair at similarity 0.5 becomes a candidate ~93% of
+the time, at 0.8 practically always, and unrelated names (~0.05) almost never.
+"""
+
+import csv
+import zlib
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Set
+
+from .core import require
+from .menu_search import normalize
+
+BANDS = 20
+ROWS = 3
+NUM_PERM = BANDS * ROWS
+SEED = 42
+MERSENNE_PRIME = (1 << 61) - 1
+MIN_SCORE = 0.5
+
+CANDIDATE_FIELDS = ['name', 'category', 'match_name', 'match_category', 'score', 'same_category', 'source']
+
+
+def shingles(name: str, size: int = 3) -> Set[str]:
+    """Character n-grams of the normalized name, padded so short names still have some"""
+    text = f' {normalize(name)} '
+    if len(text) <= size:
+        return {text}
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+class MinHashIndex:
+    """MinHash signatures plus LSH band buckets over a set of menu items"""
+
+    def __init__(self, items: Sequence[Dict], bands: int = BANDS, rows: int = ROWS):
+        np = require('numpy')
+        self.items = list(items)
+        self.bands = bands
+        self.rows = rows
+        rng = np.random.RandomState(SEED)
+        # Universal hashes (a*x + b) mod p; a < 2**29 keeps a*x inside uint64 for 32-bit x
+        self._a = rng.randint(1, 1 << 29, size=bands * rows).astype(np.uint64)
+        self._b = rng.randint(0, 1 << 29, size=bands * rows).astype(np.uint64)
+
+        self.shingles = [shingles(item['name']) for item in self.items]
+        self.signatures = self._signatures(self.shingles)
+        self.buckets: Dict[tuple, List[int]] = {}
+        for position, keys in enumerate(self._band_keys(self.signatures)):
+            for key in keys:
+                self.buckets.setdefault(key, []).append(position)
+
+    def _signatures(self, shingle_sets: List[Set[str]]):
+        """(items x NUM_PERM) MinHash signatures, all items in one pass"""
+        np = require('numpy')
+        if not shingle_sets:
+            return np.zeros((0, len(self._a)), dtype=np.uint64)
+        sizes = np.array([len(s) for s in shingle_sets])
+        hashes = np.fromiter((zlib.crc32(gram.encode('utf-8')) for s in shingle_sets for gram in sorted(s)),
+                             dtype=np.uint64, count=int(sizes.sum()))
+        permuted = (self._a[:, None] * hashes[None, :] + self._b[:, None]) % np.uint64(MERSENNE_PRIME)
+        starts = np.r_[0, np.cumsum(sizes)[:-1]]
+        return np.minimum.reduceat(permuted, starts, axis=1).T
+
+    def _band_keys(self, signatures) -> List[List[tuple]]:
+        rows = self.rows
+        return [
+            [(band, *signature[band * rows:(band + 1) * rows].tolist()) for band in range(self.bands)]
+            for signature in signatures
+        ]
+
+    def candidates(self, items: Sequence[Dict], min_score: float = MIN_SCORE,
+                   exclude_self: bool = False) -> List[Dict]:
+        """Merge candidates for `items` among the indexed items, best first
+
+        With exclude_self (matching the index against itself) an item is not
+        reported as its own duplicate and each pair is reported once.
+        """
+        grams = [shingles(item['name']) for item in items]
+        found = []
+        for position, (item, keys) in enumerate(zip(items, self._band_keys(self._signatures(grams)))):
+            seen = set()
+            for key in keys:
+                seen.update(self.buckets.get(key, ()))
+            for match in sorted(seen):
+                if exclude_self and match <= position:
+                    continue
+                score = jaccard(grams[position], self.shingles[match])
+                if score < min_score:
+                    continue
+                existing = self.items[match]
+                found.append({
+                    'name': item['name'],
+                    'category': item.get('category', ''),
+                    'match_name': existing['name'],
+                    'match_category': existing.get('category', ''),
+                    'score': round(score, 4),
+                    'same_category': item.get('category') == existing.get('category'),
+                    'source': existing.get('source', ''),
+                })
+        found.sort(key=lambda c: (-c['score'], not c['same_category'], c['name'], c['match_name']))
+        return found
+
+
+def read_items(paths: Iterable[Path]) -> List[Dict]:
+    """Name and category of the items in menu CSVs, tagged with the file they came from"""
+    items = []
+    for path in paths:
+        with open(path, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                items.append({'name': row['name'], 'category': row.get('category', ''), 'source': path.name})
+    return items
+
+
+def find_duplicates(existing: List[Dict], new: Optional[List[Dict]] = None,
+                    min_score: float = MIN_SCORE) -> List[Dict]:
+    """Merge candidates of a new menu against existing items, or, without a
+    new menu, near-duplicates within the existing items"""
+    index = MinHashIndex(existing)
+    if new is None:
+        return index.candidates(existing, min_score, exclude_self=True)
+    return index.candidates(new, min_score)
+
+
+def write_candidates(candidates: List[Dict], output: Path) -> Path:
+    with open(output, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=CANDIDATE_FIELDS)
+        writer.writeheader()
+        writer.writerows(candidates)
+    return output
@@ -0,0 +1,220 @@
+"""
+Load parsed menu items into Supabase
+Category management, batched item inserts and post-import verification
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+from .core import FujiImportError
+from .menu import get_category_color
+
+
+MENU_ITEM_COLUMNS = [
+    'category_id', 'name', 'description', 'base_price', 'glass_price', 'bottle_price',
+    'lunch_price', 'dinner_price', 'preparation_time', 'is_available', 'is_featured', 'display_order'
+]
+MENU_PRICE_COLUMNS = ['base_price', 'glass_price', 'bottle_price', 'lunch_price', 'dinner_price']
+
+
+def _occurrence_keys(rows: List[Dict]) -> List[Tuple[str, str, int]]:
+    """Key rows by (category_id, name, n) so repeated names in a category stay distinct"""
+    seen: Dict[Tuple[str, str], int] = {}
+    keys = []
+    for row in rows:
+        base = (row['category_id'], row['name'])
+        seen[base] = seen.get(base, 0) + 1
+        keys.append(base + (seen[base],))
+    return keys
+
+
+class MenuLoader:
+    def __init__(self, client):
+        """Wrap an existing Supabase client"""
+        self.supabase = client
+        self._menu_rows: Optional[Dict[Tuple[str, str, int], Dict]] = None
+
+    def _item_row(self, item: Dict, category_id: str, display_order: int) -> Dict:
+        """Build a menu_items row from a parsed menu item"""
+        return {
+            'category_id': category_id,
+            'name': item['name'],
+            'description': item['description'],
+            'base_price': item['base_price'],
+            'glass_price': item.get('glass_price'),
+            'bottle_price': item.get('bottle_price'),
+            'lunch_price': item.get('lunch_price'),
+            'dinner_price': item.get('dinner_price'),
+            'preparation_time': item['preparation_time'],
+            'is_available': item['is_available'],
+            'is_featured': item['is_featured'],
+            'display_order': display_order
+        }
+
+    def _item_rows(self, menu_items: List[Dict], category_id_map: Dict[str, str]) -> List[Dict]:
+        """menu_items rows in display order, skipping items without a category"""
+        rows = []
+        for item in menu_items:
+            category_id = category_id_map.get(item['category'])
+            if category_id:
+                rows.append(self._item_row(item, category_id, len(rows) + 1))
+        return rows
+
+    def category_ids(self) -> Dict[str, str]:
+        """Existing category name -> id"""
+        result = self.supabase.table('menu_categories').select('id, name').execute()
+        return {row['name']: row['id'] for row in result.data or []}
+
+    def get_or_create_categories(self, menu_items: List[Dict]) -> Dict[str, str]:
+        """Get existing categories or create new ones, return category_id mapping"""
+        print("📂 Managing menu categories...")
+
+        # Get unique categories from menu items
+        categories = {}
+        for item in menu_items:
+            if item['category'] not in categories:
+                categories[item['category']] = item['category_type']
+
+        category_id_map = {}
+
+        for category_name, category_type in categories.items():
+            # Check if category already exists
+            result = self.supabase.table('menu_categories').select('id').eq('name', category_name).execute()
+
+            if result.data:
+                category_id_map[category_name] = result.data[0]['id']
+                print(f"   ✅ Using existing category: {category_name}")
+            else:
+                # Create new category
+                category_data = {
+                    'name': category_name,
+                    'category_type': category_type,
+                    'display_order': len(category_id_map) + 1,
+                    'is_active': True,
+                    'color': get_category_color(category_type)
+                }
+
+                result = self.supabase.table('menu_categories').insert(category_data).execute()
+
+                if result.data:
+                    category_id_map[category_name] = result.data[0]['id']
+                    print(f"   🆕 Created new category: {category_name}")
+                else:
+                    print(f"   ❌ Failed to create category: {category_name}")
+
+        return category_id_map
+
+    def import_menu_items(self, menu_items: List[Dict], category_id_map: Dict[str, str], batch_size: int = 50) -> int:
+        """Import menu items to Supabase"""
+        print("💾 Importing menu items to Supabase...")
+
+        # Clear existing menu items (optional - comment out if you want to keep existing)
+        print("🗑️  Clearing existing menu items...")
+        delete_result = self.supabase.table('menu_items').delete().neq('id', '00000000-0000-0000-0000-000000000000').execute()
+        print(f"   🗑️  Cleared {len(delete_result.data) if delete_result.data else 0} existing items")
+
+        # Prepare items for insertion
+        items_to_insert = []
+        for item in menu_items:
+            category_id = category_id_map.get(item['category'])
+            if not category_id:
+                print(f"   ⚠️  Skipping item '{item['name']}' - no category found")
+                continue
+
+            items_to_insert.append(self._item_row(item, category_id, len(items_to_insert) + 1))
+
+        # Insert items in batches
+        total_inserted = 0
+
+        for i in range(0, len(items_to_insert), batch_size):
+            batch = items_to_insert[i:i + batch_size]
+
+            result = self.supabase.table('menu_items').insert(batch).execute()
+
+            if result.data:
+                total_inserted += len(result.data)
+                print(f"   ✅ Inserted batch {i//batch_size + 1}: {len(result.data)} items")
+            else:
+                print(f"   ❌ Failed to insert batch {i//batch_size + 1}")
+
+        print(f"🎉 Successfully imported {total_inserted} menu items!")
+        return total_inserted
+
+    def sync_menu_items(self, menu_items: List[Dict], category_id_map: Dict[str, str], batch_size: int = 50) -> Tuple[int, int, int]:
+        """Apply only the inserts, updates and deletes needed to match menu_items
+
+        The current menu_items rows are fetched once and then kept in memory, so
+        repeated syncs from a long-running process cost only the changed rows.
+        """
+        if self._menu_rows is None:
+            result = self.supabase.table('menu_items').select(', '.join(['id'] + MENU_ITEM_COLUMNS)).order('display_order').execute()
+            existing = result.data or []
+            self._menu_rows = dict(zip(_occurrence_keys(existing), existing))
+
+        rows = self._item_rows(menu_items, category_id_map)
+        wanted = dict(zip(_occurrence_keys(rows), rows))
+
+        to_insert = [(key, row) for key, row in wanted.items() if key not in self._menu_rows]
+        to_update = [
+            (key, row) for key, row in wanted.items()
+            if key in self._menu_rows and any(self._menu_rows[key].get(col) != row[col] for col in MENU_ITEM_COLUMNS)
+        ]
+        to_delete = [key for key in self._menu_rows if key not in wanted]
+
+        for key, row in to_update:
+            row_id = self._menu_rows[key]['id']
+            self.supabase.table('menu_items').update(row).eq('id', row_id).execute()
+            self._menu_rows[key] = {'id': row_id, **row}
+
+        delete_ids = [self._menu_rows.pop(key)['id'] for key in to_delete]
+        for i in range(0, len(delete_ids), batch_size):
+            self.supabase.table('menu_items').delete().in_('id', delete_ids[i:i + batch_size]).execute()
+
+        for i in range(0, len(to_insert), batch_size):
+            batch = to_insert[i:i + batch_size]
+            result = self.supabase.table('menu_items').insert([row for _, row in batch]).execute()
+            for (key, _), row in zip(batch, result.data or []):
+                self._menu_rows[key] = row
+
+        print(f"   🔄 Menu sync: {len(to_insert)} inserted, {len(to_update)} updated, {len(delete_ids)} deleted")
+        return len(to_insert), len(to_update), len(delete_ids)
+
+    def verify_import(self, menu_items: Optional[List[Dict]] = None,
+                      category_id_map: Optional[Dict[str, str]] = None) -> int:
+        """Verify the import was successful
+
+        Counts come back as headers and only five sample rows are fetched. Given
+        the source menu, menu_items is also compared per category by checksum
+        (see verify.py) and only differing categories are downloaded.
+        """
+        print("🔍 Verifying import...")
+
+        # Check categories
+        categories_result = self.supabase.table('menu_categories').select('id', count='exact').limit(1).execute()
+        print(f"   📂 Categories: {categories_result.count or 0}")
+
+        # Check menu items
+        items_result = self.supabase.table('menu_items').select('id', count='exact').limit(1).execute()
+        total_items = items_result.count or 0
+        print(f"   🍽️  Menu items: {total_items}")
+
+        # Show sample items
+        samples = self.supabase.table('menu_items').select('name, base_price').order('display_order').limit(5).execute()
+        if samples.data:
+            print("\n📋 Sample imported items:")
+            for item in samples.data:
+                print(f"   • {item['name']} - ${item['base_price']}")
+
+        if menu_items is not None:
+            from .verify import print_verification, verify_table
+
+            rows = self._item_rows(menu_items, category_id_map or self.category_ids())
+            result = verify_table(self.supabase, 'menu_items', rows, MENU_ITEM_COLUMNS, MENU_PRICE_COLUMNS,
+                                  'category_id', 'value', key=_occurrence_keys,
+                                  order_column='display_order')
+            print_verification(result)
+            if not result['ok']:
+                raise FujiImportError(
+                    f"menu_items differs from the menu in {len(result['mismatched_partitions'])} categories"
+                )
+
+        return total_items
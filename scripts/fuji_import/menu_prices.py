@@ -0,0 +1,246 @@
+"""
+Menu price history
+A menu import replaces menu_items wholesale, so the prices an item had before
+are lost. Every extracted or loaded menu is therefore also recorded as a price
+snapshot in the data directory's staging.db (menu_price_history): one row per item and price version, with
+the five price fields in cents and the day range the version was in effect
+(valid_from inclusive, valid_to exclusive, NULL while current). A snapshot
+only writes rows for items whose prices changed, appeared or disappeared, so
+re-extracting an unchanged menu adds nothing.
+
+Items are keyed by category, name and occurrence (the n-th item of that name
+in the category), as the loader keys menu_items rows.
+
+PriceIndex answers "price of item X on day T": versions are sorted by
+(item, valid_from) into one int64 key array, so a lookup is a binary search,
+and a whole column of order lines is priced with one numpy searchsorted.
+"""
+
+import bisect
+from datetime import date
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .core import DATA_DIR, FujiImportError, format_cents, is_missing, require, to_cents
+from .logs import get_logger
+from .staging import STAGING_DB, StagingStore
+
+log = get_logger('menu_prices')
+
+HISTORY_TABLE = 'menu_price_history'
+PRICE_FIELDS = ['base_price', 'glass_price', 'bottle_price', 'lunch_price', 'dinner_price']
+HISTORY_COLUMNS = ['id', 'item_key', 'category', 'name', 'occurrence'] + PRICE_FIELDS + ['valid_from', 'valid_to']
+HISTORY_TYPES = {
+    'id': 'TEXT', 'item_key': 'TEXT', 'category': 'TEXT', 'name': 'TEXT', 'occurrence': 'INTEGER',
+    'valid_from': 'TEXT', 'valid_to': 'TEXT', **{field: 'INTEGER' for field in PRICE_FIELDS},
+}
+
+# Returned by PriceIndex.lookup where no version (or no such price) applies
+NO_PRICE = -1
+
+
+def item_key(category: str, name: str, occurrence: int = 1) -> str:
+    return f"{category}|{name}|{occurrence}"
+
+
+def keyed_items(menu_items: Sequence[Dict]) -> List[Tuple[str, Dict]]:
+    """(item_key, item) pairs; repeated names in a category are told apart by occurrence"""
+    seen: Dict[Tuple[str, str], int] = {}
+    keyed = []
+    for item in menu_items:
+        base = (item['category'], item['name'])
+        seen[base] = seen.get(base, 0) + 1
+        keyed.append((item_key(*base, seen[base]), item))
+    return keyed
+
+
+def _prices(item: Dict) -> Dict[str, Optional[int]]:
+    return {field: None if is_missing(item.get(field)) or item.get(field) == '' else to_cents(item[field])
+            for field in PRICE_FIELDS}
+
+
+def _ensure_history(store: StagingStore):
+    store.ensure_table(HISTORY_TABLE, HISTORY_COLUMNS, types=HISTORY_TYPES)
+    store.conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{HISTORY_TABLE}_item "
+                       f"ON {HISTORY_TABLE} (item_key, valid_from)")
+
+
+def _check_latest(store: StagingStore, as_of: str):
+    latest = store.query(f"SELECT MAX(MAX(valid_from), COALESCE(MAX(valid_to), '')) AS latest "
+                         f"FROM {HISTORY_TABLE}")[0]['latest']
+    if latest and as_of < latest:
+        raise FujiImportError(f"Menu prices are recorded up to {latest}; cannot record a snapshot as of {as_of}")
+
+
+def check_as_of(data_dir: Path = DATA_DIR, as_of: Optional[str] = None) -> str:
+    """The day a snapshot recorded now would take effect (`as_of`, default
+    today); raises if the history already runs past it, so callers can refuse
+    before writing or loading anything"""
+    as_of = as_of or date.today().isoformat()
+    if (data_dir / STAGING_DB).exists():
+        with StagingStore.for_dir(data_dir) as store:
+            if HISTORY_TABLE in store.tables():
+                _check_latest(store, as_of)
+    return as_of
+
+
+def record_snapshot(menu_items: Sequence[Dict], data_dir: Path = DATA_DIR, as_of: Optional[str] = None) -> Dict:
+    """Record the menu's prices as in effect from `as_of` (default today),
+    closing the versions they replace
+
+    Snapshots must be recorded in date order; recording the same day again
+    replaces that day's versions.
+    """
+    as_of = as_of or date.today().isoformat()
+    wanted = {key: (item, _prices(item)) for key, item in keyed_items(menu_items)}
+
+    with StagingStore.for_dir(data_dir) as store, store.transaction():
+        _ensure_history(store)
+        current = {row['item_key']: row for row in store.query(
+            f"SELECT * FROM {HISTORY_TABLE} WHERE valid_to IS NULL")}
+        _check_latest(store, as_of)
+
+        opened = closed = 0
+        for key in set(current) | set(wanted):
+            row = current.get(key)
+            if row is not None and key in wanted and all(row[field] == wanted[key][1][field] for field in PRICE_FIELDS):
+                continue
+            if row is not None:
+                # A version opened the same day is replaced rather than closed empty
+                if row['valid_from'] == as_of:
+                    store.conn.execute(f"DELETE FROM {HISTORY_TABLE} WHERE id = ?", (row['id'],))
+                else:
+                    store.conn.execute(f"UPDATE {HISTORY_TABLE} SET valid_to = ? WHERE id = ?", (as_of, row['id']))
+                closed += 1
+            if key in wanted:
+                item, prices = wanted[key]
+                category, name, occurrence = key.rsplit('|', 2)
+                values = {'id': f"{key}|{as_of}", 'item_key': key, 'category': category, 'name': name,
+                          'occurrence': int(occurrence), **prices, 'valid_from': as_of, 'valid_to': None}
+                store.conn.execute(
+                    f"INSERT OR REPLACE INTO {HISTORY_TABLE} ({', '.join(HISTORY_COLUMNS)}) "
+                    f"VALUES ({', '.join('?' for _ in HISTORY_COLUMNS)})",
+                    [values[col] for col in HISTORY_COLUMNS],
+                )
+                opened += 1
+
+    log.info("🏷️  Price history as of %s: %d new versions, %d closed", as_of, opened, closed)
+    return {'as_of': as_of, 'items': len(wanted), 'opened': opened, 'closed': closed}
+
+
+def price_history(data_dir: Path = DATA_DIR) -> List[Dict]:
+    """Every recorded price version, by item and start day"""
+    if not (data_dir / STAGING_DB).exists():
+        return []
+    with StagingStore.for_dir(data_dir) as store:
+        if HISTORY_TABLE not in store.tables():
+            return []
+        return store.query(f"SELECT * FROM {HISTORY_TABLE} ORDER BY item_key, valid_from")
+
+
+def _day_number(np, days):
+    """YYYY-MM-DD strings (or dates) -> int64 days since 1970-01-01"""
+    return np.asarray(days, dtype='datetime64[D]').astype(np.int64)
+
+
+class PriceIndex:
+    """Interval index over menu price versions"""
+
+    def __init__(self, versions: Sequence[Dict]):
+        np = require('numpy')
+        versions = sorted(versions, key=lambda row: (row['item_key'], row['valid_from']))
+        self.versions = versions
+        self.items = sorted({row['item_key'] for row in versions})
+        self.codes = {key: code for code, key in enumerate(self.items)}
+
+        codes = np.array([self.codes[row['item_key']] for row in versions], dtype=np.int64)
+        starts = _day_number(np, [row['valid_from'] for row in versions])
+        # Open versions run to the end of time
+        ends = np.full(len(versions), np.iinfo(np.int64).max, dtype=np.int64)
+        closed = [position for position, row in enumerate(versions) if row['valid_to'] is not None]
+        if closed:
+            ends[closed] = _day_number(np, [versions[position]['valid_to'] for position in closed])
+
+        self.keys = self._combine(codes, starts)
+        self.ends = ends
+        self.prices = {
+            field: np.array([NO_PRICE if row[field] is None else row[field] for row in versions], dtype=np.int64)
+            for field in PRICE_FIELDS
+        }
+
+    @classmethod
+    def load(cls, data_dir: Path = DATA_DIR) -> 'PriceIndex':
+        return cls(price_history(data_dir))
+
+    @staticmethod
+    def _combine(codes, days):
+        # Item code in the high 32 bits, day (offset to stay non-negative) in the low 32
+        return (codes << 32) | (days + (1 << 31))
+
+    def _positions(self, codes, days):
+        """Index of the version in effect for each (code, day), or -1"""
+        np = require('numpy')
+        if not len(self.keys):
+            return np.full(len(codes), -1, dtype=np.int64)
+        positions = np.searchsorted(self.keys, self._combine(codes, days), side='right') - 1
+        candidate = np.clip(positions, 0, None)
+        valid = (positions >= 0) & ((self.keys[candidate] >> 32) == codes) & (days < self.ends[candidate])
+        return np.where(valid, positions, -1)
+
+    def lookup(self, keys: Sequence[str], days: Sequence, field: str = 'base_price'):
+        """Prices in cents (NO_PRICE where none applies) of many items on many days"""
+        np = require('numpy')
+        if field not in PRICE_FIELDS:
+            raise FujiImportError(f"Unknown price field '{field}' (use {', '.join(PRICE_FIELDS)})")
+        keys = np.asarray(keys, dtype=str)
+        items = np.array(self.items, dtype=str)
+        codes = np.full(len(keys), -1, dtype=np.int64)
+        if len(items):
+            # self.items is sorted, so item codes are found by binary search too
+            found = np.minimum(np.searchsorted(items, keys), len(items) - 1)
+            codes = np.where(items[found] == keys, found, -1).astype(np.int64)
+        day_numbers = _day_number(np, days)
+        positions = np.where(codes >= 0, self._positions(np.clip(codes, 0, None), day_numbers), -1)
+        return np.where(positions >= 0, self.prices[field][np.clip(positions, 0, None)], NO_PRICE)
+
+    def version_at(self, key: str, day: str) -> Optional[Dict]:
+        """The version of one item in effect on a day"""
+        code = self.codes.get(key)
+        if code is None:
+            return None
+        np = require('numpy')
+        target = int(self._combine(np.int64(code), _day_number(np, day)))
+        position = bisect.bisect_right(self.keys, target) - 1
+        if position < 0 or int(self.keys[position]) >> 32 != code or int(_day_number(np, day)) >= self.ends[position]:
+            return None
+        return self.versions[position]
+
+    def prices_at(self, day: str) -> List[Dict]:
+        """Every item's prices on a day"""
+        rows = []
+        for key in self.items:
+            version = self.version_at(key, day)
+            if version is not None:
+                rows.append({'category': version['category'], 'name': version['name'],
+                             **{field: format_cents(version[field]) if version[field] is not None else ''
+                                for field in PRICE_FIELDS},
+                             'valid_from': version['valid_from'], 'valid_to': version['valid_to'] or ''})
+        return rows
+
+
+def order_line_prices(data_dir: Path = DATA_DIR, field: str = 'base_price'):
+    """Historical order lines with the menu price in effect on their order day
+
+    Lines are matched to menu items through their position in the current
+    fuji_menu_items.csv (see cube.order_lines); `menu_price` is in cents,
+    NO_PRICE where the item had no recorded price that day.
+    """
+    from .cube import ITEM_ID_FORMAT, MENU_FILE, order_lines
+    from .menu import read_menu_csv
+
+    lines = order_lines(data_dir)
+    keys = {ITEM_ID_FORMAT.format(position): key
+            for position, (key, _) in enumerate(keyed_items(read_menu_csv(data_dir / MENU_FILE)), start=1)}
+    lines['menu_price'] = PriceIndex.load(data_dir).lookup(
+        [keys.get(item_id, '') for item_id in lines['item_id']], lines['day'].tolist(), field)
+    return lines
@@ -0,0 +1,185 @@
+"""
+Precomputed menu search index
+Built from the parsed menu at import time and written next to the menu CSV so
+terminals can load it once and search locally instead of calling the
+search_menu_items() SQL function on every keystroke.
+
+Index layout (JSON):
+
+    items     [{id, name, category, category_type, price, tier, is_featured, display_order}]
+    tokens    {normalized token of the name, description or category: [item ids]}
+    prefixes  {token prefix (1..MAX_PREFIX chars): [item ids]}
+    trigrams  {3-gram of the normalized name and category: [item ids]}
+    facets    {'category': {name: [ids]}, 'category_type': {...}, 'price_tier': {...}}
+    tiers     [{tier, min, max}]
+
+Item ids are positions in `items`, which is in menu display order. Ranking
+follows search_menu_items(): name starts with the query, then name contains
+it, then any other match; ties by display order and name.
+"""
+
+import json
+import re
+import unicodedata
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+INDEX_VERSION = 1
+MAX_PREFIX = 10
+
+# (tier, lower bound inclusive, upper bound exclusive)
+PRICE_TIERS = [
+    ('$', 0.0, 10.0),
+    ('$$', 10.0, 20.0),
+    ('$$$', 20.0, 35.0),
+    ('$$$$', 35.0, None),
+]
+
+PRICE_FRAGMENT = re.compile(r'\$?\d+\.\d{2}')
+
+
+def normalize(text: str) -> str:
+    """Lowercase, strip accents, price fragments and punctuation"""
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch)).lower()
+    text = PRICE_FRAGMENT.sub(' ', text)
+    return ' '.join(re.sub(r'[^a-z0-9]+', ' ', text).split())
+
+
+def tokenize(text: str) -> List[str]:
+    return normalize(text).split()
+
+
+def price_tier(price: Optional[float]) -> Optional[str]:
+    if price is None:
+        return None
+    for tier, low, high in PRICE_TIERS:
+        if price >= low and (high is None or price < high):
+            return tier
+    return None
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _item_text(item: Dict) -> str:
+    return normalize(f"{item['name']} {item['category']}")
+
+
+def _add(postings: Dict[str, List[int]], key: str, item_id: int):
+    ids = postings.setdefault(key, [])
+    if not ids or ids[-1] != item_id:
+        ids.append(item_id)
+
+
+def build_search_index(menu_items: Iterable[Dict]) -> Dict:
+    """Build the search index for the available items of a parsed menu"""
+    items = []
+    tokens: Dict[str, List[int]] = {}
+    prefixes: Dict[str, List[int]] = {}
+    trigrams: Dict[str, List[int]] = {}
+    facets: Dict[str, Dict[str, List[int]]] = {'category': {}, 'category_type': {}, 'price_tier': {}}
+
+    for display_order, item in enumerate(menu_items, start=1):
+        if not item.get('is_available', True):
+            continue
+
+        item_id = len(items)
+        tier = price_tier(item.get('base_price'))
+        items.append({
+            'id': item_id,
+            'name': item['name'],
+            'category': item['category'],
+            'category_type': item['category_type'],
+            'price': item.get('base_price'),
+            'tier': tier,
+            'is_featured': bool(item.get('is_featured')),
+            'display_order': display_order,
+        })
+
+        text = _item_text(items[-1])
+        for token in sorted(set(text.split() + tokenize(item.get('description') or ''))):
+            _add(tokens, token, item_id)
+            for length in range(1, min(len(token), MAX_PREFIX) + 1):
+                _add(prefixes, token[:length], item_id)
+        for gram in sorted(_trigrams(text)):
+            _add(trigrams, gram, item_id)
+
+        facets['category'].setdefault(item['category'], []).append(item_id)
+        facets['category_type'].setdefault(item['category_type'], []).append(item_id)
+        if tier:
+            facets['price_tier'].setdefault(tier, []).append(item_id)
+
+    return {
+        'version': INDEX_VERSION,
+        'max_prefix': MAX_PREFIX,
+        'items': items,
+        'tokens': tokens,
+        'prefixes': prefixes,
+        'trigrams': trigrams,
+        'facets': facets,
+        'tiers': [{'tier': tier, 'min': low, 'max': high} for tier, low, high in PRICE_TIERS],
+    }
+
+
+def search_index_path(csv_file: Path) -> Path:
+    """fuji_menu_items.csv -> fuji_menu_items_search.json"""
+    return csv_file.with_name(f'{csv_file.stem}_search.json')
+
+
+def save_search_index(index: Dict, output_file: Path) -> Path:
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(index, f, separators=(',', ':'))
+    return output_file
+
+
+def load_search_index(index_file: Path) -> Dict:
+    with open(index_file, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _candidates(index: Dict, query: str) -> Set[int]:
+    """Items where every query word is a token prefix or a substring of the text"""
+    matches: Optional[Set[int]] = None
+    for word in query.split():
+        if len(word) <= index['max_prefix']:
+            found = set(index['prefixes'].get(word, []))
+        else:
+            found = {i for token, ids in index['tokens'].items() if token.startswith(word) for i in ids}
+
+        if len(word) >= 3:
+            # Infix matches, like ILIKE '%word%'; confirmed against the item text below
+            grams = sorted(_trigrams(word), key=lambda g: len(index['trigrams'].get(g, [])))
+            infix = set(index['trigrams'].get(grams[0], []))
+            for gram in grams[1:]:
+                infix &= set(index['trigrams'].get(gram, []))
+            found |= {i for i in infix if word in _item_text(index['items'][i])}
+
+        matches = found if matches is None else matches & found
+        if not matches:
+            return set()
+    return matches or set()
+
+
+def search(index: Dict, query: str, category: Optional[str] = None, tier: Optional[str] = None,
+           limit: int = 20) -> List[Dict]:
+    """Search the index, optionally narrowed to a category and/or price tier"""
+    query = normalize(query)
+    if query:
+        ids = _candidates(index, query)
+    else:
+        ids = set(range(len(index['items'])))
+
+    if category:
+        ids &= set(index['facets']['category'].get(category, []))
+    if tier:
+        ids &= set(index['facets']['price_tier'].get(tier, []))
+
+    def rank(item_id: int):
+        item = index['items'][item_id]
+        name = normalize(item['name'])
+        position = 1 if name.startswith(query) else 2 if query in name else 3
+        return position, item['display_order'], item['name']
+
+    return [index['items'][i] for i in sorted(ids, key=rank)[:limit]]
@@ -0,0 +1,34 @@
+"""
+PDF text extraction for the menu importers
+PyPDF2 is only imported when a PDF is actually read
+"""
+
+from pathlib import Path
+
+from .core import FujiImportError, require
+
+
+def extract_text_from_pdf(pdf_path: Path) -> str:
+    """Extract text content from the FUJI menu PDF"""
+    PyPDF2 = require('PyPDF2')
+
+    if not pdf_path.exists():
+        raise FujiImportError(f"PDF file not found: {pdf_path}")
+
+    print(f"📄 Extracting text from {pdf_path.name}...")
+
+    try:
+        with open(pdf_path, 'rb') as file:
+            reader = PyPDF2.PdfReader(file)
+            pages = []
+
+            for page_num, page in enumerate(reader.pages):
+                pages.append(page.extract_text())
+                print(f"   ✅ Processed page {page_num + 1}/{len(reader.pages)}")
+
+    except Exception as e:
+        raise FujiImportError(f"Error reading PDF: {e}") from e
+
+    text = '\n'.join(pages) + '\n' if pages else ''
+    print(f"📝 Extracted {len(text)} characters from PDF")
+    return text
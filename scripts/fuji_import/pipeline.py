@@ -0,0 +1,316 @@
+"""
+Import pipeline orchestrator
+Declares the import stages and their dependencies, runs independent stages
+concurrently in worker processes, checkpoints each completed stage and
+resumes a failed run from the last good stage.
+"""
+
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+from .core import (
+    DATA_DIR, GRAND_TOTALS_WORKBOOK, MENU_PDF, REFERENCE_DIR, SALES_WORKBOOK, FujiImportError
+)
+
+CHECKPOINT_FILE = '.fuji-import-checkpoint.json'
+
+HISTORICAL_LOADS = {
+    'load.monthly': ('monthly_summary_complete.csv', 'historical_monthly_summary'),
+    'load.daily': ('daily_summary_complete.csv', 'historical_daily_summary'),
+    'load.transactions': ('transactions_complete.csv', 'historical_transactions'),
+}
+
+
+def _check(result, what: str):
+    """The exporters report errors by returning None; turn that into a failure"""
+    if result is None:
+        raise FujiImportError(f"{what} export failed")
+    return result
+
+
+# Stage bodies are module level so they can run in worker processes
+
+def _stage_sales_monthly(ctx: Dict) -> str:
+    from .sales import export_complete_monthly_summary, process_monthly_summary
+    complete = _check(export_complete_monthly_summary(**ctx), 'Monthly summary')
+    _check(process_monthly_summary(**ctx), 'Monthly sales summary')
+    return f"{len(complete)} months"
+
+
+def _stage_sales_daily(ctx: Dict) -> str:
+    from .sales import export_complete_daily_summary
+    return f"{len(_check(export_complete_daily_summary(**ctx), 'Daily summary'))} days"
+
+
+def _stage_sales_transactions(ctx: Dict) -> str:
+    from .sales import export_complete_transactions
+    return f"{len(_check(export_complete_transactions(**ctx), 'Transactions'))} transactions"
+
+
+def _stage_sales_orders(ctx: Dict) -> str:
+    from .sales import process_detailed_transactions
+    orders, items = process_detailed_transactions(**ctx)
+    _check(orders, 'Historical orders')
+    return f"{len(orders)} orders, {len(items)} items"
+
+
+def _stage_menu_extract(ctx: Dict) -> str:
+    from .menu import parse_menu_text, save_to_csv
+    from .menu_prices import check_as_of, record_snapshot
+    from .pdf import extract_text_from_pdf
+    as_of = check_as_of(ctx['output_dir'])
+    menu_items = parse_menu_text(extract_text_from_pdf(ctx['reference_dir'] / MENU_PDF))
+    if not menu_items:
+        raise FujiImportError("No menu items found in PDF")
+    save_to_csv(menu_items, ctx['output_dir'] / 'fuji_menu_items.csv')
+    snapshot = record_snapshot(menu_items, ctx['output_dir'], as_of)
+    return f"{len(menu_items)} menu items, {snapshot['opened']} new price versions"
+
+
+def _stage_cooccurrence(ctx: Dict) -> str:
+    from .cooccurrence import build_cooccurrence
+    lookup = build_cooccurrence(ctx['output_dir'])
+    return f"{len(lookup['items'])} items, {lookup['pairs']} item pairs"
+
+
+def _stage_cube(ctx: Dict) -> str:
+    from .cube import build_cube
+    result = build_cube(ctx['output_dir'])
+    return f"{result['changed_days']} of {result['days']} days recomputed"
+
+
+def _stage_reports(ctx: Dict) -> str:
+    from .reports import ReportGenerator
+    written = ReportGenerator(ctx['output_dir']).generate(workers=1)
+    return f"{len(written)} reports rendered"
+
+
+def _stage_load_historical(ctx: Dict, stage: str) -> str:
+    from .changeset import mark_loaded, plan_load
+    from .supabase_client import get_supabase_client, push_delta
+    filename, table = HISTORICAL_LOADS[stage]
+    snapshot = ctx['output_dir'] / filename
+    # Push only the changeset when the table already holds the previous snapshot
+    client = get_supabase_client()
+    generation, upserts, deleted, is_delta = plan_load(snapshot, table, client)
+    if upserts or deleted:
+        push_delta(client, table, upserts, deleted)
+    mark_loaded(snapshot, table, generation)
+    if is_delta:
+        return f"{len(upserts)} changed and {len(deleted)} deleted rows pushed to {table}"
+    return f"{len(upserts)} rows upserted and {len(deleted)} stale rows deleted in {table}"
+
+
+def _stage_load_monthly(ctx: Dict) -> str:
+    return _stage_load_historical(ctx, 'load.monthly')
+
+
+def _stage_load_daily(ctx: Dict) -> str:
+    return _stage_load_historical(ctx, 'load.daily')
+
+
+def _stage_load_transactions(ctx: Dict) -> str:
+    return _stage_load_historical(ctx, 'load.transactions')
+
+
+def _stage_load_menu(ctx: Dict) -> str:
+    from .menu import read_menu_csv
+    from .menu_loader import MenuLoader
+    from .supabase_client import get_supabase_client
+    menu_items = read_menu_csv(ctx['output_dir'] / 'fuji_menu_items.csv')
+    loader = MenuLoader(get_supabase_client())
+    inserted = loader.import_menu_items(menu_items, loader.get_or_create_categories(menu_items))
+    return f"{inserted} menu items loaded"
+
+
+def _stage_verify(ctx: Dict) -> str:
+    from .menu import read_menu_csv
+    from .menu_loader import MenuLoader
+    from .supabase_client import get_supabase_client
+    from .verify import print_verification, verify_exports
+    client = get_supabase_client()
+
+    mismatches = []
+    for result in verify_exports(client, ctx['output_dir']):
+        print_verification(result)
+        if not result['ok']:
+            mismatches.append(result['table'])
+    if mismatches:
+        raise FujiImportError(f"Checksums differ for {', '.join(mismatches)}")
+
+    MenuLoader(client).verify_import(read_menu_csv(ctx['output_dir'] / 'fuji_menu_items.csv'))
+    return "checksums match"
+
+
+def _stage_refresh_views(ctx: Dict) -> str:
+    from .dashboard import refresh_after_load
+    from .supabase_client import get_supabase_client
+    results = refresh_after_load(get_supabase_client(), ctx['output_dir'])
+    if not results:
+        return "dashboard views up to date"
+    return ', '.join(f"{result['view']} {result['duration_ms']:.0f} ms" for result in results)
+
+
+class Stage:
+    """A named unit of work and the stages it depends on"""
+
+    def __init__(self, name: str, func: Callable[[Dict], str], deps: Sequence[str] = (), description: str = ''):
+        self.name = name
+        self.func = func
+        self.deps = list(deps)
+        self.description = description
+
+
+STAGES = [
+    Stage('sales.monthly', _stage_sales_monthly, description='Grand Totals workbook -> monthly CSVs'),
+    Stage('sales.daily', _stage_sales_daily, description='summary sheet -> daily_summary_complete.csv'),
+    Stage('sales.transactions', _stage_sales_transactions, description='daily sheets -> transactions_complete.csv'),
+    Stage('sales.orders', _stage_sales_orders, description='daily sheets -> historical orders/items CSVs'),
+    Stage('menu.extract', _stage_menu_extract, description='menu PDF -> fuji_menu_items.csv'),
+    Stage('analytics.cooccurrence', _stage_cooccurrence, ['sales.orders'],
+          'order items -> item_cooccurrence.json'),
+    Stage('analytics.cube', _stage_cube, ['sales.orders', 'menu.extract'],
+          'order lines -> item/category sales cube in staging.db'),
+    Stage('reports', _stage_reports, ['sales.monthly', 'sales.daily', 'sales.transactions'],
+          'render monthly/yearly reports'),
+    Stage('load.monthly', _stage_load_monthly, ['sales.monthly'], 'upsert historical_monthly_summary'),
+    Stage('load.daily', _stage_load_daily, ['sales.daily'], 'upsert historical_daily_summary'),
+    Stage('load.transactions', _stage_load_transactions, ['sales.transactions'], 'upsert historical_transactions'),
+    Stage('load.menu', _stage_load_menu, ['menu.extract'], 'replace menu_items from the CSV'),
+    Stage('verify', _stage_verify, ['load.monthly', 'load.daily', 'load.transactions', 'load.menu'],
+          'compare Supabase checksums with the exports'),
+    Stage('refresh.views', _stage_refresh_views, ['load.monthly', 'load.daily', 'load.transactions'],
+          'refresh the dashboard materialized views the loads affected'),
+]
+
+DEFAULT_TARGETS = ['analytics.cooccurrence', 'analytics.cube', 'reports', 'menu.extract']
+LOAD_TARGETS = DEFAULT_TARGETS + ['verify', 'refresh.views']
+
+
+class Pipeline:
+    """Run a DAG of stages with per-stage checkpoints"""
+
+    def __init__(self, stages: Iterable[Stage] = STAGES, reference_dir: Path = REFERENCE_DIR,
+                 data_dir: Path = DATA_DIR, workers: Optional[int] = None):
+        self.stages = {stage.name: stage for stage in stages}
+        self.reference_dir = reference_dir
+        self.data_dir = data_dir
+        self.workers = workers or os.cpu_count() or 1
+        self.checkpoint_path = data_dir / CHECKPOINT_FILE
+
+        for stage in self.stages.values():
+            unknown = [dep for dep in stage.deps if dep not in self.stages]
+            if unknown:
+                raise FujiImportError(f"Stage '{stage.name}' depends on unknown stage(s): {', '.join(unknown)}")
+
+    def resolve(self, targets: Iterable[str]) -> List[str]:
+        """Targets plus everything they depend on, in dependency order"""
+        ordered: List[str] = []
+        visiting = set()
+
+        def visit(name: str):
+            if name in ordered:
+                return
+            if name not in self.stages:
+                raise FujiImportError(f"Unknown stage '{name}' (available: {', '.join(self.stages)})")
+            if name in visiting:
+                raise FujiImportError(f"Dependency cycle through '{name}'")
+            visiting.add(name)
+            for dep in self.stages[name].deps:
+                visit(dep)
+            visiting.discard(name)
+            ordered.append(name)
+
+        for target in targets:
+            visit(target)
+        return ordered
+
+    def input_signature(self) -> Dict[str, List[int]]:
+        """Size and mtime of each source file; a change invalidates the checkpoint"""
+        signature = {}
+        for name in (GRAND_TOTALS_WORKBOOK, SALES_WORKBOOK, MENU_PDF):
+            path = self.reference_dir / name
+            if path.exists():
+                stat = path.stat()
+                signature[name] = [stat.st_size, stat.st_mtime_ns]
+        return signature
+
+    def _load_checkpoint(self, signature: Dict) -> Dict:
+        if self.checkpoint_path.exists():
+            with open(self.checkpoint_path) as f:
+                checkpoint = json.load(f)
+            if checkpoint.get('inputs') == signature:
+                return checkpoint
+            print("♻️  Source files changed since the last run; starting fresh")
+        return {'inputs': signature, 'completed': {}}
+
+    def _save_checkpoint(self, checkpoint: Dict):
+        tmp_path = self.checkpoint_path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(checkpoint, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def run(self, targets: Iterable[str] = DEFAULT_TARGETS, fresh: bool = False) -> Dict:
+        """Run the targets' stages, skipping ones already checkpointed"""
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        plan = self.resolve(targets)
+        signature = self.input_signature()
+        checkpoint = {'inputs': signature, 'completed': {}} if fresh else self._load_checkpoint(signature)
+
+        done = {name for name in plan if name in checkpoint['completed']}
+        pending = [name for name in plan if name not in done]
+        for name in plan:
+            if name in done:
+                print(f"⏭️  {name}: already completed at {checkpoint['completed'][name]['finished_at']}")
+        if not pending:
+            print("✅ Nothing to do")
+            return checkpoint
+
+        ctx = {'reference_dir': self.reference_dir, 'output_dir': self.data_dir}
+        running = {}
+        failed = []
+        started_at = {}
+
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            while pending or running:
+                if not failed:
+                    for name in [n for n in pending if all(dep in done for dep in self.stages[n].deps)]:
+                        print(f"▶️  {name}: {self.stages[name].description}")
+                        started_at[name] = time.perf_counter()
+                        running[pool.submit(self.stages[name].func, ctx)] = name
+                        pending.remove(name)
+
+                if not running:
+                    break
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    seconds = time.perf_counter() - started_at[name]
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        failed.append(name)
+                        print(f"❌ {name} failed after {seconds:.1f}s: {e}")
+                        continue
+
+                    done.add(name)
+                    checkpoint['completed'][name] = {
+                        'finished_at': datetime.now().isoformat(timespec='seconds'),
+                        'seconds': round(seconds, 3),
+                        'result': result,
+                    }
+                    self._save_checkpoint(checkpoint)
+                    print(f"✅ {name} ({seconds:.1f}s): {result}")
+
+        if failed:
+            raise FujiImportError(
+                f"Stage(s) failed: {', '.join(failed)}. Completed stages are checkpointed in "
+                f"{self.checkpoint_path}; rerun to resume from there."
+            )
+        return checkpoint
@@ -0,0 +1,270 @@
+"""
+Monthly report generator
+Renders each month of the exported datasets in the owner/accountant layouts
+(Month_Year_SALES.xlsx and data/templates/monthly_template.csv) plus a yearly
+Grand_Totals_Sales_Summary.xlsx, in parallel, regenerating only the months
+whose underlying rows changed since the last run.
+"""
+
+import calendar
+import csv
+import hashlib
+import json
+import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .core import DATA_DIR, EXPORT_TEXT_COLUMNS, format_cents, is_money_column, read_export_rows, require
+
+REPORT_VERSION = 1  # bump when the rendered layout changes to force regeneration
+TEMPLATE_PATH = DATA_DIR / 'templates' / 'monthly_template.csv'
+
+# (header label, export column) pairs, in workbook column order
+DAILY_SUMMARY_LAYOUT = [
+    ('DAY', 'day'), ('DATE', 'date'), ('TOGO', 'togo'), ('DINE IN', 'dine_in'), ('TAX', 'tax'),
+    ('GROSS SALE', 'gross_sale'), ('GRATUITY', 'gratuity'), ('COUPON (SUBTRACT)', 'coupon_subtract'),
+    ('NET SALE', 'net_sale'), ('TIP CR', 'tip_cr'), ('TIP CASH', 'tip_cash'), ('BEFORE EARNED', 'before_earned'),
+    ('SC MERCH', 'sc_merch'), ('SC OWNER', 'sc_owner'), ('CREDT TOTAL', 'credt_total'), ('DEPOSITED', 'deposited'),
+    ('CASH ', 'cash'), ('DAILY EARNED', 'daily_earned'), ('WEEKLY EARNED', 'weekly_earned'), ('LUNCH', 'lunch'),
+]
+
+TRANSACTION_LAYOUT = [
+    ('TRANSACTION', 'transaction'), ('TO GO ', 'to_go'), ('DINE IN', 'dine_in'), ('TAX', 'unnamed_column_ 4'),
+    ('GRATUITY', 'unnamed_column_ 5'), ('COUPON', 'coupon'), ('GROSS', 'gross'), ('TIP', 'unnamed_column_ 8'),
+    ('TOTAL', 'total'), ('SERVICE', 'service'), ('RECEIPT ', 'receipt'),
+]
+
+GRAND_TOTALS_LAYOUT = [
+    ('MONTH', 'original_month_string'), ('TOGO', 'togo'), ('DINE IN', 'dine_in'), ('TAX', 'tax'),
+    ('GROSS SALE', 'gross_sale'), ('GRATUITY', 'gratuity'), ('COUPON (SUBTRACT)', 'coupon_subtract'),
+    ('NET SALE', 'net_sale'), ('TIP CR', 'tip_cr'), ('TIP CASH', 'tip_cash'), ('BEFORE EARNED', 'before_earned'),
+    ('SC MERCH', 'sc_merch'), ('SC OWNER', 'sc_owner'), ('CREDT TOTAL', 'credt_total'), ('DEPOSITED', 'deposited'),
+    ('CASH ', 'cash'), ('DAILY EARNED', 'daily_earned'), ('WEEKLY EARNED', 'weekly_earned'),
+    ('NO OF DAYS CLOSED', 'no_of_days_closed'), ('NO OF DAYS MONTH', 'no_of_days_month'),
+]
+
+
+def _read_rows(path: Path) -> List[Dict]:
+    """Read an export CSV (amounts in cents) with blank amounts as 0"""
+    return read_export_rows(path, blank=0) if path.exists() else []
+
+
+def template_columns(template_path: Path = TEMPLATE_PATH) -> List[str]:
+    """Column header of the monthly template (the first non-comment line)"""
+    with open(template_path, newline='', encoding='utf-8') as f:
+        for line in f:
+            if line.strip() and not line.startswith('#'):
+                return next(csv.reader([line]))
+    raise ValueError(f"No header row in {template_path}")
+
+
+def _fingerprint(payload) -> str:
+    data = json.dumps([REPORT_VERSION, payload], sort_keys=True, default=str).encode('utf-8')
+    return hashlib.sha256(data).hexdigest()
+
+
+def _month_label(month: str) -> str:
+    """'2022-02' -> 'FEB 2022'"""
+    year, mon = month.split('-')
+    return f"{calendar.month_abbr[int(mon)].upper()} {year}"
+
+
+def _cell(field: str, value):
+    """Cell value for the workbook: cents become amounts only here"""
+    if field == 'date' and value:
+        return date.fromisoformat(value)
+    if value is not None and is_money_column(field):
+        return value / 100
+    return value
+
+
+def _totals(rows: Iterable[Dict], layout: List[Tuple[str, str]], label_column: str, label: str) -> List:
+    """Totals row: column sums for numeric fields, the label in the first text column"""
+    rows = list(rows)
+    totals = []
+    for _, field in layout:
+        if field == label_column:
+            totals.append(label)
+        elif field in EXPORT_TEXT_COLUMNS:
+            totals.append(None)
+        else:
+            totals.append(_cell(field, sum(row.get(field) or 0 for row in rows)))
+    return totals
+
+
+def _layout_row(row: Dict, layout: List[Tuple[str, str]]) -> List:
+    return [_cell(field, row.get(field)) for _, field in layout]
+
+
+def summarize_month(month: str, monthly_row: Optional[Dict], daily_rows: List[Dict]) -> Dict:
+    """Month totals: the Grand Totals row when present, else the sum of its days"""
+    if monthly_row:
+        return dict(monthly_row)
+
+    summary = {'date': f"{month}-01", 'original_month_string': _month_label(month)}
+    for row in daily_rows:
+        for key, value in row.items():
+            if is_money_column(key) and isinstance(value, int):
+                summary[key] = summary.get(key, 0) + value
+    summary['no_of_days_month'] = calendar.monthrange(*map(int, month.split('-')))[1]
+    summary['no_of_days_closed'] = sum(1 for row in daily_rows if not row.get('gross_sale'))
+    return summary
+
+
+def render_month(job: Dict) -> Tuple[str, List[str]]:
+    """Render one month's workbook and template CSV (runs in a worker process)"""
+    openpyxl = require('openpyxl')
+
+    month, output_dir = job['month'], Path(job['output_dir'])
+    label = _month_label(month)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    summary = job['summary']
+
+    # Month_Year_SALES layout: a daily summary sheet plus one sheet per day
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet(label)
+    sheet.append([header for header, _ in DAILY_SUMMARY_LAYOUT])
+    for row in job['daily_rows']:
+        sheet.append(_layout_row(row, DAILY_SUMMARY_LAYOUT))
+    if job['daily_rows']:
+        sheet.append(_totals(job['daily_rows'], DAILY_SUMMARY_LAYOUT, 'day', 'TOTAL'))
+
+    for day, transactions in job['transactions_by_day']:
+        day_sheet = workbook.create_sheet(f"{int(day[5:7])}-{int(day[8:10])}")
+        day_sheet.append(['DATE'] + [header for header, _ in TRANSACTION_LAYOUT])
+        for i, row in enumerate(transactions):
+            day_sheet.append([date.fromisoformat(day) if i == 0 else None] + _layout_row(row, TRANSACTION_LAYOUT))
+        day_sheet.append([None] + _totals(transactions, TRANSACTION_LAYOUT, 'transaction', 'TOTAL'))
+
+    xlsx_path = output_dir / f"{label.replace(' ', '_')}_SALES.xlsx"
+    workbook.save(xlsx_path)
+
+    # monthly_template.csv layout: one row, amounts formatted at the boundary
+    csv_path = output_dir / 'monthly_summary.csv'
+    with open(csv_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(job['template_columns'])
+        row = []
+        for column in job['template_columns']:
+            if column == 'date':
+                row.append(f"{month}-01")
+            elif column == 'month_name':
+                row.append(calendar.month_name[int(month[5:7])])
+            elif column.startswith('no_of_days'):
+                row.append(int(summary.get(column) or 0))
+            else:
+                row.append(format_cents(summary.get(column) or 0))
+        writer.writerow(row)
+
+    return month, [str(xlsx_path), str(csv_path)]
+
+
+def render_year(job: Dict) -> Tuple[str, List[str]]:
+    """Render one year's Grand_Totals_Sales_Summary layout (runs in a worker process)"""
+    openpyxl = require('openpyxl')
+
+    output_dir = Path(job['output_dir'])
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet('Sheet1')
+    sheet.append([header for header, _ in GRAND_TOTALS_LAYOUT])
+    for summary in job['summaries']:
+        sheet.append(_layout_row(summary, GRAND_TOTALS_LAYOUT))
+    sheet.append(_totals(job['summaries'], GRAND_TOTALS_LAYOUT, 'original_month_string', 'totals'))
+
+    path = output_dir / f"Grand_Totals_Sales_Summary_{job['year']}.xlsx"
+    workbook.save(path)
+    return job['year'], [str(path)]
+
+
+class ReportGenerator:
+    """Plan, render and record report jobs against a fingerprint manifest"""
+
+    def __init__(self, data_dir: Path = DATA_DIR, output_dir: Optional[Path] = None,
+                 template_path: Path = TEMPLATE_PATH):
+        self.data_dir = data_dir
+        self.output_dir = output_dir or data_dir / 'reports'
+        self.template_path = template_path
+        self.manifest_path = self.output_dir / 'manifest.json'
+
+    def _load_manifest(self) -> Dict:
+        if self.manifest_path.exists():
+            with open(self.manifest_path) as f:
+                return json.load(f)
+        return {'months': {}, 'years': {}}
+
+    def plan(self, months: Optional[List[str]] = None, force: bool = False) -> Tuple[List[Dict], List[Dict], Dict]:
+        """Build the month and year jobs whose inputs changed"""
+        monthly = {row['date'][:7]: row for row in _read_rows(self.data_dir / 'monthly_summary_complete.csv')}
+        daily = defaultdict(list)
+        for row in _read_rows(self.data_dir / 'daily_summary_complete.csv'):
+            daily[row['date'][:7]].append(row)
+        transactions = defaultdict(lambda: defaultdict(list))
+        for row in _read_rows(self.data_dir / 'transactions_complete.csv'):
+            transactions[row['date'][:7]][row['date']].append(row)
+
+        columns = template_columns(self.template_path)
+        manifest = self._load_manifest()
+        wanted = sorted(set(monthly) | set(daily) | set(transactions))
+        if months:
+            wanted = [month for month in wanted if month in months]
+
+        month_jobs, summaries_by_year = [], defaultdict(list)
+        for month in wanted:
+            daily_rows = sorted(daily.get(month, []), key=lambda row: row['date'])
+            by_day = sorted((day, rows) for day, rows in transactions.get(month, {}).items())
+            summary = summarize_month(month, monthly.get(month), daily_rows)
+            summaries_by_year[month[:4]].append(summary)
+
+            fingerprint = _fingerprint([columns, summary, daily_rows, by_day])
+            if force or manifest['months'].get(month) != fingerprint:
+                month_jobs.append({
+                    'month': month, 'fingerprint': fingerprint, 'output_dir': str(self.output_dir / month),
+                    'summary': summary, 'daily_rows': daily_rows, 'transactions_by_day': by_day,
+                    'template_columns': columns,
+                })
+
+        year_jobs = []
+        for year, summaries in sorted(summaries_by_year.items()):
+            summaries.sort(key=lambda row: row['date'])
+            fingerprint = _fingerprint(summaries)
+            if force or manifest['years'].get(year) != fingerprint:
+                year_jobs.append({'year': year, 'fingerprint': fingerprint,
+                                  'output_dir': str(self.output_dir), 'summaries': summaries})
+
+        return month_jobs, year_jobs, manifest
+
+    def generate(self, months: Optional[List[str]] = None, force: bool = False,
+                 workers: Optional[int] = None) -> Dict[str, List[str]]:
+        """Render changed months/years in parallel; return {key: written paths}"""
+        require('openpyxl')
+        month_jobs, year_jobs, manifest = self.plan(months, force)
+        if not month_jobs and not year_jobs:
+            print("✅ Reports are up to date")
+            return {}
+
+        print(f"🖨️  Rendering {len(month_jobs)} month(s) and {len(year_jobs)} year(s)...")
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+
+        written = {}
+        workers = workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            month_results = pool.map(render_month, month_jobs)
+            year_results = pool.map(render_year, year_jobs)
+            for job, (month, paths) in zip(month_jobs, month_results):
+                manifest['months'][month] = job['fingerprint']
+                written[month] = paths
+            for job, (year, paths) in zip(year_jobs, year_results):
+                manifest['years'][year] = job['fingerprint']
+                written[year] = paths
+
+        with open(self.manifest_path, 'w') as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+
+        for key, paths in written.items():
+            print(f"   ✅ {key}: {', '.join(Path(p).name for p in paths)}")
+        return written
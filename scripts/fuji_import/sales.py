@@ -0,0 +1,659 @@
+"""
+Sales workbook exporters
+Converts the Excel sales workbooks into clean CSV files for Supabase import
+
+pandas/numpy are imported inside each exporter so that importing this module
+stays cheap for subcommands that never touch a workbook.
+"""
+
+import csv
+import io
+import json
+import os
+import time
+import zlib
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .core import (
+    DATA_DIR, GRAND_TOTALS_WORKBOOK, REFERENCE_DIR, SALES_WORKBOOK, FujiImportError,
+    clean_column_name, export_frame, is_missing, parse_export_row, parse_month_label, require, to_cents,
+    write_export_csv, write_export_text
+)
+from .layout import detect_layout
+from .logs import Quarantine, get_logger, quarantine_for
+from .shared_frames import attach_frame, concat_frames, share_frame
+from .streams import StreamStage, run_stream
+
+SUMMARY_SHEET = 'FEB 2022'
+DAILY_SHEET_PREFIX = '2-'
+
+log = get_logger('sales')
+
+
+def _write_column_mapping(path: Path, original_columns, cleaned_columns, **extra):
+    """Write the original vs cleaned column mapping next to an export"""
+    with open(path, 'w') as f:
+        json.dump({
+            'original_columns': list(original_columns),
+            'cleaned_columns': list(cleaned_columns),
+            'total_columns': len(cleaned_columns),
+            **extra
+        }, f, indent=2)
+
+
+def _reject(quarantine: Optional[Quarantine], source: str, row_index, reason, row=None):
+    """Send a rejected row to the quarantine, or just log it when there is none"""
+    if quarantine is not None:
+        quarantine.add(source, row_index, reason, row.to_dict() if row is not None else None)
+    else:
+        log.warning("Skipping %s row %s: %s", source, row_index, reason)
+
+
+def _reject_strays(quarantine: Optional[Quarantine], df, layout):
+    """Quarantine the rows a layout leaves out of its data block that still hold amounts"""
+    for idx, row in layout.strays(df).iterrows():
+        key = row[layout.key]
+        if is_missing(key):
+            reason = f"No {layout.key}: amounts outside the data block (totals or footer row)"
+        else:
+            reason = f"Invalid {layout.kind} {str(key).strip()!r} in the {layout.key} column"
+        _reject(quarantine, layout.name, idx, reason, row)
+
+
+def is_daily_sheet(sheet_name: str) -> bool:
+    """Daily transaction sheets are named 2-1, 2-2, etc."""
+    return sheet_name != SUMMARY_SHEET and sheet_name.startswith(DAILY_SHEET_PREFIX)
+
+
+def _text(column):
+    return column.map(lambda value: '' if is_missing(value) else str(value))
+
+
+def _count(column):
+    return column.map(lambda value: int(value) if not is_missing(value) and str(value).replace('.', '').isdigit() else 0)
+
+
+def _records(columns: Dict) -> List[Dict]:
+    """Column-wise values -> record dicts, in column order"""
+    pd = require('pandas')
+    return pd.DataFrame(columns).to_dict('records')
+
+
+def monthly_summary_records(df, quarantine: Optional[Quarantine] = None) -> List[Dict]:
+    """Build monthly summary records from the Grand Totals sheet (cleaned column names)"""
+    layout = detect_layout(df, 'month', 'month', GRAND_TOTALS_WORKBOOK)
+    _reject_strays(quarantine, df, layout)
+    data = layout.data(df)
+    labels = data['month'].astype(str).str.strip()
+
+    parsed = {}
+    for label in labels.unique():
+        try:
+            parsed[label] = parse_month_label(label)
+        except ValueError as e:
+            parsed[label] = e
+    for idx, label in labels.items():
+        if isinstance(parsed[label], ValueError):
+            _reject(quarantine, GRAND_TOTALS_WORKBOOK, idx, f"Invalid month {label!r}: {parsed[label]}", df.loc[idx])
+    keep = labels.map(lambda label: not isinstance(parsed[label], ValueError))
+    data, labels = data[keep], labels[keep]
+    year = labels.map(lambda label: parsed[label][0])
+    month = labels.map(lambda label: parsed[label][1])
+
+    columns = {
+        'id': 'monthly_' + year.astype(str) + '_' + month.map('{:02d}'.format),
+        'date': year.astype(str) + '-' + month.map('{:02d}'.format) + '-01',
+        'year': year,
+        'month': month,
+        'month_name': labels.map(lambda label: parsed[label][2]),
+        'original_month_string': labels,
+    }
+    # Every other column is currency (amounts in cents) except the day counts
+    for col in df.columns:
+        if col != 'month':
+            columns[col] = _count(data[col]) if col in ['no_of_days_closed', 'no_of_days_month'] else data[col].map(to_cents)
+    return _records(columns)
+
+
+def daily_summary_records(df, quarantine: Optional[Quarantine] = None) -> List[Dict]:
+    """Build daily summary records from the monthly summary sheet (cleaned column names)"""
+    pd = require('pandas')
+    layout = detect_layout(df, 'date', 'date', SUMMARY_SHEET)
+    _reject_strays(quarantine, df, layout)
+    data = layout.data(df)
+    dates = pd.to_datetime(data['date']).dt.strftime('%Y-%m-%d')
+
+    columns = {'id': 'daily_' + dates.str.replace('-', '_'), 'date': dates}
+    # Day of week (and its copy in the side table) stay text; the rest, unnamed
+    # numeric columns included, are currency values
+    text_columns = ['day'] + layout.mirrors('day')
+    for col in df.columns:
+        if col != 'date':
+            columns[col] = _text(data[col]) if col in text_columns else data[col].map(to_cents)
+    return _records(columns)
+
+
+def transaction_sheet_records(df, sheet_name: str, quarantine: Optional[Quarantine] = None) -> List[Dict]:
+    """Build transaction records for one daily sheet (cleaned column names)
+
+    Records are returned with an empty 'id'; ids run across all sheets and are
+    filled in by assign_transaction_ids once the sheets are put together.
+    """
+    # Get date from sheet name
+    day = sheet_name.split('-')[1]
+    sheet_date = f"2022-02-{day.zfill(2)}"
+
+    layout = detect_layout(df, 'transaction', 'number', sheet_name)
+    _reject_strays(quarantine, df, layout)
+    data = layout.data(df)
+    columns = {'id': '', 'date': sheet_date, 'sheet_name': sheet_name, 'row_index': data.index.to_series()}
+    for col in df.columns:
+        if col != 'date':
+            columns[col] = _text(data[col]) if col == 'transaction' else data[col].map(to_cents)
+
+    # Only keep transactions with meaningful amounts
+    records = _records(columns)
+    return [record for record in records
+            if record.get('total', 0) > 0 or record.get('to_go', 0) > 0 or record.get('dine_in', 0) > 0]
+
+
+def transaction_ids(dates, start: int = 1) -> List[str]:
+    """Ids for transactions in workbook order, given their dates; `start` is
+    the number of the first one"""
+    return [f"txn_{date.replace('-', '_')}_{transaction_id:03d}"
+            for transaction_id, date in enumerate(dates, start=start)]
+
+
+def sample_table_number(order_id: str) -> int:
+    """Stand-in table (1-19) for a historical dine-in order; the workbook has
+    none, and derived from the id it stays the same on every export"""
+    return zlib.crc32(order_id.encode('utf-8')) % 19 + 1
+
+
+def assign_transaction_ids(records: List[Dict]) -> List[Dict]:
+    """Number transaction records in workbook order"""
+    for record, transaction_id in zip(records, transaction_ids(record['date'] for record in records)):
+        record['id'] = transaction_id
+    return records
+
+
+def workbook_layouts(reference_dir: Path = REFERENCE_DIR) -> List[Dict]:
+    """Detected layout of every sheet the exporters read"""
+    pd = require('pandas')
+    layouts = [detect_layout(pd.read_excel(reference_dir / GRAND_TOTALS_WORKBOOK), 'MONTH', 'month',
+                             GRAND_TOTALS_WORKBOOK).summary()]
+    with pd.ExcelFile(reference_dir / SALES_WORKBOOK) as xl_file:
+        for sheet_name in xl_file.sheet_names:
+            df = xl_file.parse(sheet_name)
+            if sheet_name == SUMMARY_SHEET:
+                layouts.append(detect_layout(df, 'DATE', 'date', sheet_name).summary())
+            elif is_daily_sheet(sheet_name):
+                layouts.append(detect_layout(df, 'TRANSACTION', 'number', sheet_name, date_column='DATE').summary())
+    return layouts
+
+
+def export_complete_monthly_summary(reference_dir: Path = REFERENCE_DIR, output_dir: Path = DATA_DIR):
+    """Export ALL columns from Grand_Totals_Sales_Summary.xlsx"""
+    pd = require('pandas')
+
+    try:
+        df = pd.read_excel(reference_dir / GRAND_TOTALS_WORKBOOK)
+
+        # Clean column names
+        df.columns = [clean_column_name(col) for col in df.columns]
+
+        # Convert to DataFrame and save
+        with quarantine_for(output_dir, 'monthly_summary_complete') as quarantine:
+            df_complete = pd.DataFrame(monthly_summary_records(df, quarantine))
+        write_export_csv(df_complete, output_dir / 'monthly_summary_complete.csv')
+        log.info("Processed %d complete monthly summary records with %d columns", len(df_complete), len(df_complete.columns))
+
+        # Also create a column mapping file
+        _write_column_mapping(output_dir / 'monthly_summary_columns.json', df.columns, df_complete.columns)
+
+        return df_complete
+
+    except Exception as e:
+        log.error("Error processing complete monthly summary: %s", e)
+        return None
+
+
+def export_complete_daily_summary(reference_dir: Path = REFERENCE_DIR, output_dir: Path = DATA_DIR):
+    """Export ALL columns from the monthly summary sheet (FEB 2022)"""
+    pd = require('pandas')
+
+    try:
+        df = pd.read_excel(reference_dir / SALES_WORKBOOK, sheet_name=SUMMARY_SHEET)
+
+        # Clean column names
+        df.columns = [clean_column_name(col) for col in df.columns]
+
+        # Convert to DataFrame and save
+        with quarantine_for(output_dir, 'daily_summary_complete') as quarantine:
+            df_complete = pd.DataFrame(daily_summary_records(df, quarantine))
+        if len(df_complete) > 0:
+            write_export_csv(df_complete, output_dir / 'daily_summary_complete.csv')
+            log.info("Processed %d complete daily summary records with %d columns", len(df_complete), len(df_complete.columns))
+
+            # Create column mapping
+            _write_column_mapping(output_dir / 'daily_summary_columns.json', df.columns, df_complete.columns)
+
+        return df_complete
+
+    except Exception as e:
+        log.error("Error processing complete daily summary: %s", e)
+        return None
+
+
+class RejectLog:
+    """Quarantine stand-in for worker processes and the watcher: keeps the
+    rejects so they can be added to the real quarantine in workbook order"""
+
+    def __init__(self):
+        self.entries = []
+
+    def add(self, source: str, row_index, reason, row: Optional[Dict] = None):
+        self.entries.append((source, row_index, str(reason), row))
+
+
+def _parse_transaction_sheets(xl_file, sheet_names: List[str], quarantine) -> Tuple[List[Dict], Optional[Tuple]]:
+    """Transaction records of the given daily sheets, plus the first sheet's
+    (name, cleaned columns) for the column mapping"""
+    records = []
+    sample_columns = None
+    for sheet_name in sheet_names:
+        try:
+            df = xl_file.parse(sheet_name)
+
+            # Clean column names
+            df.columns = [clean_column_name(col) for col in df.columns]
+            if sample_columns is None:
+                sample_columns = (sheet_name, list(df.columns))
+
+            records.extend(transaction_sheet_records(df, sheet_name, quarantine))
+
+        except Exception as e:
+            quarantine.add(sheet_name, None, f"Sheet skipped: {e}")
+            log.error("Error processing sheet %s: %s", sheet_name, e)
+            continue
+    return records, sample_columns
+
+
+# Workbooks a worker process has opened; opening one costs several times
+# more than parsing a sheet, so it stays open for the process's next runs
+_open_workbooks: Dict[str, object] = {}
+
+
+def _transaction_worker(workbook: str, sheet_names: List[str]) -> Dict:
+    """Parse a run of daily sheets in a worker process; the records go back
+    through shared memory, the rejects and column sample as a small pickle"""
+    pd = require('pandas')
+    rejects = RejectLog()
+    xl_file = _open_workbooks.get(workbook)
+    if xl_file is None:
+        xl_file = _open_workbooks[workbook] = pd.ExcelFile(workbook)
+    records, sample_columns = _parse_transaction_sheets(xl_file, sheet_names, rejects)
+    return {'frame': share_frame(pd.DataFrame(records)), 'rejects': rejects.entries, 'sample': sample_columns}
+
+
+def _discard_transaction_result(result: Dict):
+    """Release the shared frame of a worker result the stream dropped"""
+    if result['frame']:
+        with attach_frame(result['frame']):
+            pass
+
+
+class _TransactionStream:
+    """Streamed transactions export (streams.run_stream)
+
+        decode   worker processes parse and clean the daily sheets into shared frames
+        collect  takes the frames over in workbook order, numbers the transactions, files the rejects
+        format   formats the chunk's amounts as they will be written
+        load     with a client: re-batches the rows and upserts full batches on a
+                 thread pool while later sheets are still being parsed
+
+    The load stage keeps at most `load_workers` requests in flight; when they
+    are all busy it waits, which backs the queues up to the decoders.
+    """
+
+    def __init__(self, quarantine: Quarantine, client=None, table: str = 'historical_transactions',
+                 batch_size: int = 500, load_workers: int = 4, retries: int = 2):
+        self.quarantine = quarantine
+        self.client = client
+        self.table = table
+        self.batch_size = batch_size
+        self.load_workers = max(1, load_workers)
+        self.retries = retries
+        self.sample_columns = None
+        self.numbered = 0
+        self.unsent: List[Dict] = []
+        self.unsent_columns: List[str] = []
+        self.requests = set()
+        self.pool = ThreadPoolExecutor(max_workers=self.load_workers) if client is not None else None
+
+    def stages(self, workers: int) -> List[StreamStage]:
+        stages = [
+            StreamStage('decode', _transaction_run_worker, workers, processes=True, discard=_discard_transaction_result),
+            StreamStage('collect', self.collect),
+            StreamStage('format', self.format),
+        ]
+        if self.client is not None:
+            stages.append(StreamStage('load', self.load))
+        return stages
+
+    def collect(self, result: Dict):
+        for entry in result['rejects']:
+            self.quarantine.add(*entry)
+        self.sample_columns = self.sample_columns or result['sample']
+        df = concat_frames([result['frame']])
+        if df is not None:
+            df['id'] = transaction_ids(df['date'], start=self.numbered + 1)
+            self.numbered += len(df)
+        return df
+
+    def format(self, df):
+        return None if df is None else (df, export_frame(df))
+
+    def load(self, chunk):
+        """Queue a chunk's rows, as the CSV will hold them, and send every full batch"""
+        if chunk is not None:
+            reader = csv.reader(io.StringIO(chunk[1].to_csv(index=False)))
+            columns = next(reader)
+            # Rows of one bulk upsert must all have the same columns
+            if self.unsent and columns != self.unsent_columns:
+                self._send(self.unsent)
+                self.unsent = []
+            self.unsent_columns = columns
+            self.unsent.extend(parse_export_row(dict(zip(columns, values))) for values in reader)
+            while len(self.unsent) >= self.batch_size:
+                self._send(self.unsent[:self.batch_size])
+                del self.unsent[:self.batch_size]
+        return chunk
+
+    def _send(self, rows: List[Dict]):
+        from .supabase_client import push_delta
+
+        if len(self.requests) >= self.load_workers:
+            done, self.requests = wait(self.requests, return_when=FIRST_COMPLETED)
+            for request in done:
+                request.result()
+        self.requests.add(self.pool.submit(
+            push_delta, self.client, self.table, rows, [], self.batch_size, retries=self.retries))
+
+    def finish_load(self):
+        """Send the last partial batch and wait for every request"""
+        if self.unsent:
+            self._send(self.unsent)
+            self.unsent = []
+        for request in self.requests:
+            request.result()
+        self.requests = set()
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _transaction_run_worker(job: Tuple[str, List[str]]) -> Dict:
+    return _transaction_worker(*job)
+
+
+def _stream_transaction_sheets(workbook: Path, sheet_names: List[str], stream: _TransactionStream, workers: int,
+                               queue_size: int):
+    """Run the daily sheets through the stream; returns the (cents, formatted)
+    frames put together in workbook order, or None when no sheet had rows"""
+    pd = require('pandas')
+    # One sheet per run, so every later stage starts on the first sheet
+    runs = [(str(workbook), [sheet_name]) for sheet_name in sheet_names]
+
+    started = time.perf_counter()
+    try:
+        chunks, busy = run_stream(runs, stream.stages(workers), queue_size)
+        if stream.client is not None:
+            stream.finish_load()
+    finally:
+        stream.close()
+    log.info("Streamed %d sheet runs in %.1fs (busy: %s)", len(runs), time.perf_counter() - started,
+             ', '.join(f"{name} {seconds:.1f}s" for name, seconds in busy.items()))
+
+    chunks = [chunk for chunk in chunks if chunk is not None]
+    if not chunks:
+        return None
+    return (pd.concat([chunk[0] for chunk in chunks], ignore_index=True),
+            pd.concat([chunk[1] for chunk in chunks], ignore_index=True))
+
+
+def _finish_stream_load(snapshot: Path, table: str, client, batch_size: int, retries: int):
+    """Delete the table's rows the new snapshot dropped and record the
+    snapshot generation as loaded"""
+    from .changeset import load_fingerprints, mark_loaded, plan_deletes
+    from .supabase_client import push_delta
+
+    deleted = plan_deletes(snapshot, table, client)
+    if deleted:
+        push_delta(client, table, [], deleted, batch_size, retries=retries)
+    mark_loaded(snapshot, table, load_fingerprints(snapshot)['generation'])
+
+
+def export_complete_transactions(reference_dir: Path = REFERENCE_DIR, output_dir: Path = DATA_DIR,
+                                 workers: Optional[int] = None, client=None,
+                                 table: str = 'historical_transactions', queue_size: int = 4,
+                                 batch_size: int = 500, load_workers: int = 4, retries: int = 2):
+    """Export ALL transaction details from daily sheets
+
+    With more than one worker (default: CPU count), or a Supabase client to
+    load into, the daily sheets are streamed: parsed in worker processes,
+    collected, formatted and (with `client`) upserted into `table`
+    concurrently, connected by queues holding at most `queue_size` chunks.
+    """
+    pd = require('pandas')
+    workers = workers or os.cpu_count() or 1
+    snapshot = output_dir / 'transactions_complete.csv'
+
+    try:
+        with pd.ExcelFile(reference_dir / SALES_WORKBOOK) as xl_file:
+            daily_sheets = [sheet_name for sheet_name in xl_file.sheet_names if is_daily_sheet(sheet_name)]
+
+            with quarantine_for(output_dir, 'transactions_complete') as quarantine:
+                streamed = False
+                if client is not None or (workers > 1 and len(daily_sheets) > 1):
+                    stream = _TransactionStream(quarantine, client, table, batch_size, load_workers, retries)
+                    try:
+                        frames = _stream_transaction_sheets(
+                            reference_dir / SALES_WORKBOOK, daily_sheets, stream,
+                            max(1, min(workers, len(daily_sheets))), queue_size)
+                        streamed = True
+                    except (FujiImportError, OSError) as e:
+                        # Rows already loaded cannot be taken back; let a load fail
+                        if client is not None:
+                            raise
+                        log.warning("Parallel sheet parsing failed (%s); parsing sequentially", e)
+                if streamed:
+                    df_complete, formatted = frames if frames is not None else (None, None)
+                    sample_columns = stream.sample_columns
+                else:
+                    records, sample_columns = _parse_transaction_sheets(xl_file, daily_sheets, quarantine)
+                    df_complete = pd.DataFrame(records) if records else None
+                    if df_complete is not None:
+                        df_complete['id'] = transaction_ids(df_complete['date'])
+                        formatted = export_frame(df_complete)
+
+        # Save the numbered transactions
+        if df_complete is not None:
+            write_export_text(formatted.to_csv(index=False), snapshot)
+            if client is not None:
+                _finish_stream_load(snapshot, table, client, batch_size, retries)
+            log.info("Processed %d complete transaction records with %d columns", len(df_complete), len(df_complete.columns))
+
+            # Create column mapping from the first daily sheet
+            sample_sheet, original_cols = sample_columns
+            _write_column_mapping(
+                output_dir / 'transactions_columns.json', original_cols, df_complete.columns,
+                sample_sheet=sample_sheet
+            )
+
+            return df_complete
+
+        return None
+
+    except Exception as e:
+        log.error("Error processing complete transactions: %s", e)
+        return None
+
+
+def process_monthly_summary(reference_dir: Path = REFERENCE_DIR, output_dir: Path = DATA_DIR):
+    """Process Grand_Totals_Sales_Summary.xlsx for daily_sales table"""
+    pd = require('pandas')
+
+    try:
+        df = pd.read_excel(reference_dir / GRAND_TOTALS_WORKBOOK)
+
+        # Clean up the data
+        daily_sales = []
+
+        with quarantine_for(output_dir, 'monthly_sales_summary') as quarantine:
+            data = detect_layout(df, 'MONTH', 'month', GRAND_TOTALS_WORKBOOK).data(df)
+            for idx, row in data.iterrows():
+                month_str = str(row['MONTH']).strip()
+                try:
+                    year, month, _ = parse_month_label(month_str)
+
+                    # Use first day of month as date
+                    daily_sales.append({
+                        'date': f"{year}-{month:02d}-01",
+                        'togo_sales': to_cents(row['TOGO']),
+                        'dine_in_sales': to_cents(row['DINE IN']),
+                        'tax_collected': to_cents(row['TAX']),
+                        'gross_sale': to_cents(row['GROSS SALE']),
+                        'gratuity_total': to_cents(row['GRATUITY']),
+                        'net_sale': to_cents(row['NET SALE']),
+                        'credit_total': to_cents(row['CREDT TOTAL']),
+                        'cash_deposited': to_cents(row['CASH '])
+                    })
+                except (ValueError, KeyError) as e:
+                    _reject(quarantine, GRAND_TOTALS_WORKBOOK, idx, f"Invalid month {month_str!r}: {e}", row)
+                    continue
+
+        # Convert to DataFrame and save
+        df_clean = pd.DataFrame(daily_sales)
+        write_export_csv(df_clean, output_dir / 'monthly_sales_summary.csv')
+        log.info("Processed %d monthly summary records", len(df_clean))
+        return df_clean
+
+    except Exception as e:
+        log.error("Error processing monthly summary: %s", e)
+        return None
+
+
+def process_detailed_transactions(reference_dir: Path = REFERENCE_DIR, output_dir: Path = DATA_DIR):
+    """Process Month_Year_SALES.xlsx for orders and order_items tables"""
+    pd = require('pandas')
+    try:
+        xl_file = pd.ExcelFile(reference_dir / SALES_WORKBOOK)
+
+        orders = []
+        order_items = []
+        order_id_counter = 1
+
+        with quarantine_for(output_dir, 'historical_orders') as quarantine:
+            for sheet_name in xl_file.sheet_names:
+                # Process daily transaction sheets (2-1, 2-2, etc.)
+                if is_daily_sheet(sheet_name):
+                    try:
+                        df = xl_file.parse(sheet_name)
+
+                        # Get date from first row
+                        if len(df) == 0:
+                            continue
+
+                        layout = detect_layout(df, 'TRANSACTION', 'number', sheet_name, date_column='DATE')
+                        if layout.sheet_date is not None:
+                            order_date = layout.sheet_date.strftime('%Y-%m-%d')
+                        else:
+                            # Fallback: parse from sheet name
+                            day = sheet_name.split('-')[1]
+                            order_date = f"2022-02-{day.zfill(2)}"
+
+                        # Process transactions (header and totals rows are outside the data block)
+                        transaction_rows = layout.data(df)
+
+                        for idx, row in transaction_rows.iterrows():
+                            try:
+                                # Calculate amounts (integer cents throughout)
+                                togo_amount = to_cents(row.get('TO GO ', 0))
+                                dinein_amount = to_cents(row.get('DINE IN', 0))
+                                total_amount = to_cents(row.get('TOTAL', 0))
+                                service_charge = to_cents(row.get('SERVICE', 0))
+                                receipt_total = to_cents(row.get('RECEIPT ', 0))
+
+                                if total_amount <= 0:
+                                    continue
+
+                                # Determine order type
+                                order_type = 'take_out' if togo_amount > 0 else 'dine_in'
+                                subtotal = togo_amount + dinein_amount if (togo_amount + dinein_amount) > 0 else total_amount
+
+                                # Calculate tax and gratuity (reverse engineer from receipt total)
+                                tax = max(0, total_amount - subtotal) if subtotal > 0 else 0
+                                gratuity = max(0, receipt_total - total_amount - service_charge) if receipt_total > total_amount else 0
+
+                                # Create order record
+                                order_id = f"ord_{order_id_counter:06d}"
+                                order = {
+                                    'id': order_id,
+                                    'order_date': order_date,
+                                    'type': order_type,
+                                    'table_number': None if order_type == 'take_out' else sample_table_number(order_id),
+                                    'server_id': 'srv_001',  # Default server for historical data
+                                    'status': 'completed',
+                                    'subtotal': subtotal,
+                                    'tax': tax,
+                                    'gratuity': gratuity,
+                                    'total': receipt_total if receipt_total > 0 else total_amount,
+                                    'payment_method': 'credit' if service_charge > 0 else 'cash'
+                                }
+                                orders.append(order)
+
+                                # Create sample order items (since we don't have item details)
+                                # Generate 1-4 items per order based on subtotal
+                                num_items = min(4, max(1, subtotal // 2000))
+                                # Split the subtotal exactly; the first items take the leftover cents
+                                item_price, leftover = divmod(subtotal, num_items)
+
+                                for item_idx in range(num_items):
+                                    order_items.append({
+                                        'id': f"oit_{order_id_counter:06d}_{item_idx:02d}",
+                                        'order_id': order['id'],
+                                        'item_id': f"menu_item_{(item_idx % 10) + 1:02d}",  # Cycle through sample items
+                                        'quantity': 1,
+                                        'unit_price': item_price + (1 if item_idx < leftover else 0),
+                                        'modifiers': '{}',
+                                        'special_instructions': ''
+                                    })
+
+                                order_id_counter += 1
+
+                            except Exception as e:
+                                _reject(quarantine, sheet_name, idx, e, row)
+                                continue
+
+                    except Exception as e:
+                        quarantine.add(sheet_name, None, f"Sheet skipped: {e}")
+                        log.error("Error processing sheet %s: %s", sheet_name, e)
+                        continue
+
+        # Save to CSV files
+        orders_df = pd.DataFrame(orders)
+        order_items_df = pd.DataFrame(order_items)
+
+        write_export_csv(orders_df, output_dir / 'historical_orders.csv')
+        write_export_csv(order_items_df, output_dir / 'historical_order_items.csv')
+
+        log.info("Processed %d orders and %d order items", len(orders_df), len(order_items_df))
+        return orders_df, order_items_df
+
+    except Exception as e:
+        log.error("Error processing detailed transactions: %s", e)
+        return None, None
@@ -0,0 +1,110 @@
+"""
+Shared-memory DataFrame handoff between worker processes and the parent
+A worker returning a DataFrame from a ProcessPoolExecutor has it pickled,
+piped to the parent and unpickled there, which costs more than parsing a
+small sheet. Instead share_frame() lays the frame's columns out in one
+multiprocessing.shared_memory segment (numeric columns as their own dtype,
+text columns as fixed-width unicode arrays) and the worker returns only a
+small descriptor: segment name, row count and each column's dtype and
+offset.
+
+The parent attaches to the segment and wraps the columns in numpy arrays over
+its buffer, so numeric columns are read in place; the only copy is the one
+that merges the workers' frames into a frame the parent owns (concat_frames),
+after which the segments are unlinked.
+"""
+
+from contextlib import ExitStack, contextmanager
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, List, Optional
+
+from .core import FujiImportError, require
+
+# Column offsets are aligned so every view starts on a 64-byte boundary
+ALIGNMENT = 64
+
+
+def _align(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def _column_array(np, column):
+    """Numeric columns as they are; anything else must hold strings"""
+    if column.dtype.kind in 'biuf':
+        return column.to_numpy()
+    values = column.tolist()
+    if not all(isinstance(value, str) for value in values):
+        raise FujiImportError(f"Column '{column.name}' mixes text and other values; it cannot be shared")
+    return np.array(values, dtype=str) if values else np.zeros(0, dtype='U1')
+
+
+def share_frame(df) -> Optional[Dict]:
+    """Copy a DataFrame's columns into a new shared memory segment and return
+    its descriptor (None for an empty frame). The segment stays until the
+    receiving side unlinks it (attach_frame)."""
+    np = require('numpy')
+    if df.empty:
+        return None
+
+    arrays = [(str(name), _column_array(np, df[name])) for name in df.columns]
+    columns, size = [], 0
+    for name, array in arrays:
+        offset = _align(size)
+        columns.append({'name': name, 'dtype': array.dtype.str, 'offset': offset})
+        size = offset + array.nbytes
+
+    segment = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    try:
+        for column, (_, array) in zip(columns, arrays):
+            np.ndarray(array.shape, dtype=array.dtype, buffer=segment.buf, offset=column['offset'])[:] = array
+    except Exception:
+        segment.close()
+        segment.unlink()
+        raise
+    descriptor = {'segment': segment.name, 'rows': len(df), 'columns': columns}
+    segment.close()
+    # The segment now belongs to whoever attaches it: keep this process's
+    # resource tracker from unlinking it when the worker exits
+    resource_tracker.unregister(segment._name, 'shared_memory')
+    return descriptor
+
+
+@contextmanager
+def attach_frame(descriptor: Dict):
+    """DataFrame over a shared segment; numeric columns are views into it, so
+    nothing taken from the frame may outlive the block. Unlinks on exit."""
+    np = require('numpy')
+    pd = require('pandas')
+    segment = shared_memory.SharedMemory(name=descriptor['segment'])
+    try:
+        rows = descriptor['rows']
+        views = {
+            column['name']: np.ndarray((rows,), dtype=np.dtype(column['dtype']), buffer=segment.buf,
+                                       offset=column['offset'])
+            for column in descriptor['columns']
+        }
+        frame = pd.DataFrame(views, copy=False)
+        del views
+        yield frame
+        del frame
+    finally:
+        try:
+            segment.close()
+        except BufferError:
+            # Views still referenced (by an exception's traceback); the
+            # mapping goes away with them
+            pass
+        segment.unlink()
+
+
+def concat_frames(descriptors: List[Optional[Dict]]):
+    """Merge shared frames, in order, into one DataFrame owned by this process
+    (None when every frame was empty); all segments are unlinked"""
+    pd = require('pandas')
+    with ExitStack() as stack:
+        frames = [stack.enter_context(attach_frame(descriptor)) for descriptor in descriptors if descriptor]
+        if not frames:
+            return None
+        merged = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0].copy()
+        del frames
+        return merged
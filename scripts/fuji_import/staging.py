@@ -0,0 +1,266 @@
+"""
+SQLite staging store between the exporters and the loaders
+Every export written through write_export_csv is also staged into
+data/staging.db: one typed table per export (text columns TEXT, counts and
+amounts INTEGER, amounts in cents), keyed on id, with indexes on the date and
+*_id columns. The database runs in WAL mode and each export is applied in one
+batched transaction that only rewrites rows whose values changed and deletes
+rows that disappeared, so concurrent exporters and readers do not block each
+other and a failed export leaves the previous data intact.
+
+Loaders, verification and ad-hoc lookups read from the store (export_rows)
+instead of re-parsing the CSV text, falling back to the CSV when the staged
+copy is missing or older than the file.
+"""
+
+import csv
+import io
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from .core import EXPORT_TEXT_COLUMNS, FujiImportError, parse_export_row, read_export_rows
+from .logs import get_logger
+
+log = get_logger('staging')
+
+STAGING_DB = 'staging.db'
+DATE_COLUMNS = {'date', 'order_date'}
+BATCH_SIZE = 1000
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def column_type(column: str) -> str:
+    return 'TEXT' if column in EXPORT_TEXT_COLUMNS else 'INTEGER'
+
+
+def _is_indexed(column: str, key: str) -> bool:
+    return column != key and (column in DATE_COLUMNS or column.endswith('_id'))
+
+
+class StagingStore:
+    """Typed, indexed copy of the exports in a local SQLite database"""
+
+    def __init__(self, path: Path, timeout: float = 30.0):
+        self.path = path
+        # Autocommit; transactions are opened explicitly with BEGIN IMMEDIATE
+        self.conn = sqlite3.connect(str(path), timeout=timeout, isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS _datasets ("
+            "name TEXT PRIMARY KEY, source TEXT, source_size INTEGER, source_mtime_ns INTEGER, "
+            "rows INTEGER, staged_at TEXT)"
+        )
+
+    @classmethod
+    def for_dir(cls, data_dir: Path) -> 'StagingStore':
+        return cls(data_dir / STAGING_DB)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self) -> 'StagingStore':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @contextmanager
+    def transaction(self):
+        """Write transaction; takes the write lock up front so concurrent writers queue instead of deadlocking"""
+        self.conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield self.conn
+        except BaseException:
+            self.conn.execute('ROLLBACK')
+            raise
+        self.conn.execute('COMMIT')
+
+    def tables(self) -> List[str]:
+        rows = self.conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE '\\_%' ESCAPE '\\' "
+            "AND name NOT LIKE 'sqlite_%' ORDER BY name"
+        )
+        return [row['name'] for row in rows]
+
+    def columns(self, table: str) -> List[str]:
+        return [row['name'] for row in self.conn.execute(f'PRAGMA table_info({_quote(table)})')]
+
+    def ensure_table(self, table: str, columns: Sequence[str], key: str = 'id',
+                     types: Optional[Dict[str, str]] = None):
+        """Create the table, or add any columns it is missing, with its indexes
+        (`types` overrides the column types derived from the export columns)"""
+        types = types or {}
+        existing = self.columns(table)
+        if not existing:
+            definitions = [
+                f"{_quote(col)} {types.get(col) or column_type(col)}{' PRIMARY KEY' if col == key else ''}"
+                for col in columns
+            ]
+            self.conn.execute(f"CREATE TABLE {_quote(table)} ({', '.join(definitions)})")
+        added = [col for col in columns if col not in existing] if existing else list(columns)
+        for col in added:
+            if existing:
+                self.conn.execute(f"ALTER TABLE {_quote(table)} ADD COLUMN {_quote(col)} "
+                                  f"{types.get(col) or column_type(col)}")
+            if _is_indexed(col, key):
+                self.conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS {_quote(f'idx_{table}_{col}')} ON {_quote(table)} ({_quote(col)})"
+                )
+
+    def _upsert(self, table: str, columns: Sequence[str], rows: Iterable[Dict], key: str) -> int:
+        """Insert new rows and update rows whose values differ; returns rows written"""
+        names = ', '.join(_quote(col) for col in columns)
+        others = [col for col in columns if col != key]
+        sql = f"INSERT INTO {_quote(table)} ({names}) VALUES ({', '.join('?' * len(columns))}) " \
+              f"ON CONFLICT({_quote(key)}) DO "
+        if others:
+            current = ', '.join(f'{_quote(table)}.{_quote(col)}' for col in others)
+            incoming = ', '.join(f'excluded.{_quote(col)}' for col in others)
+            sets = ', '.join(f'{_quote(col)} = excluded.{_quote(col)}' for col in others)
+            sql += f"UPDATE SET {sets} WHERE ({current}) IS NOT ({incoming})"
+        else:
+            sql += "NOTHING"
+
+        before = self.conn.total_changes
+        batch: List[tuple] = []
+        for row in rows:
+            batch.append(tuple(row.get(col) for col in columns))
+            if len(batch) >= BATCH_SIZE:
+                self.conn.executemany(sql, batch)
+                batch = []
+        if batch:
+            self.conn.executemany(sql, batch)
+        return self.conn.total_changes - before
+
+    def _delete(self, table: str, keys: Sequence, key: str) -> int:
+        before = self.conn.total_changes
+        sql = f"DELETE FROM {_quote(table)} WHERE {_quote(key)} = ?"
+        for i in range(0, len(keys), BATCH_SIZE):
+            self.conn.executemany(sql, [(k,) for k in keys[i:i + BATCH_SIZE]])
+        return self.conn.total_changes - before
+
+    def apply_changes(self, table: str, upserts: List[Dict], deleted: Sequence, key: str = 'id') -> int:
+        """Apply a partial update (changed rows plus deleted keys) in one transaction"""
+        with self.transaction():
+            if upserts:
+                self.ensure_table(table, list(upserts[0]), key)
+                written = self._upsert(table, list(upserts[0]), upserts, key)
+            else:
+                written = 0
+            if deleted and self.columns(table):
+                written += self._delete(table, list(deleted), key)
+        return written
+
+    def replace_snapshot(self, table: str, columns: Sequence[str], rows: List[Dict], key: str = 'id',
+                         source: Optional[Path] = None) -> int:
+        """Make the table hold exactly `rows`; returns rows inserted, updated or deleted"""
+        with self.transaction():
+            self.ensure_table(table, columns, key)
+            written = self._upsert(table, columns, rows, key)
+
+            self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS _keep (key PRIMARY KEY)")
+            self.conn.execute("DELETE FROM _keep")
+            for i in range(0, len(rows), BATCH_SIZE):
+                self.conn.executemany("INSERT OR IGNORE INTO _keep VALUES (?)",
+                                      [(row[key],) for row in rows[i:i + BATCH_SIZE]])
+            before = self.conn.total_changes
+            self.conn.execute(f"DELETE FROM {_quote(table)} WHERE {_quote(key)} NOT IN (SELECT key FROM _keep)")
+            written += self.conn.total_changes - before
+            self.conn.execute("DELETE FROM _keep")
+
+            stat = source.stat() if source and source.exists() else None
+            self.conn.execute(
+                "INSERT OR REPLACE INTO _datasets VALUES (?, ?, ?, ?, ?, ?)",
+                (table, source.name if source else None, stat.st_size if stat else None,
+                 stat.st_mtime_ns if stat else None, len(rows), datetime.now().isoformat(timespec='seconds'))
+            )
+        return written
+
+    def replace_partitions(self, table: str, columns: Sequence[str], rows: List[Dict], partition_column: str,
+                           partitions: Iterable, key: str = 'id', types: Optional[Dict[str, str]] = None) -> int:
+        """Replace the rows of some partitions (values of `partition_column`) in
+        one transaction; rows outside those partitions are left as they are"""
+        partitions = list(partitions)
+        with self.transaction():
+            self.ensure_table(table, columns, key, types)
+            self.conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {_quote(f'idx_{table}_{partition_column}')} "
+                f"ON {_quote(table)} ({_quote(partition_column)})"
+            )
+            before = self.conn.total_changes
+            sql = f"DELETE FROM {_quote(table)} WHERE {_quote(partition_column)} = ?"
+            for i in range(0, len(partitions), BATCH_SIZE):
+                self.conn.executemany(sql, [(p,) for p in partitions[i:i + BATCH_SIZE]])
+            deleted = self.conn.total_changes - before
+            return deleted + self._upsert(table, columns, rows, key)
+
+    def is_current(self, table: str, source: Path) -> bool:
+        """Whether the staged table was written from this exact version of the file"""
+        row = self.conn.execute("SELECT source_size, source_mtime_ns FROM _datasets WHERE name = ?", (table,)).fetchone()
+        if row is None or not source.exists():
+            return False
+        stat = source.stat()
+        return (row['source_size'], row['source_mtime_ns']) == (stat.st_size, stat.st_mtime_ns)
+
+    def query(self, sql: str, params: Sequence = ()) -> List[Dict]:
+        return [dict(row) for row in self.conn.execute(sql, params)]
+
+    def rows(self, table: str, order_by: Optional[str] = None) -> List[Dict]:
+        if table not in self.tables():
+            raise FujiImportError(f"No staged table '{table}'")
+        order = f" ORDER BY {_quote(order_by)}" if order_by else ' ORDER BY rowid'
+        return self.query(f"SELECT * FROM {_quote(table)}{order}")
+
+    def info(self) -> List[Dict]:
+        datasets = {row['name']: row for row in self.query("SELECT * FROM _datasets")}
+        return [
+            {'table': table, 'rows': self.conn.execute(f"SELECT count(*) FROM {_quote(table)}").fetchone()[0],
+             'source': datasets.get(table, {}).get('source'), 'staged_at': datasets.get(table, {}).get('staged_at')}
+            for table in self.tables()
+        ]
+
+
+def stage_export(text: str, path: Path, key: str = 'id') -> Optional[int]:
+    """Stage the CSV text of an export written to `path` (skipped without a key column)"""
+    reader = csv.reader(io.StringIO(text))
+    columns = next(reader, [])
+    if key not in columns:
+        return None
+    rows = [parse_export_row(dict(zip(columns, values))) for values in reader]
+    with StagingStore.for_dir(path.parent) as store:
+        written = store.replace_snapshot(path.stem, columns, rows, key, source=path)
+    log.info("   🗄️  %s:%s: %d rows written", STAGING_DB, path.stem, written)
+    return written
+
+
+def export_rows(path: Path) -> List[Dict]:
+    """Rows of an export as read_export_rows returns them (in id order when they
+    come from the staging store, which is used whenever it is current)"""
+    db = path.parent / STAGING_DB
+    if db.exists():
+        with StagingStore(db) as store:
+            if store.is_current(path.stem, path):
+                columns = store.columns(path.stem)
+                with open(path, newline='', encoding='utf-8') as f:
+                    header = next(csv.reader(f), columns)
+                return [{col: row.get(col) for col in header} for row in store.rows(path.stem, order_by='id')]
+    return read_export_rows(path)
+
+
+def rebuild(data_dir: Path) -> Dict[str, int]:
+    """Stage every keyed CSV export already in data_dir"""
+    staged = {}
+    for path in sorted(data_dir.glob('*.csv')):
+        with open(path, newline='', encoding='utf-8') as f:
+            written = stage_export(f.read(), path)
+        if written is not None:
+            staged[path.stem] = written
+    return staged
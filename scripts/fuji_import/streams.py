@@ -0,0 +1,204 @@
+"""
+Bounded-queue stage streams
+run_stream() pushes items through a chain of stages that run concurrently:
+each stage has its own thread or process pool, and consecutive stages are
+joined by bounded queues. A stage whose output queue is full blocks, so a
+slow consumer holds its producers back instead of letting their results pile
+up in memory, and the end-to-end time tends towards that of the slowest stage
+rather than the sum of all of them.
+
+Results keep source order: a stage with several workers runs up to that many
+items at once but hands them on in the order they arrived. Stage functions
+for process stages must be module level (they are pickled); thread stages may
+be bound methods that keep state, which is safe when they have one worker.
+
+The first stage failure stops the stream: the other stages stop taking new
+items, results that never reached the end are passed to their stage's
+`discard` (e.g. to release shared memory) and the error is raised.
+"""
+
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .logs import get_logger
+
+log = get_logger('streams')
+
+# How often a blocked stage checks whether the stream was stopped
+POLL_SECONDS = 0.05
+
+_DONE = object()
+
+
+class _Stopped(Exception):
+    """The stream was stopped while a stage waited on a queue"""
+
+
+class StreamStage:
+    """A step applied to every item of a stream, in `workers` threads or processes"""
+
+    def __init__(self, name: str, func: Callable[[Any], Any], workers: int = 1, processes: bool = False,
+                 discard: Optional[Callable[[Any], None]] = None):
+        self.name = name
+        self.func = func
+        self.workers = max(1, workers)
+        self.processes = processes
+        self.discard = discard
+
+
+def _timed(func, item) -> Tuple[float, Any]:
+    started = time.perf_counter()
+    result = func(item)
+    return time.perf_counter() - started, result
+
+
+def _put(target: queue.Queue, item, stop: threading.Event):
+    while not stop.is_set():
+        try:
+            target.put(item, timeout=POLL_SECONDS)
+            return
+        except queue.Full:
+            continue
+    raise _Stopped
+
+
+def _get(source: queue.Queue, stop: threading.Event):
+    while not stop.is_set():
+        try:
+            return source.get(timeout=POLL_SECONDS)
+        except queue.Empty:
+            continue
+    raise _Stopped
+
+
+def _drop(stage: StreamStage, result):
+    if stage.discard is not None and result is not _DONE:
+        try:
+            stage.discard(result)
+        except Exception as e:
+            log.warning("Could not discard a %s result: %s", stage.name, e)
+
+
+class _Stream:
+    def __init__(self, stages: Sequence[StreamStage], queue_size: int):
+        self.stages = list(stages)
+        # queues[i] feeds stage i; the last one holds the stream's results
+        self.queues = [queue.Queue(maxsize=max(1, queue_size)) for _ in range(len(self.stages) + 1)]
+        self.stop = threading.Event()
+        self.errors: List[Tuple[str, BaseException]] = []
+        self.busy = {stage.name: 0.0 for stage in self.stages}
+        self.lock = threading.Lock()
+
+    def fail(self, name: str, error: BaseException):
+        with self.lock:
+            self.errors.append((name, error))
+        self.stop.set()
+
+    def feed(self, source: Iterable):
+        try:
+            for item in source:
+                _put(self.queues[0], item, self.stop)
+            _put(self.queues[0], _DONE, self.stop)
+        except _Stopped:
+            pass
+        except BaseException as e:
+            self.fail('source', e)
+
+    def pump(self, index: int, executor):
+        stage = self.stages[index]
+        inbox, outbox = self.queues[index], self.queues[index + 1]
+        in_flight = deque()
+        try:
+            while True:
+                item = _get(inbox, self.stop)
+                if item is _DONE:
+                    break
+                in_flight.append(executor.submit(_timed, stage.func, item))
+                # Hand results on in order once every worker is busy
+                if len(in_flight) >= stage.workers:
+                    self._forward(stage, in_flight.popleft(), outbox)
+            while in_flight:
+                self._forward(stage, in_flight.popleft(), outbox)
+            _put(outbox, _DONE, self.stop)
+        except _Stopped:
+            pass
+        except BaseException as e:
+            self.fail(stage.name, e)
+        finally:
+            for future in in_flight:
+                if not future.cancel():
+                    try:
+                        _drop(stage, future.result()[1])
+                    except BaseException:
+                        pass
+
+    def _forward(self, stage: StreamStage, future, outbox: queue.Queue):
+        seconds, result = future.result()
+        with self.lock:
+            self.busy[stage.name] += seconds
+        try:
+            _put(outbox, result, self.stop)
+        except _Stopped:
+            _drop(stage, result)
+            raise
+
+    def drain(self):
+        """Discard whatever is left in the queues of a stopped stream"""
+        for index, pending in enumerate(self.queues[1:]):
+            while True:
+                try:
+                    _drop(self.stages[index], pending.get_nowait())
+                except queue.Empty:
+                    break
+
+
+def run_stream(source: Iterable, stages: Sequence[StreamStage], queue_size: int = 4) -> Tuple[List, Dict[str, float]]:
+    """Run every source item through the stages
+
+    Returns the last stage's results in source order and the seconds each
+    stage spent working. At most `queue_size` items wait between two stages.
+    """
+    stream = _Stream(stages, queue_size)
+    executors = [
+        (ProcessPoolExecutor if stage.processes else ThreadPoolExecutor)(max_workers=stage.workers)
+        for stage in stream.stages
+    ]
+    threads = [threading.Thread(target=stream.feed, args=(source,), name='stream-source', daemon=True)]
+    threads.extend(
+        threading.Thread(target=stream.pump, args=(index, executor), name=f'stream-{stage.name}', daemon=True)
+        for index, (stage, executor) in enumerate(zip(stream.stages, executors))
+    )
+
+    results = []
+    try:
+        for thread in threads:
+            thread.start()
+        while True:
+            try:
+                result = _get(stream.queues[-1], stream.stop)
+            except _Stopped:
+                break
+            if result is _DONE:
+                break
+            results.append(result)
+    except BaseException as e:
+        stream.fail('stream', e)
+    finally:
+        for thread in threads:
+            thread.join()
+        for executor in executors:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    if stream.errors:
+        stream.drain()
+        if stream.stages:
+            for result in results:
+                _drop(stream.stages[-1], result)
+        name, error = stream.errors[0]
+        log.error("Stream stage %s failed: %s", name, error)
+        raise error
+    return results, stream.busy
@@ -0,0 +1,90 @@
+"""
+Supabase connection and row helpers for the import tooling
+supabase and python-dotenv are only imported when a client is requested
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+from .core import REPO_ROOT, FujiImportError, format_cents, is_missing, is_money_column, require
+from .logs import get_logger
+
+log = get_logger('supabase')
+
+
+def get_supabase_client():
+    """Create a Supabase client from the service role credentials in .env.local"""
+    dotenv = require('dotenv')
+    supabase = require('supabase')
+
+    # Load environment variables
+    dotenv.load_dotenv(REPO_ROOT / '.env.local')
+
+    supabase_url = os.getenv('NEXT_PUBLIC_SUPABASE_URL')
+    supabase_key = os.getenv('SUPABASE_SERVICE_ROLE_KEY')
+
+    if not supabase_url or not supabase_key:
+        raise FujiImportError(
+            "Missing Supabase credentials in .env.local\n"
+            "Required: NEXT_PUBLIC_SUPABASE_URL and SUPABASE_SERVICE_ROLE_KEY"
+        )
+
+    return supabase.create_client(supabase_url, supabase_key)
+
+
+def to_table_row(record: Dict) -> Dict:
+    """Adapt an exported record to the historical_* table columns
+
+    Column names like 'unnamed_column_ 4' lose their space, NaN becomes NULL
+    and cents are sent as exact decimal strings ("1234.56").
+    """
+    row = {}
+    for key, value in record.items():
+        if is_missing(value):
+            value = None
+        elif is_money_column(key):
+            value = format_cents(value)
+        row[key.replace(' ', '')] = value
+    return row
+
+
+def execute_with_retry(query, retries: int = 0, backoff: float = 0.5):
+    """Execute a query, retrying failures with exponential backoff
+
+    Only use this for idempotent requests (upserts, deletes by id, selects).
+    """
+    for attempt in range(retries + 1):
+        try:
+            return query.execute()
+        except Exception as e:
+            if attempt == retries:
+                raise
+            log.warning("Request failed (%s); retry %d/%d", e, attempt + 1, retries)
+            time.sleep(backoff * 2 ** attempt)
+
+
+def push_delta(client, table: str, upserts: List[Dict], deleted_ids: List[str], batch_size: int = 500,
+               workers: int = 1, retries: int = 0, backoff: float = 0.5) -> None:
+    """Upsert changed rows and delete removed ones, keyed on the id column
+
+    With workers > 1 the batches are sent concurrently; every request is an
+    idempotent upsert or delete by id, so failed batches can be retried.
+    """
+    queries = []
+    for i in range(0, len(upserts), batch_size):
+        batch = [to_table_row(record) for record in upserts[i:i + batch_size]]
+        queries.append(client.table(table).upsert(batch, on_conflict='id'))
+
+    for i in range(0, len(deleted_ids), batch_size):
+        queries.append(client.table(table).delete().in_('id', deleted_ids[i:i + batch_size]))
+
+    if workers <= 1:
+        for query in queries:
+            execute_with_retry(query, retries, backoff)
+        return
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for future in [pool.submit(execute_with_retry, query, retries, backoff) for query in queries]:
+            future.result()
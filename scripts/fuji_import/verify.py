@@ -0,0 +1,212 @@
+"""
+Checksum verification of loaded tables
+Compares row counts and order-independent checksums per partition (a month
+of `date`, a category, ...) between the rows that were loaded and the
+Supabase table, and fetches rows only for partitions that differ, to report
+exactly which keys are missing, extra or changed.
+
+The database side is table_checksums() from migration
+010_verification_checksums.sql; both sides hash the same canonical row text
+(columns as text joined by \\x1f, NULL as \\N, amounts with two decimals,
+booleans as true/false). A partition's checksum is the sum of its rows' 64-bit
+md5 prefixes modulo 2**64, so row order does not matter.
+"""
+
+import hashlib
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Union
+
+from .core import DATA_DIR, FujiImportError, format_cents, is_missing, is_money_column, to_cents
+from .staging import export_rows
+from .supabase_client import execute_with_retry, to_table_row
+
+HASH_MODULUS = 2 ** 64
+SEPARATOR = '\x1f'
+NULL_TEXT = '\\N'
+PARTITION_UNITS = ['month', 'year', 'value']
+PAGE_SIZE = 1000
+
+# Supabase table -> export file it is loaded from
+HISTORICAL_EXPORTS = {
+    'historical_monthly_summary': 'monthly_summary_complete.csv',
+    'historical_daily_summary': 'daily_summary_complete.csv',
+    'historical_transactions': 'transactions_complete.csv',
+}
+
+Key = Union[str, Callable[[List[Dict]], List]]
+
+
+def canonical_value(value, money: bool = False) -> str:
+    """Text of one value as table_checksums() renders it"""
+    if is_missing(value):
+        return NULL_TEXT
+    if money:
+        return format_cents(to_cents(value))
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    return str(value)
+
+
+def row_hash(row: Dict, columns: Sequence[str], money_columns: Iterable[str] = ()) -> int:
+    """Signed 64-bit md5 prefix of a row's canonical text"""
+    money_columns = set(money_columns)
+    text = SEPARATOR.join(canonical_value(row.get(col), col in money_columns) for col in columns)
+    value = int(hashlib.md5(text.encode('utf-8')).hexdigest()[:16], 16)
+    return value - HASH_MODULUS if value >= HASH_MODULUS // 2 else value
+
+
+def partition_of(value, unit: str) -> Optional[str]:
+    if is_missing(value):
+        return None
+    if unit == 'month':
+        return str(value)[:7]
+    if unit == 'year':
+        return str(value)[:4]
+    return str(value)
+
+
+def checksums(rows: Iterable[Dict], columns: Sequence[str], money_columns: Iterable[str] = (),
+              partition_column: Optional[str] = None, unit: str = 'month') -> Dict[Optional[str], List[int]]:
+    """{partition: [row count, checksum]} for rows held locally"""
+    money_columns = set(money_columns)
+    result: Dict[Optional[str], List[int]] = {}
+    for row in rows:
+        partition = partition_of(row.get(partition_column), unit) if partition_column else 'all'
+        entry = result.setdefault(partition, [0, 0])
+        entry[0] += 1
+        entry[1] = (entry[1] + row_hash(row, columns, money_columns)) % HASH_MODULUS
+    return result
+
+
+def database_checksums(client, table: str, columns: Sequence[str], money_columns: Iterable[str] = (),
+                       partition_column: Optional[str] = None, unit: str = 'month',
+                       retries: int = 2) -> Dict[Optional[str], List[int]]:
+    """{partition: [row count, checksum]} computed in the database by table_checksums()"""
+    query = client.rpc('table_checksums', {
+        'p_table': table,
+        'p_columns': list(columns),
+        'p_money_columns': [col for col in columns if col in set(money_columns)],
+        'p_partition_column': partition_column,
+        'p_partition_unit': unit,
+    })
+    result = execute_with_retry(query, retries)
+    return {
+        row['partition_key']: [int(row['row_count']), int(row['checksum'] or 0) % HASH_MODULUS]
+        for row in result.data or []
+    }
+
+
+def emulate_table_checksums(tables: Dict[str, List[Dict]], params: Dict) -> List[Dict]:
+    """table_checksums() over FakeSupabase tables, for offline runs"""
+    result = checksums(tables.get(params['p_table'], []), params['p_columns'], params.get('p_money_columns') or [],
+                       params.get('p_partition_column'), params.get('p_partition_unit') or 'month')
+    return [{'partition_key': partition, 'row_count': count, 'checksum': str(checksum)}
+            for partition, (count, checksum) in result.items()]
+
+
+def _partition_filter(query, partition_column: Optional[str], unit: str, partition: Optional[str]):
+    if not partition_column or partition is None:
+        return query
+    if unit == 'value':
+        return query.eq(partition_column, partition)
+    if unit == 'month':
+        year, month = int(partition[:4]), int(partition[5:7])
+        end = f"{year + month // 12:04d}-{month % 12 + 1:02d}-01"
+        return query.gte(partition_column, f"{partition}-01").lt(partition_column, end)
+    return query.gte(partition_column, f"{partition}-01-01").lt(partition_column, f"{int(partition) + 1:04d}-01-01")
+
+
+def fetch_partition(client, table: str, columns: Sequence[str], partition_column: Optional[str], unit: str,
+                    partition: Optional[str], order_column: str, retries: int = 2) -> List[Dict]:
+    """All rows of one partition, a page at a time"""
+    rows: List[Dict] = []
+    while True:
+        query = client.table(table).select(', '.join(dict.fromkeys([order_column, *columns])))
+        query = _partition_filter(query, partition_column, unit, partition)
+        page = execute_with_retry(query.order(order_column).range(len(rows), len(rows) + PAGE_SIZE - 1), retries)
+        rows.extend(page.data or [])
+        if len(page.data or []) < PAGE_SIZE:
+            return rows
+
+
+def _keys(rows: List[Dict], key: Key) -> List:
+    return key(rows) if callable(key) else [row.get(key) for row in rows]
+
+
+def diff_rows(source_rows: List[Dict], db_rows: List[Dict], columns: Sequence[str],
+              money_columns: Iterable[str] = (), key: Key = 'id') -> Dict[str, List]:
+    """Keys missing from the database, extra in it, or with different values"""
+    money_columns = set(money_columns)
+    source = dict(zip(_keys(source_rows, key), source_rows))
+    database = dict(zip(_keys(db_rows, key), db_rows))
+    changed = [k for k in source if k in database
+               and row_hash(source[k], columns, money_columns) != row_hash(database[k], columns, money_columns)]
+    return {
+        'missing': [k for k in source if k not in database],
+        'extra': [k for k in database if k not in source],
+        'changed': changed,
+    }
+
+
+def verify_table(client, table: str, rows: List[Dict], columns: Sequence[str], money_columns: Iterable[str] = (),
+                 partition_column: Optional[str] = None, unit: str = 'month', key: Key = 'id',
+                 order_column: str = 'id') -> Dict:
+    """Compare a table with the rows loaded into it, partition by partition"""
+    if unit not in PARTITION_UNITS:
+        raise FujiImportError(f"Unknown partition unit '{unit}' (use {', '.join(PARTITION_UNITS)})")
+    money_columns = [col for col in columns if col in set(money_columns)]
+
+    source = checksums(rows, columns, money_columns, partition_column, unit)
+    database = database_checksums(client, table, columns, money_columns, partition_column, unit)
+    mismatched = sorted((p for p in set(source) | set(database) if source.get(p) != database.get(p)),
+                        key=lambda p: (p is None, p or ''))
+
+    differences: Dict[str, List] = {'missing': [], 'extra': [], 'changed': []}
+    for partition in mismatched:
+        local = [row for row in rows
+                 if not partition_column or partition_of(row.get(partition_column), unit) == partition]
+        remote = fetch_partition(client, table, columns, partition_column, unit, partition, order_column)
+        if partition is None and partition_column:
+            remote = [row for row in remote if is_missing(row.get(partition_column))]
+        for kind, keys in diff_rows(local, remote, columns, money_columns, key).items():
+            differences[kind].extend(keys)
+
+    return {
+        'table': table,
+        'rows': len(rows),
+        'db_rows': sum(count for count, _ in database.values()),
+        'partitions': len(set(source) | set(database)),
+        'mismatched_partitions': mismatched,
+        **differences,
+        'ok': not mismatched,
+    }
+
+
+def verify_exports(client, data_dir: Path = DATA_DIR, tables: Optional[Iterable[str]] = None,
+                   unit: str = 'month') -> List[Dict]:
+    """Verify the historical_* tables against the CSV exports they were loaded from"""
+    results = []
+    for table in tables or HISTORICAL_EXPORTS:
+        if table not in HISTORICAL_EXPORTS:
+            raise FujiImportError(f"Unknown table '{table}' (available: {', '.join(HISTORICAL_EXPORTS)})")
+        path = data_dir / HISTORICAL_EXPORTS[table]
+        if not path.exists():
+            raise FujiImportError(f"{path} not found - run the sales export first")
+
+        # Compare what push_delta sent: the same column renames and amount strings
+        rows = [to_table_row(record) for record in export_rows(path)]
+        columns = list(rows[0]) if rows else ['id']
+        money_columns = [col for col in columns if is_money_column(col)]
+        results.append(verify_table(client, table, rows, columns, money_columns, 'date', unit))
+    return results
+
+
+def print_verification(result: Dict, limit: int = 10):
+    status = '✅' if result['ok'] else '❌'
+    print(f"   {status} {result['table']}: {result['db_rows']} rows (expected {result['rows']}), "
+          f"{len(result['mismatched_partitions'])}/{result['partitions']} partitions differ")
+    for kind in ('missing', 'extra', 'changed'):
+        keys = result[kind]
+        if keys:
+            shown = ', '.join(str(k) for k in keys[:limit])
+            print(f"      {kind}: {shown}{' ...' if len(keys) > limit else ''} ({len(keys)})")
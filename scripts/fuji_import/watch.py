@@ -0,0 +1,352 @@
+"""
+Watch mode for the import tooling
+Polls the reference directory for updated workbooks and the menu PDF, keeps
+decoded sheets, page text and the Supabase client warm between runs, and only
+reprocesses and pushes what changed. Every push refreshes the dashboard
+views reading the table it went to.
+"""
+
+import time
+import zipfile
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from xml.etree import ElementTree
+
+from .core import (
+    DATA_DIR, GRAND_TOTALS_WORKBOOK, MENU_PDF, REFERENCE_DIR, SALES_WORKBOOK,
+    clean_column_name, is_missing, require, write_export_csv
+)
+from .logs import quarantine_for
+from .sales import (
+    SUMMARY_SHEET, RejectLog, assign_transaction_ids, daily_summary_records, is_daily_sheet,
+    monthly_summary_records, transaction_sheet_records
+)
+
+SPREADSHEET_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+RELATIONSHIP_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+
+# Parts that change how every sheet decodes (string table, number/date formats)
+SHARED_PARTS = ['xl/sharedStrings.xml', 'xl/styles.xml']
+
+DATASETS = {
+    'monthly': ('monthly_summary_complete.csv', 'historical_monthly_summary'),
+    'daily': ('daily_summary_complete.csv', 'historical_daily_summary'),
+    'transactions': ('transactions_complete.csv', 'historical_transactions'),
+}
+
+
+def sheet_fingerprints(path: Path) -> Dict[str, Tuple[int, ...]]:
+    """Map each sheet name to the CRCs of the zip parts it decodes from
+
+    The CRCs come from the xlsx zip directory, so nothing is decompressed.
+    Sheets are returned in workbook order.
+    """
+    with zipfile.ZipFile(path) as zf:
+        names = set(zf.namelist())
+        shared = tuple(zf.getinfo(part).CRC if part in names else 0 for part in SHARED_PARTS)
+
+        workbook = ElementTree.fromstring(zf.read('xl/workbook.xml'))
+        rels = ElementTree.fromstring(zf.read('xl/_rels/workbook.xml.rels'))
+        targets = {rel.get('Id'): rel.get('Target') for rel in rels}
+
+        fingerprints = {}
+        for sheet in workbook.iter(f'{SPREADSHEET_NS}sheet'):
+            target = targets[sheet.get(f'{RELATIONSHIP_NS}id')]
+            part = target.lstrip('/') if target.startswith('/') else f'xl/{target}'
+            fingerprints[sheet.get('name')] = (zf.getinfo(part).CRC,) + shared
+        return fingerprints
+
+
+def _records_equal(a: Dict, b: Dict) -> bool:
+    """Compare two records, treating missing values as equal to each other"""
+    if a.keys() != b.keys():
+        return False
+    return all(a[k] == b[k] or (is_missing(a[k]) and is_missing(b[k])) for k in a)
+
+
+def diff_records(previous: Dict[str, Dict], records: List[Dict]) -> Tuple[List[Dict], List[str]]:
+    """Return (new or changed records, ids no longer present) keyed on 'id'"""
+    current = {record['id']: record for record in records}
+    changed = [record for record_id, record in current.items()
+               if record_id not in previous or not _records_equal(previous[record_id], record)]
+    deleted = [record_id for record_id in previous if record_id not in current]
+    return changed, deleted
+
+
+class WorkbookCache:
+    """Decoded sheets of one workbook, refreshed one sheet at a time
+
+    Sheets count as changed until commit() records them as published, so a
+    pass that fails to write or push them reports them again on the next one.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.fingerprints: Dict[str, Tuple[int, ...]] = {}
+        self.published: Dict[str, Tuple[int, ...]] = {}
+        self.frames: Dict = {}
+
+    @property
+    def sheet_names(self) -> List[str]:
+        return list(self.fingerprints)
+
+    def refresh(self) -> List[str]:
+        """Re-decode only sheets whose parts changed; return the sheet names
+        changed or removed since the last commit()"""
+        fingerprints = sheet_fingerprints(self.path)
+        changed = [name for name, fp in fingerprints.items() if self.published.get(name) != fp]
+        removed = [name for name in self.published if name not in fingerprints]
+        stale = [name for name, fp in fingerprints.items() if self.fingerprints.get(name) != fp]
+
+        if stale:
+            pd = require('pandas')
+            with pd.ExcelFile(self.path) as xl_file:
+                for sheet_name in stale:
+                    df = xl_file.parse(sheet_name)
+                    df.columns = [clean_column_name(col) for col in df.columns]
+                    self.frames[sheet_name] = df
+
+        for sheet_name in [name for name in self.frames if name not in fingerprints]:
+            del self.frames[sheet_name]
+
+        self.fingerprints = fingerprints
+        return changed + removed
+
+    def commit(self):
+        """Record the decoded sheets as published"""
+        self.published = dict(self.fingerprints)
+
+
+class MenuPdfCache:
+    """Extracted text of the menu PDF, re-extracted one page at a time
+
+    As with WorkbookCache, pages count as changed until commit().
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.page_hashes: List[int] = []
+        self.published: List[int] = []
+        self.page_text: List[str] = []
+
+    @property
+    def text(self) -> str:
+        return '\n'.join(self.page_text) + '\n' if self.page_text else ''
+
+    def refresh(self) -> List[int]:
+        """Re-extract pages whose content stream changed; return the numbers of
+        pages changed since the last commit()"""
+        PyPDF2 = require('PyPDF2')
+
+        with open(self.path, 'rb') as file:
+            reader = PyPDF2.PdfReader(file)
+            hashes, text, changed = [], [], []
+
+            for page_num, page in enumerate(reader.pages):
+                contents = page.get_contents()
+                page_hash = zlib.crc32(contents.get_data()) if contents is not None else 0
+                hashes.append(page_hash)
+
+                if page_num < len(self.page_hashes) and self.page_hashes[page_num] == page_hash:
+                    text.append(self.page_text[page_num])
+                else:
+                    text.append(page.extract_text())
+                if page_num >= len(self.published) or self.published[page_num] != page_hash:
+                    changed.append(page_num + 1)
+
+        if len(hashes) < len(self.published):
+            changed.extend(range(len(hashes) + 1, len(self.published) + 1))
+
+        self.page_hashes, self.page_text = hashes, text
+        return changed
+
+    def commit(self):
+        """Record the extracted pages as published"""
+        self.published = list(self.page_hashes)
+
+
+class ImportWatcher:
+    """Long-lived importer that reprocesses only changed inputs"""
+
+    def __init__(self, reference_dir: Path = REFERENCE_DIR, data_dir: Path = DATA_DIR,
+                 push: bool = False, interval: float = 2.0):
+        self.data_dir = data_dir
+        self.push = push
+        self.interval = interval
+
+        self.grand_totals = WorkbookCache(reference_dir / GRAND_TOTALS_WORKBOOK)
+        self.sales = WorkbookCache(reference_dir / SALES_WORKBOOK)
+        self.menu = MenuPdfCache(reference_dir / MENU_PDF)
+
+        self.file_signatures: Dict[Path, Tuple[int, int]] = {}
+        self.sheet_records: Dict[str, List[Dict]] = {}
+        self.sheet_rejects: Dict[str, List[Tuple]] = {}
+        self.datasets: Dict[str, Dict[str, Dict]] = {name: {} for name in DATASETS}
+        self.menu_items: List[Dict] = []
+        self.category_id_map: Dict[str, str] = {}
+
+        self._client = None
+        self._menu_loader = None
+
+    @property
+    def client(self):
+        """Supabase client, created on first push and reused afterwards"""
+        if self._client is None:
+            from .supabase_client import get_supabase_client
+            self._client = get_supabase_client()
+        return self._client
+
+    def _changed_files(self) -> List[Path]:
+        """Files whose size or mtime moved since the last successful pass"""
+        changed = []
+        for path in (self.grand_totals.path, self.sales.path, self.menu.path):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if self.file_signatures.get(path) != (stat.st_mtime_ns, stat.st_size):
+                changed.append(path)
+        return changed
+
+    def _publish(self, dataset: str, records: List[Dict]):
+        """Write the full CSV snapshot and push the delta for one dataset"""
+        pd = require('pandas')
+        filename, table = DATASETS[dataset]
+
+        changed, deleted = diff_records(self.datasets[dataset], records)
+        if not changed and not deleted:
+            return
+
+        snapshot = self.data_dir / filename
+        generation = write_export_csv(pd.DataFrame(records), snapshot)
+        print(f"   📝 {filename}: {len(changed)} changed, {len(deleted)} removed ({len(records)} total)")
+
+        if self.push:
+            from .changeset import mark_loaded, plan_deletes
+            from .dashboard import refresh_after_load
+            from .supabase_client import push_delta
+            if not self.datasets[dataset]:
+                # Nothing published yet this session to diff against: the
+                # table may still hold rows the snapshot dropped
+                deleted = plan_deletes(snapshot, table, self.client)
+            push_delta(self.client, table, changed, deleted)
+            # The next plan_load then starts from this generation
+            mark_loaded(snapshot, table, generation)
+            print(f"   ☁️  Pushed delta to {table}")
+            refresh_after_load(self.client, self.data_dir)
+
+        self.datasets[dataset] = {record['id']: record for record in records}
+
+    def _process_grand_totals(self):
+        changed = self.grand_totals.refresh()
+        if not changed:
+            return
+        print(f"📊 {self.grand_totals.path.name}: {len(changed)} sheet(s) changed")
+        df = self.grand_totals.frames[self.grand_totals.sheet_names[0]]
+        with quarantine_for(self.data_dir, 'monthly_summary_complete') as quarantine:
+            records = monthly_summary_records(df, quarantine)
+        self._publish('monthly', records)
+
+    def _process_sales(self):
+        changed = self.sales.refresh()
+        if not changed:
+            return
+        print(f"📊 {self.sales.path.name}: {len(changed)} sheet(s) changed")
+
+        if SUMMARY_SHEET in changed and SUMMARY_SHEET in self.sales.frames:
+            with quarantine_for(self.data_dir, 'daily_summary_complete') as quarantine:
+                records = daily_summary_records(self.sales.frames[SUMMARY_SHEET], quarantine)
+            self._publish('daily', records)
+
+        daily_changed = [name for name in changed if is_daily_sheet(name)]
+        if not daily_changed:
+            return
+
+        for sheet_name in daily_changed:
+            if sheet_name in self.sales.frames:
+                rejects = RejectLog()
+                self.sheet_records[sheet_name] = transaction_sheet_records(
+                    self.sales.frames[sheet_name], sheet_name, rejects)
+                self.sheet_rejects[sheet_name] = rejects.entries
+            else:
+                self.sheet_records.pop(sheet_name, None)
+                self.sheet_rejects.pop(sheet_name, None)
+
+        # Unchanged sheets keep their rejects from earlier passes
+        with quarantine_for(self.data_dir, 'transactions_complete') as quarantine:
+            for name in self.sales.sheet_names:
+                for entry in self.sheet_rejects.get(name, []):
+                    quarantine.add(*entry)
+
+        records = [dict(record) for name in self.sales.sheet_names if name in self.sheet_records
+                   for record in self.sheet_records[name]]
+        self._publish('transactions', assign_transaction_ids(records))
+
+    def _process_menu(self):
+        from .menu import parse_menu_text, save_to_csv
+        from .menu_prices import check_as_of, record_snapshot
+
+        changed_pages = self.menu.refresh()
+        if not changed_pages:
+            return
+        print(f"📄 {self.menu.path.name}: page(s) {', '.join(map(str, changed_pages))} changed")
+
+        menu_items = parse_menu_text(self.menu.text)
+        if menu_items == self.menu_items:
+            return
+
+        as_of = check_as_of(self.data_dir)
+        save_to_csv(menu_items, self.data_dir / 'fuji_menu_items.csv')
+        record_snapshot(menu_items, self.data_dir, as_of)
+        if self.push:
+            if self._menu_loader is None:
+                from .menu_loader import MenuLoader
+                self._menu_loader = MenuLoader(self.client)
+            new_categories = [item for item in menu_items if item['category'] not in self.category_id_map]
+            if new_categories:
+                self.category_id_map.update(self._menu_loader.get_or_create_categories(new_categories))
+            self._menu_loader.sync_menu_items(menu_items, self.category_id_map)
+
+        self.menu_items = menu_items
+
+    def run_once(self) -> int:
+        """Process every input changed since the last pass; return how many"""
+        handlers = {
+            self.grand_totals.path: (self._process_grand_totals, self.grand_totals),
+            self.sales.path: (self._process_sales, self.sales),
+            self.menu.path: (self._process_menu, self.menu),
+        }
+
+        processed = 0
+        for path in self._changed_files():
+            stat = path.stat()
+            started = time.perf_counter()
+            handler, cache = handlers[path]
+            try:
+                handler()
+            except Exception as e:
+                # A file caught mid-save or a failed push; the cache keeps the
+                # changes pending, so the next poll retries them
+                print(f"⚠️  Could not process {path.name}: {e}")
+                continue
+            cache.commit()
+            self.file_signatures[path] = (stat.st_mtime_ns, stat.st_size)
+            processed += 1
+            print(f"   ⏱️  {path.name} done in {time.perf_counter() - started:.2f}s")
+        return processed
+
+    def run(self, max_passes: Optional[int] = None):
+        """Poll until interrupted (or for max_passes passes)"""
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        print(f"👀 Watching {self.sales.path.parent} every {self.interval:g}s (Ctrl+C to stop)")
+
+        passes = 0
+        try:
+            while max_passes is None or passes < max_passes:
+                self.run_once()
+                passes += 1
+                if max_passes is None or passes < max_passes:
+                    time.sleep(self.interval)
+        except KeyboardInterrupt:
+            print("\n👋 Watch stopped")
@@ -33,11 +33,12 @@ else
 fi
 
 # Make the import script executable
-chmod +x scripts/import-menu-from-pdf.py
+chmod +x scripts/import-menu-from-pdf.py scripts/fuji-import
 
 echo ""
 echo "🎉 Setup complete! You can now run the menu import:"
 echo "   python3 scripts/import-menu-from-pdf.py"
+echo "   (or: scripts/fuji-import menu load)"
 echo ""
 echo "📋 Make sure your .env.local file contains:"
 echo "   NEXT_PUBLIC_SUPABASE_URL=your-supabase-url"
@@ -0,0 +1,66 @@
+-- =====================================================
+-- Fuji Restaurant POS System - Import Verification Checksums
+-- =====================================================
+-- Per-partition row counts and order-independent checksums, so the import
+-- tooling (scripts/fuji_import/verify.py) can verify a load with one small
+-- query per table and only fetch the partitions that differ.
+--
+-- Each row is hashed from its canonical text: the listed columns as text,
+-- joined by the unit separator (\x1f), NULL as \N and amount columns rounded
+-- to two decimals. The row hash is the first 64 bits of its md5 as a signed
+-- bigint and a partition's checksum is the sum of its row hashes (returned
+-- as text; compare modulo 2^64).
+
+CREATE OR REPLACE FUNCTION table_checksums(
+    p_table TEXT,
+    p_columns TEXT[],
+    p_money_columns TEXT[] DEFAULT '{}',
+    p_partition_column TEXT DEFAULT NULL,
+    p_partition_unit TEXT DEFAULT 'month'
+)
+RETURNS TABLE (
+    partition_key TEXT,
+    row_count BIGINT,
+    checksum TEXT
+)
+LANGUAGE plpgsql
+STABLE
+AS $$
+DECLARE
+    values_sql TEXT;
+    partition_sql TEXT;
+BEGIN
+    SELECT string_agg(
+        CASE WHEN c.col = ANY(p_money_columns)
+             THEN format('round(%I::numeric, 2)::text', c.col)
+             ELSE format('%I::text', c.col)
+        END, ', ' ORDER BY c.ord)
+    INTO values_sql
+    FROM unnest(p_columns) WITH ORDINALITY AS c(col, ord);
+
+    IF values_sql IS NULL THEN
+        RAISE EXCEPTION 'table_checksums needs at least one column';
+    END IF;
+
+    IF p_partition_column IS NULL THEN
+        partition_sql := '''all''';
+    ELSIF p_partition_unit = 'month' THEN
+        partition_sql := format('to_char(%I, ''YYYY-MM'')', p_partition_column);
+    ELSIF p_partition_unit = 'year' THEN
+        partition_sql := format('to_char(%I, ''YYYY'')', p_partition_column);
+    ELSIF p_partition_unit = 'value' THEN
+        partition_sql := format('%I::text', p_partition_column);
+    ELSE
+        RAISE EXCEPTION 'Unknown partition unit: %', p_partition_unit;
+    END IF;
+
+    RETURN QUERY EXECUTE format(
+        'SELECT %s, count(*)::bigint, '
+        'sum((''x'' || left(md5(array_to_string(ARRAY[%s], E''\x1f'', ''\N'')), 16))::bit(64)::bigint)::text '
+        'FROM %I GROUP BY 1 ORDER BY 1',
+        partition_sql, values_sql, p_table
+    );
+END;
+$$;
+
+COMMENT ON FUNCTION table_checksums(TEXT, TEXT[], TEXT[], TEXT, TEXT) IS 'Row count and order-independent md5 checksum per partition of a table, for import verification';
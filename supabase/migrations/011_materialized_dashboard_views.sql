@@ -0,0 +1,154 @@
+-- =====================================================
+-- Fuji Restaurant POS System - Materialized Dashboard Views
+-- =====================================================
+-- monthly_sales_trend, daily_transaction_summary and complete_sales_overview
+-- (005_historical_sales_tables.sql) re-aggregated the historical_* tables on
+-- every dashboard query. They are now materialized views with a unique index
+-- each, refreshed after an import by the import tooling
+-- (scripts/fuji_import/dashboard.py) through refresh_dashboard_view(), which
+-- refreshes CONCURRENTLY so dashboards keep reading the previous contents
+-- while a refresh runs, and logs how long each refresh took.
+
+DROP VIEW IF EXISTS monthly_sales_trend;
+DROP VIEW IF EXISTS daily_transaction_summary;
+DROP VIEW IF EXISTS complete_sales_overview;
+
+-- Monthly sales trends (id added as the unique key)
+CREATE MATERIALIZED VIEW monthly_sales_trend AS
+SELECT
+    id,
+    date,
+    year,
+    month,
+    month_name,
+    togo,
+    dine_in,
+    gross_sale,
+    net_sale,
+    tax,
+    gratuity,
+    daily_earned,
+    no_of_days_month,
+    CASE
+        WHEN no_of_days_month > 0
+        THEN daily_earned / no_of_days_month
+        ELSE 0
+    END as avg_daily_earned_calculated
+FROM historical_monthly_summary
+ORDER BY date;
+
+CREATE UNIQUE INDEX idx_monthly_sales_trend_id ON monthly_sales_trend(id);
+CREATE INDEX idx_monthly_sales_trend_date ON monthly_sales_trend(date);
+
+-- Daily transaction summary
+CREATE MATERIALIZED VIEW daily_transaction_summary AS
+SELECT
+    date,
+    sheet_name,
+    COUNT(*) as transaction_count,
+    SUM(to_go) as total_togo,
+    SUM(dine_in) as total_dinein,
+    SUM(total) as total_sales,
+    SUM(service) as total_service_charges,
+    SUM(receipt) as total_receipts,
+    AVG(receipt) as avg_transaction_size
+FROM historical_transactions
+WHERE total > 0
+GROUP BY date, sheet_name
+ORDER BY date;
+
+CREATE UNIQUE INDEX idx_daily_transaction_summary_key ON daily_transaction_summary(date, sheet_name);
+
+-- Complete sales overview
+CREATE MATERIALIZED VIEW complete_sales_overview AS
+SELECT
+    'Monthly Summary' as data_source,
+    COUNT(*) as record_count,
+    MIN(date) as earliest_date,
+    MAX(date) as latest_date,
+    SUM(gross_sale) as total_gross_sales,
+    AVG(gross_sale) as avg_monthly_sales
+FROM historical_monthly_summary
+
+UNION ALL
+
+SELECT
+    'Daily Summary' as data_source,
+    COUNT(*) as record_count,
+    MIN(date) as earliest_date,
+    MAX(date) as latest_date,
+    SUM(gross_sale) as total_gross_sales,
+    AVG(gross_sale) as avg_daily_sales
+FROM historical_daily_summary
+
+UNION ALL
+
+SELECT
+    'Individual Transactions' as data_source,
+    COUNT(*) as record_count,
+    MIN(date) as earliest_date,
+    MAX(date) as latest_date,
+    SUM(total) as total_gross_sales,
+    AVG(total) as avg_transaction_size
+FROM historical_transactions
+WHERE total > 0;
+
+CREATE UNIQUE INDEX idx_complete_sales_overview_source ON complete_sales_overview(data_source);
+
+-- Materialized views are not covered by the RLS policies of the historical
+-- tables: keep them readable by authenticated users only, as before
+REVOKE ALL ON monthly_sales_trend, daily_transaction_summary, complete_sales_overview FROM anon;
+GRANT SELECT ON monthly_sales_trend TO authenticated;
+GRANT SELECT ON daily_transaction_summary TO authenticated;
+GRANT SELECT ON complete_sales_overview TO authenticated;
+
+-- Refresh log
+CREATE TABLE IF NOT EXISTS dashboard_view_refreshes (
+    id BIGSERIAL PRIMARY KEY,
+    view_name TEXT NOT NULL,
+    refreshed_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    duration_ms NUMERIC(12,1) NOT NULL,
+    row_count BIGINT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_dashboard_view_refreshes_view ON dashboard_view_refreshes(view_name, refreshed_at DESC);
+
+ALTER TABLE dashboard_view_refreshes ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Allow authenticated users to view dashboard refreshes" ON dashboard_view_refreshes
+FOR SELECT USING (auth.role() = 'authenticated');
+
+CREATE OR REPLACE FUNCTION refresh_dashboard_view(p_view TEXT)
+RETURNS TABLE (
+    view_name TEXT,
+    duration_ms NUMERIC,
+    row_count BIGINT
+)
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    started TIMESTAMPTZ := clock_timestamp();
+BEGIN
+    IF p_view NOT IN ('monthly_sales_trend', 'daily_transaction_summary', 'complete_sales_overview') THEN
+        RAISE EXCEPTION 'Unknown dashboard view: %', p_view;
+    END IF;
+
+    EXECUTE format('REFRESH MATERIALIZED VIEW CONCURRENTLY %I', p_view);
+
+    view_name := p_view;
+    duration_ms := round((extract(epoch FROM clock_timestamp() - started) * 1000)::numeric, 1);
+    EXECUTE format('SELECT count(*) FROM %I', p_view) INTO row_count;
+
+    INSERT INTO dashboard_view_refreshes (view_name, duration_ms, row_count)
+    VALUES (p_view, refresh_dashboard_view.duration_ms, refresh_dashboard_view.row_count);
+
+    RETURN NEXT;
+END;
+$$;
+
+REVOKE EXECUTE ON FUNCTION refresh_dashboard_view(TEXT) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION refresh_dashboard_view(TEXT) TO service_role;
+
+COMMENT ON FUNCTION refresh_dashboard_view(TEXT) IS 'Refresh one dashboard materialized view concurrently and log its duration, called after historical imports';
@@ -0,0 +1,354 @@
+-- =====================================================
+-- Fuji Restaurant POS System - Historical Order Backfill
+-- =====================================================
+-- Loading historical orders row by row fires trigger_calculate_order_totals
+-- once per order item and trigger_update_daily_sales once per completed
+-- order, each running several exception-guarded blocks and a daily_sales
+-- upsert. A backfill instead stages the exported orders and items in
+-- backfill_orders / backfill_order_items (scripts/fuji_import/backfill.py)
+-- and calls backfill_historical_orders() for a date range, which:
+--
+--   1. suspends both triggers for its own transaction only (fuji.backfill),
+--      so POS traffic in other sessions keeps firing them
+--   2. writes the orders, their items and payments with one statement each
+--   3. recomputes the order totals from their items and daily_sales for
+--      every backfilled day in one grouped statement, with the same
+--      per-order contributions as update_daily_sales()
+--      (009_add_excel_export_columns.sql)
+--
+-- verify_daily_sales_backfill() checks a day against the trigger itself: it
+-- replays the day's completed orders through trigger_update_daily_sales
+-- inside a subtransaction, compares the row it builds with the backfilled
+-- one and rolls the replay back.
+
+-- Triggers skip rows while the current transaction has fuji.backfill = 'on'
+DROP TRIGGER IF EXISTS trigger_calculate_order_totals ON order_items;
+CREATE TRIGGER trigger_calculate_order_totals
+AFTER INSERT OR UPDATE OR DELETE ON order_items
+FOR EACH ROW
+WHEN (COALESCE(current_setting('fuji.backfill', true), '') <> 'on')
+EXECUTE FUNCTION trigger_calculate_order_totals();
+
+DROP TRIGGER IF EXISTS trigger_update_daily_sales ON orders;
+CREATE TRIGGER trigger_update_daily_sales
+AFTER UPDATE ON orders
+FOR EACH ROW
+WHEN (NEW.status = 'completed' AND OLD.status != 'completed'
+      AND COALESCE(current_setting('fuji.backfill', true), '') <> 'on')
+EXECUTE FUNCTION update_daily_sales();
+
+-- Staging tables, in the shape of historical_orders.csv / historical_order_items.csv
+CREATE UNLOGGED TABLE IF NOT EXISTS backfill_orders (
+    id TEXT PRIMARY KEY,
+    order_date DATE NOT NULL,
+    type TEXT NOT NULL CHECK (type IN ('dine_in', 'take_out')),
+    table_number INT,
+    status TEXT NOT NULL DEFAULT 'completed',
+    payment_method TEXT CHECK (payment_method IN ('cash', 'credit', 'debit', 'gift_card')),
+    subtotal DECIMAL(10,2) NOT NULL DEFAULT 0,
+    tax DECIMAL(10,2) NOT NULL DEFAULT 0,
+    gratuity DECIMAL(10,2) NOT NULL DEFAULT 0,
+    service_charge DECIMAL(10,2) NOT NULL DEFAULT 0, -- what the total adds beyond subtotal, tax and gratuity
+    total DECIMAL(10,2) NOT NULL DEFAULT 0
+);
+
+CREATE UNLOGGED TABLE IF NOT EXISTS backfill_order_items (
+    id TEXT PRIMARY KEY,
+    order_id TEXT NOT NULL,
+    item_id TEXT,
+    item_name TEXT NOT NULL,
+    quantity INT NOT NULL DEFAULT 1,
+    unit_price DECIMAL(10,2) NOT NULL DEFAULT 0
+);
+
+CREATE INDEX IF NOT EXISTS idx_backfill_orders_date ON backfill_orders(order_date);
+CREATE INDEX IF NOT EXISTS idx_backfill_order_items_order ON backfill_order_items(order_id);
+
+-- Service role only: no policies
+ALTER TABLE backfill_orders ENABLE ROW LEVEL SECURITY;
+ALTER TABLE backfill_order_items ENABLE ROW LEVEL SECURITY;
+
+-- Stable uuid for a historical id, so a backfill can be rerun over the same range
+CREATE OR REPLACE FUNCTION historical_uuid(p_kind TEXT, p_id TEXT)
+RETURNS UUID
+LANGUAGE sql
+IMMUTABLE
+AS $$
+    SELECT uuid_generate_v5(uuid_ns_url(), 'fuji-pos:historical:' || p_kind || ':' || p_id);
+$$;
+
+-- daily_sales as update_daily_sales() accumulates it, recomputed in one
+-- pass for the given days from all of their completed orders. Columns the
+-- orders table may lack are read through to_jsonb(), like the trigger's
+-- undefined_column fallbacks.
+CREATE OR REPLACE FUNCTION recompute_daily_sales(p_days DATE[])
+RETURNS INT
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_days INT;
+BEGIN
+    WITH contributions AS (
+        SELECT
+            o.order_date AS sales_date,
+            o.order_type::TEXT AS order_type,
+            COALESCE(o.total_amount, 0) AS amount,
+            COALESCE((j->>'tax_amount')::DECIMAL, (j->>'tax')::DECIMAL, 0) AS tax,
+            COALESCE((j->>'gratuity_amount')::DECIMAL, (j->>'gratuity')::DECIMAL, 0) AS gratuity,
+            COALESCE((j->>'discount_amount')::DECIMAL, 0) AS discount,
+            COALESCE((j->>'tip_cash')::DECIMAL, 0) AS tip_cash,
+            COALESCE((j->>'tip_cr')::DECIMAL, 0) AS tip_cr,
+            COALESCE((j->>'coupon_subtract')::DECIMAL, 0) AS coupon_subtract,
+            -- Without sc_merch/sc_owner the trigger splits the service charge 50/50 (into DECIMAL(10,2))
+            CASE WHEN j ? 'sc_merch' THEN COALESCE((j->>'sc_merch')::DECIMAL, 0)
+                 ELSE ROUND(COALESCE((j->>'service_charge')::DECIMAL, 0) * 0.5, 2) END AS sc_merch,
+            CASE WHEN j ? 'sc_owner' THEN COALESCE((j->>'sc_owner')::DECIMAL, 0)
+                 ELSE ROUND(COALESCE((j->>'service_charge')::DECIMAL, 0) * 0.5, 2) END AS sc_owner,
+            j->>'payment_method' AS payment_method
+        FROM orders o
+        CROSS JOIN LATERAL to_jsonb(o) j
+        WHERE o.order_date = ANY(p_days)
+          AND o.status = 'completed'
+    ),
+    days AS (
+        SELECT
+            sales_date,
+            COUNT(*) AS total_orders,
+            COUNT(*) FILTER (WHERE order_type = 'dine_in') AS dine_in_orders,
+            COUNT(*) FILTER (WHERE order_type = 'take_out') AS take_out_orders,
+            SUM(amount) AS gross_sales,
+            COALESCE(SUM(amount) FILTER (WHERE order_type = 'dine_in'), 0) AS dine_in_sales,
+            COALESCE(SUM(amount) FILTER (WHERE order_type = 'take_out'), 0) AS take_out_sales,
+            SUM(tax) AS total_tax,
+            SUM(gratuity) AS total_gratuity,
+            SUM(discount) AS total_discounts,
+            SUM(tip_cash) AS tip_cash,
+            SUM(tip_cr) AS tip_cr,
+            SUM(coupon_subtract) AS coupon_subtract,
+            SUM(sc_merch) AS sc_merch,
+            SUM(sc_owner) AS sc_owner,
+            COALESCE(SUM(amount) FILTER (WHERE payment_method = 'cash'), 0) AS cash,
+            COALESCE(SUM(amount) FILTER (WHERE payment_method IN ('credit', 'debit')), 0) AS credit
+        FROM contributions
+        GROUP BY sales_date
+    )
+    INSERT INTO daily_sales (
+        sales_date, day_of_week, total_orders, dine_in_orders, take_out_orders,
+        gross_sales, dine_in_sales, take_out_sales, total_tax, total_gratuity, total_discounts,
+        tip_cash, tip_cr, coupon_subtract, sc_merch, sc_owner,
+        cash_deposited, credit_deposited, cash_sales, credit_sales, credt_total, deposited, cash
+    )
+    SELECT
+        sales_date, TO_CHAR(sales_date, 'Day'), total_orders, dine_in_orders, take_out_orders,
+        gross_sales, dine_in_sales, take_out_sales, total_tax, total_gratuity, total_discounts,
+        tip_cash, tip_cr, coupon_subtract, sc_merch, sc_owner,
+        cash, credit, cash, credit, credit, cash, cash
+    FROM days
+    ON CONFLICT (sales_date)
+    DO UPDATE SET
+        total_orders = EXCLUDED.total_orders,
+        dine_in_orders = EXCLUDED.dine_in_orders,
+        take_out_orders = EXCLUDED.take_out_orders,
+        gross_sales = EXCLUDED.gross_sales,
+        dine_in_sales = EXCLUDED.dine_in_sales,
+        take_out_sales = EXCLUDED.take_out_sales,
+        total_tax = EXCLUDED.total_tax,
+        total_gratuity = EXCLUDED.total_gratuity,
+        total_discounts = EXCLUDED.total_discounts,
+        tip_cash = EXCLUDED.tip_cash,
+        tip_cr = EXCLUDED.tip_cr,
+        coupon_subtract = EXCLUDED.coupon_subtract,
+        sc_merch = EXCLUDED.sc_merch,
+        sc_owner = EXCLUDED.sc_owner,
+        cash_deposited = EXCLUDED.cash_deposited,
+        credit_deposited = EXCLUDED.credit_deposited,
+        cash_sales = EXCLUDED.cash_sales,
+        credit_sales = EXCLUDED.credit_sales,
+        credt_total = EXCLUDED.credt_total,
+        deposited = EXCLUDED.deposited,
+        cash = EXCLUDED.cash,
+        updated_at = NOW();
+
+    GET DIAGNOSTICS v_days = ROW_COUNT;
+    RETURN v_days;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION backfill_historical_orders(p_from DATE, p_to DATE)
+RETURNS TABLE (
+    sales_date DATE,
+    orders INT,
+    items INT,
+    total_orders INT,
+    dine_in_orders INT,
+    take_out_orders INT,
+    gross_sales DECIMAL,
+    total_tax DECIMAL,
+    total_gratuity DECIMAL,
+    totals_changed INT
+)
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+#variable_conflict use_column
+DECLARE
+    v_days DATE[];
+BEGIN
+    -- One backfill at a time; the per-row triggers are off for this transaction only
+    PERFORM pg_advisory_xact_lock(hashtext('fuji_backfill_historical_orders'));
+    PERFORM set_config('fuji.backfill', 'on', true);
+
+    CREATE TEMP TABLE _backfill_orders ON COMMIT DROP AS
+    SELECT s.*, historical_uuid('order', s.id) AS order_uuid
+    FROM backfill_orders s
+    WHERE s.order_date BETWEEN p_from AND p_to;
+
+    CREATE TEMP TABLE _backfill_items ON COMMIT DROP AS
+    SELECT i.*, o.order_uuid, historical_uuid('order_item', i.id) AS item_uuid,
+           ROUND(i.quantity * i.unit_price, 2) AS total_price
+    FROM backfill_order_items i
+    JOIN _backfill_orders o ON o.id = i.order_id;
+
+    SELECT array_agg(DISTINCT order_date) INTO v_days FROM _backfill_orders;
+    IF v_days IS NULL THEN
+        RETURN;
+    END IF;
+
+    -- Reruns replace what an earlier backfill wrote for these orders
+    DELETE FROM order_items WHERE order_id IN (SELECT order_uuid FROM _backfill_orders);
+    DELETE FROM payments WHERE order_id IN (SELECT order_uuid FROM _backfill_orders);
+
+    INSERT INTO orders (
+        id, order_date, order_type, status, subtotal, tax_amount, gratuity_amount,
+        service_charge, total_amount, amount_paid, notes, created_at, confirmed_at, completed_at
+    )
+    SELECT
+        order_uuid, order_date, type::order_type, status::order_status, subtotal, tax, gratuity,
+        service_charge, total, total, 'historical:' || id,
+        order_date::TIMESTAMPTZ, order_date::TIMESTAMPTZ, order_date::TIMESTAMPTZ
+    FROM _backfill_orders
+    ON CONFLICT (id) DO UPDATE SET
+        order_date = EXCLUDED.order_date,
+        order_type = EXCLUDED.order_type,
+        status = EXCLUDED.status,
+        subtotal = EXCLUDED.subtotal,
+        tax_amount = EXCLUDED.tax_amount,
+        gratuity_amount = EXCLUDED.gratuity_amount,
+        service_charge = EXCLUDED.service_charge,
+        total_amount = EXCLUDED.total_amount,
+        amount_paid = EXCLUDED.amount_paid,
+        completed_at = EXCLUDED.completed_at,
+        updated_at = NOW();
+
+    -- Menu items are matched by name; unmatched lines keep their name only
+    INSERT INTO order_items (id, order_id, item_id, item_name, quantity, unit_price, total_price, status, created_at)
+    SELECT
+        i.item_uuid, i.order_uuid,
+        (SELECT m.id FROM menu_items m WHERE m.name = i.item_name ORDER BY m.display_order LIMIT 1),
+        i.item_name, i.quantity, i.unit_price, i.total_price, 'completed', o.order_date::TIMESTAMPTZ
+    FROM _backfill_items i
+    JOIN _backfill_orders o ON o.order_uuid = i.order_uuid;
+
+    INSERT INTO payments (order_id, payment_method, amount, created_at)
+    SELECT order_uuid, payment_method::payment_method, total, order_date::TIMESTAMPTZ
+    FROM _backfill_orders
+    WHERE payment_method IS NOT NULL;
+
+    -- Order totals from their items, once per order (calculate_order_totals'
+    -- subtotal; tax, gratuity and service charge are the workbook's)
+    WITH lines AS (
+        SELECT order_uuid, SUM(total_price) AS line_total
+        FROM _backfill_items
+        GROUP BY order_uuid
+    )
+    UPDATE orders o SET
+        subtotal = l.line_total - COALESCE(o.discount_amount, 0),
+        total_amount = l.line_total - COALESCE(o.discount_amount, 0)
+            + o.tax_amount + o.gratuity_amount + o.service_charge,
+        updated_at = NOW()
+    FROM lines l
+    WHERE o.id = l.order_uuid
+      AND o.subtotal IS DISTINCT FROM l.line_total - COALESCE(o.discount_amount, 0);
+
+    PERFORM recompute_daily_sales(v_days);
+
+    DELETE FROM backfill_order_items WHERE id IN (SELECT id FROM _backfill_items);
+    DELETE FROM backfill_orders WHERE id IN (SELECT id FROM _backfill_orders);
+
+    RETURN QUERY
+    SELECT
+        d.sales_date,
+        (SELECT COUNT(*)::INT FROM _backfill_orders b WHERE b.order_date = d.sales_date),
+        (SELECT COUNT(*)::INT FROM _backfill_items i JOIN _backfill_orders b ON b.order_uuid = i.order_uuid
+         WHERE b.order_date = d.sales_date),
+        d.total_orders, d.dine_in_orders, d.take_out_orders,
+        d.gross_sales, d.total_tax, d.total_gratuity,
+        (SELECT COUNT(*)::INT FROM _backfill_orders b JOIN orders o ON o.id = b.order_uuid
+         WHERE b.order_date = d.sales_date AND o.total_amount <> b.total)
+    FROM daily_sales d
+    WHERE d.sales_date = ANY(v_days)
+    ORDER BY d.sales_date;
+END;
+$$;
+
+-- Rebuild one day's daily_sales row through trigger_update_daily_sales and
+-- report the columns where it differs from the stored (backfilled) row.
+-- The replay runs in a subtransaction that is always rolled back.
+CREATE OR REPLACE FUNCTION verify_daily_sales_backfill(p_day DATE)
+RETURNS TABLE (
+    column_name TEXT,
+    backfilled TEXT,
+    trigger_replay TEXT
+)
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_columns TEXT[] := ARRAY[
+        'total_orders', 'dine_in_orders', 'take_out_orders', 'gross_sales', 'dine_in_sales',
+        'take_out_sales', 'total_tax', 'total_gratuity', 'total_discounts', 'tip_cash', 'tip_cr',
+        'coupon_subtract', 'sc_merch', 'sc_owner', 'cash_deposited', 'credit_deposited',
+        'cash_sales', 'credit_sales', 'credt_total', 'deposited', 'cash'
+    ];
+    v_backfilled JSONB;
+    v_replayed JSONB;
+    v_orders UUID[];
+BEGIN
+    SELECT to_jsonb(d) INTO v_backfilled FROM daily_sales d WHERE d.sales_date = p_day;
+
+    BEGIN
+        PERFORM set_config('fuji.backfill', 'off', true);
+        SELECT array_agg(id) INTO v_orders FROM orders WHERE order_date = p_day AND status = 'completed';
+
+        DELETE FROM daily_sales WHERE sales_date = p_day;
+        UPDATE orders SET status = 'confirmed' WHERE id = ANY(v_orders);
+        UPDATE orders SET status = 'completed' WHERE id = ANY(v_orders);
+        SELECT to_jsonb(d) INTO v_replayed FROM daily_sales d WHERE d.sales_date = p_day;
+
+        RAISE EXCEPTION USING ERRCODE = 'FJ001', MESSAGE = 'backfill replay rolled back';
+    EXCEPTION
+        WHEN SQLSTATE 'FJ001' THEN
+            NULL;
+    END;
+
+    RETURN QUERY
+    SELECT c, v_backfilled->>c, v_replayed->>c
+    FROM unnest(v_columns) AS c
+    WHERE (v_backfilled->>c)::DECIMAL IS DISTINCT FROM (v_replayed->>c)::DECIMAL;
+END;
+$$;
+
+REVOKE EXECUTE ON FUNCTION recompute_daily_sales(DATE[]) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION backfill_historical_orders(DATE, DATE) FROM PUBLIC, anon, authenticated;
+REVOKE EXECUTE ON FUNCTION verify_daily_sales_backfill(DATE) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION recompute_daily_sales(DATE[]) TO service_role;
+GRANT EXECUTE ON FUNCTION backfill_historical_orders(DATE, DATE) TO service_role;
+GRANT EXECUTE ON FUNCTION verify_daily_sales_backfill(DATE) TO service_role;
+
+COMMENT ON FUNCTION backfill_historical_orders(DATE, DATE) IS 'Load staged historical orders for a date range with the per-row order triggers suspended, then recompute order totals and daily_sales set-based';
+COMMENT ON FUNCTION recompute_daily_sales(DATE[]) IS 'Recompute daily_sales for the given days from their completed orders, as update_daily_sales() accumulates it';
+COMMENT ON FUNCTION verify_daily_sales_backfill(DATE) IS 'Compare a backfilled daily_sales row with a rolled-back replay of trigger_update_daily_sales for the day';